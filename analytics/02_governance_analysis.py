@@ -12,8 +12,6 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import warnings
 
 from config import DATA_PATH, OUTPUT_DIR
@@ -311,6 +309,8 @@ def analyze_governance_market_correlation(df):
 
 def create_sankey_diagram(df):
     """Create Sankey diagram showing governance flow."""
+    import plotly.graph_objects as go
+
     print("\n" + "="*60)
     print("CREATING GOVERNANCE FLOW SANKEY DIAGRAM")
     print("="*60)
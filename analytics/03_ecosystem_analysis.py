@@ -12,12 +12,10 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-import plotly.graph_objects as go
-import plotly.express as px
 from collections import Counter
 import warnings
 
-from config import DATA_PATH, OUTPUT_DIR
+from config import DATA_PATH, OUTPUT_DIR, CHAIN_TVL_PATH
 
 warnings.filterwarnings('ignore')
 
@@ -110,6 +108,38 @@ def analyze_chain_dominance(chain_df):
     print(f"\n✓ Saved: {output_path}")
     plt.close()
 
+def analyze_tvl_weighted_dominance():
+    """Analyze chain dominance weighted by per-chain TVL instead of DApp counts."""
+    print("\n" + "="*60)
+    print("TVL-WEIGHTED CHAIN DOMINANCE")
+    print("="*60)
+    
+    if not CHAIN_TVL_PATH.exists():
+        print(f"\n⚠ {CHAIN_TVL_PATH.name} not found - run scripts/export_csv.py to enable this analysis")
+        return None
+    
+    chain_tvl = pd.read_csv(CHAIN_TVL_PATH)
+    chain_tvl['tvl'] = pd.to_numeric(chain_tvl['tvl'], errors='coerce').fillna(0)
+    
+    tvl_by_chain = chain_tvl.groupby('chain')['tvl'].sum().sort_values(ascending=False)
+    total_tvl = tvl_by_chain.sum()
+    if total_tvl <= 0:
+        print("\n⚠ No positive per-chain TVL available")
+        return None
+    
+    tvl_share = (tvl_by_chain / total_tvl * 100).rename('tvl_share_pct')
+    result = pd.concat([tvl_by_chain, tvl_share], axis=1)
+    
+    print(f"\nTop 10 chains hold {tvl_share.head(10).sum():.1f}% of per-chain TVL")
+    for chain, row in result.head(10).iterrows():
+        print(f"  {chain}: ${row['tvl']:,.0f} ({row['tvl_share_pct']:.1f}%)")
+    
+    output_path = OUTPUT_DIR / '03_chain_tvl_dominance.csv'
+    result.to_csv(output_path, index_label='chain')
+    print(f"\n✓ Saved: {output_path}")
+    
+    return result
+
 def analyze_multichain_trends(df):
     """Analyze multi-chain deployment trends."""
     print("\n" + "="*60)
@@ -298,6 +328,8 @@ def analyze_chain_specialization(df):
 
 def create_chain_treemap(df):
     """Create interactive treemap of chains and categories."""
+    import plotly.express as px
+
     print("\n" + "="*60)
     print("CREATING CHAIN ECOSYSTEM TREEMAP")
     print("="*60)
@@ -479,6 +511,7 @@ def main():
     # Run analyses
     chain_df = parse_chains(df)
     analyze_chain_dominance(chain_df)
+    analyze_tvl_weighted_dominance()
     analyze_multichain_trends(df)
     analyze_chain_specialization(df)
     create_chain_treemap(df)
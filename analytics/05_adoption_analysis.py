@@ -12,8 +12,6 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from sklearn.preprocessing import StandardScaler
-from sklearn.cluster import KMeans
 import warnings
 
 from config import DATA_PATH, OUTPUT_DIR
@@ -359,6 +357,9 @@ def analyze_category_engagement(df):
 
 def perform_engagement_clustering(df):
     """Cluster DApps by engagement patterns."""
+    from sklearn.cluster import KMeans
+    from sklearn.preprocessing import StandardScaler
+
     print("\n" + "="*60)
     print("ENGAGEMENT CLUSTERING ANALYSIS")
     print("="*60)
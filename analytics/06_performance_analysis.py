@@ -12,9 +12,6 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from sklearn.preprocessing import StandardScaler
-from sklearn.cluster import KMeans
-from sklearn.decomposition import PCA
 import warnings
 
 from config import DATA_PATH, OUTPUT_DIR
@@ -237,6 +234,10 @@ def analyze_efficiency_ratios(df):
 
 def perform_performance_clustering(df):
     """Cluster DApps by performance metrics."""
+    from sklearn.cluster import KMeans
+    from sklearn.decomposition import PCA
+    from sklearn.preprocessing import StandardScaler
+
     print("\n" + "="*60)
     print("PERFORMANCE CLUSTERING ANALYSIS")
     print("="*60)
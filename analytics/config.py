@@ -13,6 +13,9 @@ BASE_DIR = Path(__file__).parent
 # ── Input: raw dataset consumed by 01_data_preparation.py ───────
 RAW_DATA_PATH = BASE_DIR.parent / "DAPP_Dataset_Nov_2025 - Final.csv"
 
+# ── Optional input: latest per-chain TVL (scripts/export_csv.py) ─
+CHAIN_TVL_PATH = BASE_DIR.parent / "dapp_chain_tvl.csv"
+
 # ── Output directory for all generated files ────────────────────
 OUTPUT_DIR = BASE_DIR / "outputs_feb"
 
@@ -11,40 +11,47 @@ echo ""
 
 source ../.venv/bin/activate
 
+# --profile (or PROFILE=1) samples every stage into ../profiles/
+if [ "$1" = "--profile" ] || [ "${PROFILE:-0}" = "1" ]; then
+    RUN="env PYTHONPATH=.. python -m dapp_scraper.profiling"
+else
+    RUN="python"
+fi
+
 echo "[1/9] Data Preparation..."
-python 01_data_preparation.py
+$RUN 01_data_preparation.py
 
 echo ""
 echo "[2/9] Governance Analysis..."
-python 02_governance_analysis.py
+$RUN 02_governance_analysis.py
 
 echo ""
 echo "[3/9] Ecosystem Analysis..."
-python 03_ecosystem_analysis.py
+$RUN 03_ecosystem_analysis.py
 
 echo ""
 echo "[4/9] Market Analysis..."
-python 04_market_analysis.py
+$RUN 04_market_analysis.py
 
 echo ""
 echo "[5/9] Adoption Analysis..."
-python 05_adoption_analysis.py
+$RUN 05_adoption_analysis.py
 
 echo ""
 echo "[6/9] Performance Analysis..."
-python 06_performance_analysis.py
+$RUN 06_performance_analysis.py
 
 echo ""
 echo "[7/9] Funding Analysis..."
-python 07_funding_analysis.py
+$RUN 07_funding_analysis.py
 
 echo ""
 echo "[8/9] Category Comparison..."
-python 08_category_comparison.py
+$RUN 08_category_comparison.py
 
 echo ""
 echo "[9/9] Key Insights..."
-python 09_key_insights.py
+$RUN 09_key_insights.py
 
 echo ""
 echo "================================"
@@ -43,6 +43,7 @@ def load_raw_csv(path) -> pd.DataFrame:
         "percent_change_30d",
         "percent_change_60d",
         "percent_change_90d",
+        "entity_tvl",
     ]
     for c in numeric_cols:
         if c in df.columns:
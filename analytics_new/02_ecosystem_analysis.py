@@ -23,6 +23,7 @@ from analytics_new.config import (
     PREPARED_DATA_PATH,
     THEME_SUMMARY_PATH,
 )
+from analytics_new.lib.io import one_row_per_entity
 from analytics_new.lib.themes import theme_rulebook
 
 
@@ -32,6 +33,8 @@ def sector_summary(df: pd.DataFrame, eligible_mask: pd.Series, cohort_mask: pd.S
     sub_coh = df[cohort_mask]
     for label, sub in [("eligible_all", sub_elig), ("primary_cohort", sub_coh)]:
         for sector, g in sub.groupby("dapp_sector"):
+            # Entity TVL sums the members of a cluster, so count each cluster once
+            entities = one_row_per_entity(g)
             rows.append(
                 {
                     "slice": label,
@@ -41,6 +44,8 @@ def sector_summary(df: pd.DataFrame, eligible_mask: pd.Series, cohort_mask: pd.S
                     "median_users": float(g["users"].median()) if len(g) else np.nan,
                     "median_volume": float(g["volume"].median()) if len(g) else np.nan,
                     "median_tvl": float(g["tvl"].median()) if len(g) else np.nan,
+                    "median_entity_tvl": float(entities["entity_tvl"].median())
+                    if "entity_tvl" in entities.columns and len(entities) else np.nan,
                     "median_mcap": float(g["market_cap"].median()) if len(g) else np.nan,
                 }
             )
@@ -164,4 +169,7 @@ def main() -> None:
 
 
 if __name__ == "__main__":
-    main()
+    from dapp_scraper.profiling import profile_from_argv
+
+    with profile_from_argv("analytics_new_02_ecosystem_analysis"):
+        main()
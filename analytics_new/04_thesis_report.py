@@ -222,4 +222,7 @@ def main() -> None:
 
 
 if __name__ == "__main__":
-    main()
+    from dapp_scraper.profiling import profile_from_argv
+
+    with profile_from_argv("analytics_new_04_thesis_report"):
+        main()
@@ -43,6 +43,7 @@ def load_raw_csv(path) -> pd.DataFrame:
         "percent_change_30d",
         "percent_change_60d",
         "percent_change_90d",
+        "entity_tvl",
     ]
     for c in numeric_cols:
         if c in df.columns:
@@ -53,3 +54,10 @@ def load_raw_csv(path) -> pd.DataFrame:
         if c in df.columns:
             df[c] = df[c].replace("", np.nan)
     return df
+
+
+def one_row_per_entity(df: pd.DataFrame) -> pd.DataFrame:
+    """First row of each entity_id (near-duplicate cluster); rows without one are kept"""
+    if "entity_id" not in df.columns:
+        return df
+    return df[~df["entity_id"].duplicated() | df["entity_id"].isna()]
@@ -0,0 +1,3 @@
+from dapp_scraper.cli import main
+
+main()
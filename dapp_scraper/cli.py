@@ -0,0 +1,135 @@
+"""
+dapp-scan: one entry point for the scraper scripts, migrations and analytics.
+
+    python -m dapp_scraper <command> [args]
+
+Each command runs an existing script as if it was started directly, with
+the remaining arguments as its sys.argv, so every script keeps its own
+options (including --profile). Only the chosen script is imported:
+`dapp-scan` and `dapp-scan help` load nothing beyond the standard
+library, and pandas/matplotlib are only imported by `analyze`.
+"""
+import os
+import runpy
+import sys
+
+PROG = "dapp-scan"
+ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+MIGRATIONS_DIR = os.path.join(ROOT, "migrations")
+ANALYTICS_DIR = os.path.join(ROOT, "analytics_new")
+
+# command -> (script module, description)
+SCRIPT_COMMANDS = {
+    "init-db": ("scripts.init_db", "Create the database and schema"),
+    "fetch": ("scripts.run_fetch", "Fetch DApps from DappRadar and enrich them"),
+    "enrich": ("scripts.run_fetch_enrich", "Enrich the DApps in the database"),
+    "worker": ("scripts.enrich_worker", "Enrichment job queue: enqueue | work | status"),
+    "daemon": ("scripts.daemon", "Run fetch and refresh jobs on schedules, with a status endpoint"),
+    "resolve": ("scripts.resolve_ids", "Resolve provider ids for unmatched DApps"),
+    "cluster": ("scripts.cluster_dapps", "Cluster duplicate DApps into entities"),
+    "export": ("scripts.export_csv", "Export CSV files (--base for the base dataset)"),
+}
+
+
+def list_migrations():
+    """Migration names, e.g. "runs" for migrations/migrate_runs.py"""
+    return sorted(
+        name[len("migrate_"):-len(".py")]
+        for name in os.listdir(MIGRATIONS_DIR)
+        if name.startswith("migrate_") and name.endswith(".py")
+    )
+
+
+def list_analytics_stages():
+    """analytics_new stage scripts in run order"""
+    return sorted(
+        name for name in os.listdir(ANALYTICS_DIR)
+        if name[:2].isdigit() and name.endswith(".py")
+    )
+
+
+def _run_path(path, args):
+    sys.argv = [path] + list(args)
+    runpy.run_path(path, run_name="__main__")
+
+
+def run_script(module, args):
+    """Run a scripts.* module as __main__ with args as its command line"""
+    sys.argv = [module.rsplit(".", 1)[-1] + ".py"] + list(args)
+    runpy.run_module(module, run_name="__main__", alter_sys=True)
+
+
+def run_migrations(args):
+    if not args:
+        print("🗃️ Available migrations:")
+        for name in list_migrations():
+            print(f"  • {name}")
+        print(f"\nRun with: {PROG} migrate <name> [<name> ...]")
+        return
+    available = list_migrations()
+    unknown = [name for name in args if name not in available]
+    if unknown:
+        print(f"❌ Error: Unknown migration(s): {', '.join(unknown)}")
+        sys.exit(1)
+    for name in args:
+        _run_path(os.path.join(MIGRATIONS_DIR, f"migrate_{name}.py"), [])
+
+
+def run_analytics(args):
+    """Run all analytics_new stages, or the ones whose number is given (e.g. 02 03)"""
+    selected = [arg for arg in args if not arg.startswith("--")]
+    options = [arg for arg in args if arg.startswith("--")]
+    stages = [
+        stage for stage in list_analytics_stages()
+        if not selected or any(stage.startswith(number.zfill(2)) for number in selected)
+    ]
+    if not stages:
+        print(f"❌ Error: No analytics stage matches {', '.join(selected)}")
+        sys.exit(1)
+    for stage in stages:
+        print(f"\n📊 Analytics stage {stage}")
+        _run_path(os.path.join(ANALYTICS_DIR, stage), options)
+
+
+def print_usage():
+    """Print usage instructions"""
+    print(f"Usage: {PROG} <command> [args]   (python -m dapp_scraper <command> [args])")
+    print("")
+    print("Commands:")
+    for command, (_, description) in SCRIPT_COMMANDS.items():
+        print(f"  {command:<10} {description}")
+    print(f"  {'migrate':<10} List migrations, or run the named ones")
+    print(f"  {'analyze':<10} Run the analytics_new stages (all, or by number: analyze 02 03)")
+    print("")
+    print(f"Run `{PROG} <command> help` for the options of a command.")
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ("help", "--help", "-h"):
+        print_usage()
+        return
+
+    # Scripts import scripts.* and dapp_scraper.* from the repository root
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+
+    command, args = argv[0], argv[1:]
+    if command == "export" and args[:1] in (["help"], ["--help"]):
+        print(f"Usage: {PROG} export [--base] [--profile]")
+        print("  Writes pilot_dataset.csv, dapp_raises.csv and dapp_chain_tvl.csv to the current directory;")
+        print("  --base writes pilot_dataset_base.csv and dapp_raises_base.csv instead")
+    elif command == "export" and "--base" in args:
+        args.remove("--base")
+        run_script("scripts.export_csv_base", args)
+    elif command in SCRIPT_COMMANDS:
+        run_script(SCRIPT_COMMANDS[command][0], args)
+    elif command == "migrate":
+        run_migrations(args)
+    elif command == "analyze":
+        run_analytics(args)
+    else:
+        print(f"❌ Error: Unknown command {command}")
+        print_usage()
+        sys.exit(1)
+
@@ -0,0 +1,22 @@
+"""
+Configuration loader.
+
+config/config.ini is parsed once per process; every module and script
+reads the same ConfigParser through get_config(). This module only uses
+the standard library so the CLI and the migrations can load it cheaply.
+"""
+import os
+from configparser import ConfigParser
+from functools import lru_cache
+
+CONFIG_PATH = os.path.normpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "config", "config.ini")
+)
+
+
+@lru_cache(maxsize=None)
+def get_config():
+    """Parsed config/config.ini, shared by all callers"""
+    cfg = ConfigParser()
+    cfg.read(CONFIG_PATH)
+    return cfg
@@ -0,0 +1,179 @@
+"""
+Shared PostgreSQL connection pool.
+
+get_conn() checks a connection out of one process-wide psycopg2
+ThreadedConnectionPool and conn.close() hands it back instead of closing
+it, so callers keep the usual get_conn() ... conn.close() pattern while
+connections are only set up once. A returned connection is rolled back
+and switched back out of autocommit. Settings come from [database]:
+- pool_min: connections kept open while idle
+- pool_max: connections open at most; further get_conn() calls wait
+- pool_timeout_seconds: how long get_conn() waits for a free connection
+- health_check_seconds: a connection idle for longer is checked with
+  SELECT 1 before it is handed out and replaced if it is dead
+Checkouts, wait and hold times and new connections are counted on the
+active run (run_metrics) and in pool_stats().
+"""
+import atexit
+import threading
+import time
+
+import psycopg2
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_UNKNOWN
+from psycopg2.pool import PoolError, ThreadedConnectionPool
+
+from dapp_scraper.config import get_config
+from dapp_scraper import run_metrics
+
+_cfg = get_config()
+DB_NAME = _cfg["database"]["name"]
+SUPERUSER = _cfg["database"]["user"]
+PASSWORD = _cfg["database"]["password"]
+HOST = _cfg["database"]["host"]
+PORT = _cfg["database"]["port"]
+POOL_MIN = _cfg.getint("database", "pool_min", fallback=2)
+POOL_MAX = _cfg.getint("database", "pool_max", fallback=8)
+POOL_TIMEOUT_SECONDS = _cfg.getfloat("database", "pool_timeout_seconds", fallback=30.0)
+HEALTH_CHECK_SECONDS = _cfg.getfloat("database", "health_check_seconds", fallback=60.0)
+
+
+class PooledConnection(psycopg2.extensions.connection):
+    """psycopg2 connection whose close() returns it to the pool it came from"""
+
+    _pool = None
+    _checked_out_at = None
+    _returned_at = None
+
+    def close(self):
+        pool, self._pool = self._pool, None
+        if pool is None:
+            super().close()
+        else:
+            pool.release(self)
+
+
+class ConnectionPool:
+    """ThreadedConnectionPool with blocking checkouts, health checks and timing"""
+
+    def __init__(self, minconn, maxconn, timeout, health_check_seconds, **connect_kwargs):
+        self.timeout = timeout
+        self.health_check_seconds = health_check_seconds
+        self._pool = ThreadedConnectionPool(
+            minconn, maxconn, connection_factory=PooledConnection, **connect_kwargs
+        )
+        # ThreadedConnectionPool fails instead of waiting when it is exhausted
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._lock = threading.Lock()
+        self.stats = {
+            "maxconn": maxconn, "in_use": 0, "checkouts": 0, "connects": 0, "replaced": 0,
+            "wait_seconds": 0.0, "max_wait_seconds": 0.0, "hold_seconds": 0.0,
+        }
+
+    def checkout(self):
+        started = time.monotonic()
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolError(f"no free database connection after {self.timeout:g}s ({self.stats['maxconn']} in use)")
+        try:
+            conn = self._healthy_conn()
+        except Exception:
+            self._slots.release()
+            raise
+        now = time.monotonic()
+        wait = now - started
+        conn._pool = self
+        conn._checked_out_at = now
+        with self._lock:
+            self.stats["in_use"] += 1
+            self.stats["checkouts"] += 1
+            self.stats["wait_seconds"] += wait
+            self.stats["max_wait_seconds"] = max(self.stats["max_wait_seconds"], wait)
+        run_metrics.count("db_checkouts")
+        run_metrics.count("db_wait_ms", round(wait * 1000))
+        return conn
+
+    def _healthy_conn(self):
+        """A pooled connection that answered SELECT 1 if it was idle for a while"""
+        while True:
+            conn = self._pool.getconn()
+            if conn._returned_at is None:
+                with self._lock:
+                    self.stats["connects"] += 1
+                run_metrics.count("db_connects")
+                return conn
+            if time.monotonic() - conn._returned_at < self.health_check_seconds and not conn.closed:
+                return conn
+            try:
+                cur = conn.cursor()
+                cur.execute("SELECT 1;")
+                cur.close()
+                conn.rollback()
+                return conn
+            except psycopg2.Error:
+                self._pool.putconn(conn, close=True)
+                with self._lock:
+                    self.stats["replaced"] += 1
+
+    def release(self, conn):
+        held = time.monotonic() - conn._checked_out_at
+        broken = conn.closed or conn.info.transaction_status == TRANSACTION_STATUS_UNKNOWN
+        if not broken:
+            try:
+                if conn.info.transaction_status != TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+                if conn.autocommit:
+                    conn.autocommit = False
+            except psycopg2.Error:
+                broken = True
+        conn._returned_at = time.monotonic()
+        self._pool.putconn(conn, close=broken)
+        self._slots.release()
+        with self._lock:
+            self.stats["in_use"] -= 1
+            self.stats["hold_seconds"] += held
+        run_metrics.count("db_hold_ms", round(held * 1000))
+
+    def close(self):
+        # Connections still checked out are closed for real, not returned
+        for conn in list(self._pool._used.values()):
+            conn._pool = None
+        self._pool.closeall()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """The process-wide pool, created on first use"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    POOL_MIN, max(POOL_MIN, POOL_MAX), POOL_TIMEOUT_SECONDS, HEALTH_CHECK_SECONDS,
+                    dbname=DB_NAME, user=SUPERUSER, password=PASSWORD, host=HOST, port=PORT,
+                )
+    return _pool
+
+
+def get_conn():
+    """Check a connection out of the pool; conn.close() returns it"""
+    return get_pool().checkout()
+
+
+def pool_stats():
+    """Counters of the pool, or None if no connection was requested yet"""
+    if _pool is None:
+        return None
+    with _pool._lock:
+        return dict(_pool.stats)
+
+
+@atexit.register
+def close_pool():
+    """Close every pooled connection"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
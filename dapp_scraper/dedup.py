@@ -0,0 +1,253 @@
+"""
+Near-duplicate DApp clustering.
+
+DApps are linked when they share a certain provider id (dapp_external_ids
+rows from a direct or cross-referenced match), a website domain, or a near-identical
+name that is corroborated by the same token symbol or domain. Linked DApps
+are merged with union-find and every member stores the lowest DApp id of its
+cluster in dapps.entity_id, so it stays stable as new DApps are added.
+
+Members of a cluster are often separate listings with their own TVL
+(protocol versions that share a token), so they keep being enriched from
+DeFiLlama on their own. Only the token and market lookups (CMC, CoinGecko)
+are done once for the canonical DApp and copied to the members; entity-wide
+TVL is aggregated by entity_id instead of being copied.
+"""
+from urllib.parse import urlparse
+
+from psycopg2.extras import execute_values
+
+from dapp_scraper.resolver import EntityResolver, normalize_name
+
+# Name score needed to link two DApps, on top of a shared symbol or domain
+NAME_LINK_SCORE = 95
+
+# Provider ids only link DApps when they are certain (direct or cross-referenced
+# ids); a fuzzy mapping (resolve_ids.py) or a name match is a guess and must not
+# merge clusters. dapps.gecko_id / cmc_id are not used: enrichment fills them
+# from whatever mapping drove the fetch, guesses included
+LINK_MIN_CONFIDENCE = 1.0
+
+# Hosts shared by unrelated projects; a match on these says nothing
+GENERIC_DOMAINS = {
+    "t.me", "twitter.com", "x.com", "github.com", "medium.com", "linktr.ee",
+    "discord.gg", "discord.com", "youtube.com", "gitbook.io", "notion.site",
+    "vercel.app", "netlify.app", "play.google.com", "apps.apple.com",
+}
+
+# Columns filled by enrichment that belong to the entity's token rather than one
+# listing (the market quote columns of dapp_market_quotes are copied as well)
+ENTITY_COLUMNS = (
+    "gecko_id", "cmc_id", "token_symbol",
+)
+
+# Providers still called for cluster members: their own TVL, chain TVL and raises
+MEMBER_PROVIDERS = ("defillama",)
+
+
+def website_domain(url):
+    """Registrable-looking host of a website URL without www./app. prefixes"""
+    if not url:
+        return ""
+    url = str(url).strip().lower()
+    if "://" not in url:
+        url = "http://" + url
+    host = urlparse(url).hostname or ""
+    for prefix in ("www.", "app."):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    return "" if host in GENERIC_DOMAINS else host
+
+
+class _UnionFind:
+    def __init__(self, items):
+        self.parent = {item: item for item in items}
+
+    def find(self, item):
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            # Keep the lowest id as root so it becomes the canonical id
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+def cluster_dapps(dapps):
+    """
+    Group DApps into entity clusters.
+    Args:
+        dapps: list of dicts with id, name, website, token_symbol and
+               external_ids ({provider: external_id})
+    Returns:
+        dict: {dapp_id: canonical dapp_id}
+    """
+    uf = _UnionFind([d["id"] for d in dapps])
+
+    # Exact keys: provider ids and website domains
+    seen = {}
+    for d in dapps:
+        keys = [f"{provider}:{ext}" for provider, ext in (d.get("external_ids") or {}).items() if ext]
+        domain = website_domain(d.get("website"))
+        if domain:
+            keys.append(f"domain:{domain}")
+        for key in keys:
+            if key in seen:
+                uf.union(seen[key], d["id"])
+            else:
+                seen[key] = d["id"]
+
+    # Fuzzy names, blocked the same way as provider resolution
+    by_id = {d["id"]: d for d in dapps}
+    resolver = EntityResolver([
+        {"provider": "dapp", "external_id": d["id"], "name": d["name"], "symbol": d.get("token_symbol")}
+        for d in dapps
+    ])
+    ranked = resolver.resolve(
+        [{"name": d["name"], "symbol": d.get("token_symbol")} for d in dapps],
+        min_score=NAME_LINK_SCORE,
+        top_n=10,
+    )
+    for d, candidates in zip(dapps, ranked):
+        for candidate in candidates:
+            other = by_id[candidate["external_id"]]
+            if other["id"] == d["id"]:
+                continue
+            if _names_corroborated(d, other):
+                uf.union(d["id"], other["id"])
+
+    return {d["id"]: uf.find(d["id"]) for d in dapps}
+
+
+def _names_corroborated(a, b):
+    """Similar names only link when compact names are equal or symbol/domain agree"""
+    if normalize_name(a["name"]).replace(" ", "") == normalize_name(b["name"]).replace(" ", ""):
+        return True
+    symbol_a = str(a.get("token_symbol") or "").lower()
+    if symbol_a and symbol_a == str(b.get("token_symbol") or "").lower():
+        return True
+    domain_a = website_domain(a.get("website"))
+    return bool(domain_a) and domain_a == website_domain(b.get("website"))
+
+
+def load_dapps_for_clustering(cur):
+    """Load DApps with their certain provider ids in two queries"""
+    cur.execute("SELECT id, name, website, token_symbol FROM dapps ORDER BY id;")
+    dapps = {
+        dapp_id: {
+            "id": dapp_id, "name": name, "website": website,
+            "token_symbol": token_symbol, "external_ids": {},
+        }
+        for dapp_id, name, website, token_symbol in cur.fetchall()
+    }
+
+    cur.execute(
+        """
+        SELECT dapp_id, provider, external_id
+        FROM dapp_external_ids
+        WHERE external_id IS NOT NULL
+          AND match_method IS DISTINCT FROM 'fuzzy'
+          AND confidence >= %s;
+        """,
+        (LINK_MIN_CONFIDENCE,)
+    )
+    for dapp_id, provider, external_id in cur.fetchall():
+        if dapp_id in dapps:
+            dapps[dapp_id]["external_ids"][provider] = external_id
+    return list(dapps.values())
+
+
+def store_entity_clusters(cur, assignments):
+    """Write {dapp_id: entity_id} to dapps.entity_id in one statement"""
+    if not assignments:
+        return 0
+    execute_values(
+        cur,
+        """
+        UPDATE dapps d SET entity_id = v.entity_id
+        FROM (VALUES %s) AS v (id, entity_id)
+        WHERE d.id = v.id AND d.entity_id IS DISTINCT FROM v.entity_id;
+        """,
+        list(assignments.items()),
+        page_size=1000
+    )
+    return len(assignments)
+
+
+def cluster_member_ids(cur):
+    """Ids of DApps whose cluster has another canonical DApp"""
+    cur.execute("SELECT id FROM dapps WHERE entity_id IS NOT NULL AND entity_id != id;")
+    return {row[0] for row in cur.fetchall()}
+
+
+def entity_tvl(cur, dapp_ids):
+    """
+    {dapp_id: (entity_id, entity TVL)} for dapp_ids. The entity TVL sums the
+    TVL of every cluster member, counting members that map to the same
+    DeFiLlama protocol once.
+    """
+    cur.execute(
+        """
+        WITH members AS (
+            SELECT DISTINCT ON (COALESCE(d.entity_id, d.id), COALESCE(x.external_id, d.id::text))
+                   COALESCE(d.entity_id, d.id) AS entity_id, d.tvl
+            FROM dapps d
+            LEFT JOIN dapp_external_ids x
+              ON x.dapp_id = d.id AND x.provider = 'defillama' AND x.external_id IS NOT NULL
+            ORDER BY COALESCE(d.entity_id, d.id), COALESCE(x.external_id, d.id::text), d.id
+        ),
+        entities AS (
+            SELECT entity_id, SUM(COALESCE(tvl, 0)) AS tvl FROM members GROUP BY entity_id
+        )
+        SELECT d.id, e.entity_id, e.tvl
+        FROM dapps d
+        JOIN entities e ON e.entity_id = COALESCE(d.entity_id, d.id)
+        WHERE d.id = ANY(%s);
+        """,
+        (list(dapp_ids),)
+    )
+    return {dapp_id: (entity_id, tvl) for dapp_id, entity_id, tvl in cur.fetchall()}
+
+
+def propagate_entity_enrichment(cur):
+    """
+    Copy the token ids and market quotes of canonical DApps to their cluster
+    members. TVL stays per DApp. Returns the number of members updated.
+    """
+    from dapp_scraper.store import QUOTE_COLUMNS
+
+    assignments = ",\n            ".join(f"{col} = c.{col}" for col in ENTITY_COLUMNS)
+    cur.execute(
+        f"""
+        UPDATE dapps m SET
+            {assignments},
+            updated_at = CURRENT_TIMESTAMP
+        FROM dapps c
+        WHERE m.entity_id = c.id AND m.id != c.id
+          AND ({", ".join(f"m.{col}" for col in ENTITY_COLUMNS)})
+              IS DISTINCT FROM ({", ".join(f"c.{col}" for col in ENTITY_COLUMNS)});
+        """
+    )
+    propagated = cur.rowcount
+
+    quote_columns = ", ".join(QUOTE_COLUMNS)
+    cur.execute(
+        f"""
+        INSERT INTO dapp_market_quotes AS q (dapp_id, {quote_columns})
+        SELECT m.id, {", ".join(f"c.{col}" for col in QUOTE_COLUMNS)}
+        FROM dapps m
+        JOIN dapp_market_quotes c ON c.dapp_id = m.entity_id
+        WHERE m.id != m.entity_id
+        ON CONFLICT (dapp_id) DO UPDATE SET
+            {", ".join(f"{col} = EXCLUDED.{col}" for col in QUOTE_COLUMNS)},
+            updated_at = CURRENT_TIMESTAMP
+        WHERE ({", ".join(f"q.{col}" for col in QUOTE_COLUMNS)})
+            IS DISTINCT FROM ({", ".join(f"EXCLUDED.{col}" for col in QUOTE_COLUMNS)});
+        """
+    )
+    return propagated
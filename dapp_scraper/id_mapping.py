@@ -0,0 +1,79 @@
+"""
+Persistent DApp -> provider ID mappings with negative caching.
+
+Each row in dapp_external_ids records how a DApp was matched to a provider
+(DeFiLlama slug, CMC id, CoinGecko id). Rows with a NULL external_id are
+known misses and carry an expires_at after which the DApp is probed again.
+"""
+from dapp_scraper.utils import CFG
+
+PROVIDERS = ("defillama", "coinmarketcap", "coingecko")
+
+NEGATIVE_CACHE_TTL_DAYS = CFG.getint("enrichment", "negative_cache_ttl_days", fallback=7)
+
+
+def load_id_mappings(cur):
+    """
+    Load every live mapping in one query.
+    Returns {(dapp_id, provider): {"external_id", "match_method", "confidence"}};
+    expired misses are left out so those DApps get resolved again.
+    """
+    cur.execute(
+        """
+        SELECT dapp_id, provider, external_id, match_method, confidence
+        FROM dapp_external_ids
+        WHERE expires_at IS NULL OR expires_at > CURRENT_TIMESTAMP;
+        """
+    )
+    return {
+        (dapp_id, provider): {
+            "external_id": external_id,
+            "match_method": match_method,
+            "confidence": confidence,
+        }
+        for dapp_id, provider, external_id, match_method, confidence in cur.fetchall()
+    }
+
+
+def is_known_miss(mapping):
+    """True if a loaded mapping is a live negative-cache entry"""
+    return mapping is not None and mapping["external_id"] is None
+
+
+def save_id_mapping(cur, dapp_id, provider, external_id, match_method, confidence=1.0):
+    """Upsert a positive mapping; it never expires"""
+    cur.execute(
+        """
+        INSERT INTO dapp_external_ids (
+            dapp_id, provider, external_id, match_method, confidence, verified_at, expires_at
+        )
+        VALUES (%s, %s, %s, %s, %s, CURRENT_TIMESTAMP, NULL)
+        ON CONFLICT (dapp_id, provider) DO UPDATE SET
+            external_id = EXCLUDED.external_id,
+            match_method = EXCLUDED.match_method,
+            confidence = EXCLUDED.confidence,
+            verified_at = EXCLUDED.verified_at,
+            expires_at = NULL;
+        """,
+        (dapp_id, provider, str(external_id), match_method, confidence)
+    )
+
+
+def save_id_miss(cur, dapp_id, provider, match_method, ttl_days=None):
+    """Upsert a negative-cache entry that expires after ttl_days"""
+    ttl_days = NEGATIVE_CACHE_TTL_DAYS if ttl_days is None else ttl_days
+    cur.execute(
+        """
+        INSERT INTO dapp_external_ids (
+            dapp_id, provider, external_id, match_method, confidence, verified_at, expires_at
+        )
+        VALUES (%s, %s, NULL, %s, 0, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP + make_interval(days => %s))
+        ON CONFLICT (dapp_id, provider) DO UPDATE SET
+            external_id = NULL,
+            match_method = EXCLUDED.match_method,
+            confidence = 0,
+            verified_at = EXCLUDED.verified_at,
+            expires_at = EXCLUDED.expires_at;
+        """,
+        (dapp_id, provider, match_method, ttl_days)
+    )
@@ -0,0 +1,169 @@
+"""
+Postgres-backed enrichment job queue.
+
+Jobs live in enrichment_jobs, one per (dapp_id, task). Workers on any host
+claim pending jobs with FOR UPDATE SKIP LOCKED, so concurrent workers never
+block on or double-process the same DApp. Running jobs are kept alive by
+heartbeats; jobs whose worker stopped heartbeating are handed out again,
+and jobs that keep failing are dead-lettered after max_attempts.
+"""
+from psycopg2.extras import execute_values
+
+from dapp_scraper.utils import CFG
+
+MAX_ATTEMPTS = CFG.getint("jobs", "max_attempts", fallback=5)
+RETRY_BASE_SECONDS = CFG.getint("jobs", "retry_base_seconds", fallback=60)
+STALE_AFTER_SECONDS = CFG.getint("jobs", "stale_after_seconds", fallback=300)
+HEARTBEAT_SECONDS = CFG.getint("jobs", "heartbeat_seconds", fallback=30)
+CLAIM_BATCH_SIZE = CFG.getint("jobs", "claim_batch_size", fallback=10)
+
+JOB_STATUSES = ("pending", "running", "done", "dead")
+
+
+def enqueue_jobs(cur, dapp_ids, task="enrich", priority=0):
+    """
+    Add jobs for dapp_ids. Finished and dead jobs are reset to pending;
+    jobs that are already pending or running are left alone.
+    Returns the number of jobs added or reset.
+    """
+    if not dapp_ids:
+        return 0
+    rows = execute_values(
+        cur,
+        """
+        INSERT INTO enrichment_jobs (dapp_id, task, priority, max_attempts)
+        VALUES %s
+        ON CONFLICT (dapp_id, task) DO UPDATE SET
+            status = 'pending',
+            priority = EXCLUDED.priority,
+            attempts = 0,
+            max_attempts = EXCLUDED.max_attempts,
+            run_after = CURRENT_TIMESTAMP,
+            last_error = NULL,
+            updated_at = CURRENT_TIMESTAMP
+        WHERE enrichment_jobs.status IN ('done', 'dead')
+        RETURNING job_id;
+        """,
+        [(dapp_id, task, priority, MAX_ATTEMPTS) for dapp_id in dapp_ids],
+        page_size=1000,
+        fetch=True
+    )
+    return len(rows)
+
+
+def claim_jobs(cur, worker_id, task="enrich", limit=None):
+    """
+    Claim up to limit runnable jobs for worker_id.
+    Commit right after claiming so other workers see the jobs as running.
+    Returns:
+        list of (job_id, dapp_id, attempts)
+    """
+    cur.execute(
+        """
+        UPDATE enrichment_jobs j SET
+            status = 'running',
+            attempts = j.attempts + 1,
+            locked_by = %s,
+            locked_at = CURRENT_TIMESTAMP,
+            heartbeat_at = CURRENT_TIMESTAMP,
+            updated_at = CURRENT_TIMESTAMP
+        FROM (
+            SELECT job_id
+            FROM enrichment_jobs
+            WHERE task = %s AND status = 'pending' AND run_after <= CURRENT_TIMESTAMP
+            ORDER BY priority DESC, job_id
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED
+        ) claimed
+        WHERE j.job_id = claimed.job_id
+        RETURNING j.job_id, j.dapp_id, j.attempts;
+        """,
+        (worker_id, task, limit or CLAIM_BATCH_SIZE)
+    )
+    return sorted(cur.fetchall())
+
+
+def heartbeat_jobs(cur, worker_id, job_ids):
+    """Refresh heartbeat_at of the jobs this worker still holds"""
+    if not job_ids:
+        return 0
+    cur.execute(
+        """
+        UPDATE enrichment_jobs SET heartbeat_at = CURRENT_TIMESTAMP
+        WHERE job_id = ANY(%s) AND locked_by = %s AND status = 'running';
+        """,
+        (list(job_ids), worker_id)
+    )
+    return cur.rowcount
+
+
+def complete_job(cur, job_id):
+    """Mark a job done; commit it in the same transaction as the job's writes"""
+    cur.execute(
+        """
+        UPDATE enrichment_jobs SET
+            status = 'done',
+            locked_by = NULL,
+            last_error = NULL,
+            finished_at = CURRENT_TIMESTAMP,
+            updated_at = CURRENT_TIMESTAMP
+        WHERE job_id = %s;
+        """,
+        (job_id,)
+    )
+
+
+def fail_job(cur, job_id, error):
+    """
+    Record a failed attempt: retry with exponential backoff, or move the job
+    to 'dead' once it has used up max_attempts.
+    Returns the new status.
+    """
+    cur.execute(
+        """
+        UPDATE enrichment_jobs SET
+            status = CASE WHEN attempts >= max_attempts THEN 'dead' ELSE 'pending' END,
+            run_after = CURRENT_TIMESTAMP
+                + make_interval(secs => %s * power(2, GREATEST(attempts - 1, 0))),
+            locked_by = NULL,
+            last_error = %s,
+            updated_at = CURRENT_TIMESTAMP
+        WHERE job_id = %s
+        RETURNING status;
+        """,
+        (RETRY_BASE_SECONDS, str(error)[:2000], job_id)
+    )
+    row = cur.fetchone()
+    return row[0] if row else None
+
+
+def requeue_stale_jobs(cur, stale_after_seconds=None):
+    """
+    Release running jobs whose worker stopped heartbeating. They count as a
+    failed attempt, so a job that keeps killing its worker ends up dead.
+    Returns the number of released jobs.
+    """
+    cur.execute(
+        """
+        UPDATE enrichment_jobs SET
+            status = CASE WHEN attempts >= max_attempts THEN 'dead' ELSE 'pending' END,
+            locked_by = NULL,
+            last_error = 'worker heartbeat lost',
+            updated_at = CURRENT_TIMESTAMP
+        WHERE status = 'running'
+          AND heartbeat_at < CURRENT_TIMESTAMP - make_interval(secs => %s);
+        """,
+        (stale_after_seconds or STALE_AFTER_SECONDS,)
+    )
+    return cur.rowcount
+
+
+def job_counts(cur, task="enrich"):
+    """Return {status: count} for a task"""
+    cur.execute(
+        "SELECT status, COUNT(*) FROM enrichment_jobs WHERE task = %s GROUP BY status;",
+        (task,)
+    )
+    counts = {status: 0 for status in JOB_STATUSES}
+    counts.update(dict(cur.fetchall()))
+    return counts
@@ -0,0 +1,96 @@
+"""
+Normalized chains and tags of DApps.
+
+dapps.chains and dapps.tags stay comma-separated text for the exports;
+dapp_chains and dapp_tags hold the same lists as (dapp_id, chain_id) and
+(dapp_id, tag_id) rows, with names interned in the chains and tags lookup
+tables. Every writer of the text columns calls sync_links for the DApps it
+wrote, so queries such as "DApps on chain X" or chain x category counts
+use btree indexes instead of splitting strings.
+"""
+from dapp_scraper.lookups import lookup
+
+# dapps column -> (association table, lookup table, id column)
+LINK_TABLES = {
+    "chains": ("dapp_chains", "chains", "chain_id"),
+    "tags": ("dapp_tags", "tags", "tag_id"),
+}
+
+
+def split_list(value):
+    """Distinct items of a comma-separated dapps.chains / dapps.tags value, in order"""
+    if not value:
+        return []
+    return list(dict.fromkeys(item.strip() for item in str(value).split(",") if item.strip()))
+
+
+def sync_links(cur, column, values_by_dapp):
+    """
+    Make the association table of a dapps column ("chains" or "tags")
+    match {dapp_id: comma-separated value}: links that are gone are
+    deleted and new ones inserted, one statement each.
+    Returns the number of links inserted.
+    """
+    link_table, lookup_table, id_column = LINK_TABLES[column]
+    items = {dapp_id: split_list(value) for dapp_id, value in values_by_dapp.items()}
+    if not items:
+        return 0
+    ids = lookup(lookup_table).resolve(item for values in items.values() for item in values)
+    pairs = list(dict.fromkeys(
+        (dapp_id, ids[item]) for dapp_id, values in items.items() for item in values if item in ids
+    ))
+    link_dapp_ids = [dapp_id for dapp_id, _ in pairs]
+    link_item_ids = [item_id for _, item_id in pairs]
+
+    cur.execute(
+        f"""
+        DELETE FROM {link_table} l
+        WHERE l.dapp_id = ANY(%s)
+          AND NOT EXISTS (
+              SELECT 1 FROM unnest(%s::integer[], %s::integer[]) AS p (dapp_id, item_id)
+              WHERE p.dapp_id = l.dapp_id AND p.item_id = l.{id_column}
+          );
+        """,
+        (list(items), link_dapp_ids, link_item_ids)
+    )
+    cur.execute(
+        f"""
+        INSERT INTO {link_table} (dapp_id, {id_column})
+        SELECT * FROM unnest(%s::integer[], %s::integer[])
+        ON CONFLICT DO NOTHING;
+        """,
+        (link_dapp_ids, link_item_ids)
+    )
+    return cur.rowcount
+
+
+def dapps_on_chain(cur, chain):
+    """(id, name, slug) of the DApps deployed on a chain"""
+    cur.execute(
+        """
+        SELECT d.id, d.name, d.slug
+        FROM chains c
+        JOIN dapp_chains dc ON dc.chain_id = c.id
+        JOIN dapps d ON d.id = dc.dapp_id
+        WHERE c.name = %s
+        ORDER BY d.name;
+        """,
+        (chain,)
+    )
+    return cur.fetchall()
+
+
+def chain_category_counts(cur):
+    """(chain, category, DApp count) rows of the chain x category matrix, largest first"""
+    cur.execute(
+        """
+        SELECT c.name, COALESCE(cat.name, 'Uncategorized'), COUNT(*)
+        FROM dapp_chains dc
+        JOIN chains c ON c.id = dc.chain_id
+        JOIN dapps d ON d.id = dc.dapp_id
+        LEFT JOIN categories cat ON cat.id = d.category_id
+        GROUP BY 1, 2
+        ORDER BY 3 DESC, 1, 2;
+        """
+    )
+    return cur.fetchall()
@@ -0,0 +1,166 @@
+"""
+Leveled logging for the scraper and its scripts.
+
+Modules log through get_logger(__name__); scripts use a "scripts.<name>"
+logger because __name__ is "__main__" when they run directly. Settings
+come from the [logging] config section:
+- level: DEBUG shows every request and payload, INFO (default) only
+  progress and run summaries
+- format: text (default) or json, one object per line that also carries
+  the fields passed through fields()
+- max_payload_chars: payloads logged with truncate() are cut to this size
+- progress_seconds: minimum interval between Progress lines
+
+LOG_LEVEL and LOG_FORMAT environment variables override the config for
+a single run.
+"""
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+from dapp_scraper.utils import CFG
+
+LEVEL = os.environ.get("LOG_LEVEL") or CFG.get("logging", "level", fallback="INFO")
+FORMAT = os.environ.get("LOG_FORMAT") or CFG.get("logging", "format", fallback="text")
+MAX_PAYLOAD_CHARS = CFG.getint("logging", "max_payload_chars", fallback=300)
+PROGRESS_SECONDS = CFG.getfloat("logging", "progress_seconds", fallback=10.0)
+
+# Logger namespaces that get our handler; everything else keeps Python's defaults
+ROOT_LOGGERS = ("dapp_scraper", "scripts")
+
+_configured = False
+_configure_lock = threading.Lock()
+
+
+class TextFormatter(logging.Formatter):
+    """Time, level and message; fields() values only go to JSON output"""
+
+    def format(self, record):
+        line = f"{datetime.fromtimestamp(record.created):%H:%M:%S} {record.levelname:<7} {record.getMessage()}"
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line for log shippers"""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+def configure(level=None, fmt=None):
+    """Attach the stdout handler to our logger namespaces; later calls only change the level"""
+    global _configured
+    with _configure_lock:
+        level = (level or LEVEL).upper()
+        if not _configured:
+            handler = logging.StreamHandler(sys.stdout)
+            handler.setFormatter(JsonFormatter() if (fmt or FORMAT) == "json" else TextFormatter())
+            for name in ROOT_LOGGERS:
+                logger = logging.getLogger(name)
+                logger.addHandler(handler)
+                logger.propagate = False
+            _configured = True
+        for name in ROOT_LOGGERS:
+            logging.getLogger(name).setLevel(level)
+
+
+def get_logger(name):
+    """Logger for a module, configured on first use"""
+    if not _configured:
+        configure()
+    return logging.getLogger(name)
+
+
+def fields(**values):
+    """Structured fields for a log call: log.info("msg", extra=fields(dapp_id=1))"""
+    return {"fields": values}
+
+
+class _Payload:
+    """Defers the repr of a payload until a handler actually formats it"""
+
+    def __init__(self, value, limit):
+        self.value = value
+        self.limit = limit
+
+    def __str__(self):
+        value = self.value
+        if isinstance(value, dict):
+            # Histories and raise lists are summarised by their length
+            value = {
+                key: f"<{len(item)} items>" if isinstance(item, (list, tuple)) and len(item) > 3 else item
+                for key, item in value.items()
+            }
+        text = value if isinstance(value, str) else repr(value)
+        if len(text) > self.limit:
+            return f"{text[:self.limit]}... ({len(text)} chars)"
+        return text
+
+
+def truncate(value, limit=None):
+    """Short, lazily built rendering of a payload for log messages"""
+    return _Payload(value, limit or MAX_PAYLOAD_CHARS)
+
+
+class Progress:
+    """
+    Rate-limited progress reporting for per-record loops. Every item is
+    logged at DEBUG; an INFO summary with rate and ETA is logged at most
+    every PROGRESS_SECONDS and for the last item. Safe to call from
+    several threads.
+    """
+
+    def __init__(self, logger, label, total=None, every=None):
+        self.logger = logger
+        self.label = label
+        self.total = total
+        self.every = PROGRESS_SECONDS if every is None else every
+        self.done = 0
+        self._started = time.time()
+        self._last = self._started
+        self._lock = threading.Lock()
+
+    def update(self, item=None, n=1):
+        with self._lock:
+            self.done += n
+            done = self.done
+            now = time.time()
+            due = now - self._last >= self.every or done == self.total
+            if due:
+                self._last = now
+
+        if item is not None:
+            self.logger.debug("[%s/%s] %s", done, self.total or "?", item)
+        if not due:
+            return
+
+        elapsed = now - self._started
+        rate = done / elapsed if elapsed > 0 else 0.0
+        if self.total:
+            eta = (self.total - done) / rate if rate else 0.0
+            self.logger.info(
+                "📈 %s: %s/%s (%.0f%%), %.1f/s, ETA %.0fs",
+                self.label, done, self.total, 100.0 * done / self.total, rate, eta,
+                extra=fields(progress=self.label, done=done, total=self.total, rate=round(rate, 2)),
+            )
+        else:
+            self.logger.info(
+                "📈 %s: %s done, %.1f/s", self.label, done, rate,
+                extra=fields(progress=self.label, done=done, rate=round(rate, 2)),
+            )
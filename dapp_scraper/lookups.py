@@ -0,0 +1,91 @@
+"""
+Write-through caches for small lookup tables.
+
+A LookupCache maps the unique key column of a dimension table (e.g.
+categories.name) to its id. It is loaded with one query on first use;
+values it has not seen yet are inserted together (INSERT ... ON CONFLICT
+DO NOTHING) and read back with one more query. New values are committed
+on their own pooled connection, so an id handed out never disappears
+with a caller's rolled back transaction.
+"""
+import threading
+
+from dapp_scraper.db import get_conn
+from dapp_scraper.log import get_logger
+
+log = get_logger(__name__)
+
+
+class LookupCache:
+    """name -> id cache of one lookup table; safe to share between threads"""
+
+    def __init__(self, table, key="name", id_column="id"):
+        self.table = table
+        self.key = key
+        self.id_column = id_column
+        self._ids = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        conn = get_conn()
+        try:
+            cur = conn.cursor()
+            cur.execute(f"SELECT {self.key}, {self.id_column} FROM {self.table};")
+            self._ids = dict(cur.fetchall())
+        finally:
+            conn.close()
+        log.debug("📇 Loaded %s %s", len(self._ids), self.table)
+
+    def _insert(self, values):
+        conn = get_conn()
+        try:
+            cur = conn.cursor()
+            cur.execute(
+                f"""
+                INSERT INTO {self.table} ({self.key})
+                SELECT unnest(%s::text[])
+                ON CONFLICT ({self.key}) DO NOTHING;
+                """,
+                (values,)
+            )
+            cur.execute(
+                f"SELECT {self.key}, {self.id_column} FROM {self.table} WHERE {self.key} = ANY(%s);",
+                (values,)
+            )
+            self._ids.update(cur.fetchall())
+            conn.commit()
+        finally:
+            conn.close()
+        log.debug("📇 Added %s new %s: %s", len(values), self.table, ", ".join(values))
+
+    def resolve(self, values):
+        """{value: id} for the non-blank values, inserting the ones not stored yet"""
+        wanted = {value for value in values if isinstance(value, str) and value.strip()}
+        with self._lock:
+            if self._ids is None:
+                self._load()
+            missing = sorted(value for value in wanted if value not in self._ids)
+            if missing:
+                self._insert(missing)
+            return {value: self._ids[value] for value in wanted if value in self._ids}
+
+    def get(self, value):
+        """id of one value (inserted if needed), None for a blank value"""
+        return self.resolve([value]).get(value)
+
+    def forget(self):
+        """Drop the cached ids; the next lookup reloads the table"""
+        with self._lock:
+            self._ids = None
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def lookup(table, key="name", id_column="id"):
+    """The process-wide cache of a lookup table"""
+    with _caches_lock:
+        if (table, key) not in _caches:
+            _caches[(table, key)] = LookupCache(table, key, id_column)
+        return _caches[(table, key)]
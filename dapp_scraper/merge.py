@@ -0,0 +1,155 @@
+"""
+Merge of provider results into one dapps row update.
+
+COLUMN_SOURCES declares, per dapps column, which provider fields may
+fill it and in which order of precedence. The first source with a
+present value wins; a reported 0 counts as present, so providers must
+leave fields they did not return as None. Columns without any value are
+left unchanged.
+Merged rows are written in batches with one UPDATE per page of DApps
+instead of one UPDATE per provider per DApp; price and market columns
+go to dapp_market_quotes instead of dapps.
+"""
+from psycopg2.extras import execute_values
+
+from dapp_scraper.utils import safe_numeric
+
+# Column -> (SQL type, ((provider, result key), ...) in order of precedence)
+COLUMN_SOURCES = {
+    "gecko_id": ("varchar", (("defillama", "gecko_id"), ("coingecko", "gecko_id"))),
+    "cmc_id": ("varchar", (("defillama", "cmc_id"), ("coinmarketcap", "cmc_id"))),
+    "token_symbol": ("varchar", (("defillama", "token_symbol"), ("coinmarketcap", "cmc_symbol"), ("coingecko", "gecko_symbol"))),
+    "mcap": ("numeric", (("defillama", "mcap"), ("coingecko", "market_cap"))),
+    "market_cap": ("numeric", (("coinmarketcap", "market_cap"), ("coingecko", "market_cap"))),
+    "price": ("numeric", (("coinmarketcap", "price"), ("coingecko", "price"))),
+    "volume_24h": ("numeric", (("coinmarketcap", "volume_24h"), ("coingecko", "volume_24h"))),
+    "volume_change_24h": ("numeric", (("coinmarketcap", "volume_change_24h"),)),
+    "percent_change_1h": ("numeric", (("coinmarketcap", "percent_change_1h"),)),
+    "percent_change_24h": ("numeric", (("coinmarketcap", "percent_change_24h"), ("coingecko", "price_change_24h"))),
+    "percent_change_7d": ("numeric", (("coinmarketcap", "percent_change_7d"), ("coingecko", "price_change_7d"))),
+    "percent_change_30d": ("numeric", (("coinmarketcap", "percent_change_30d"), ("coingecko", "price_change_30d"))),
+    "percent_change_60d": ("numeric", (("coinmarketcap", "percent_change_60d"),)),
+    "percent_change_90d": ("numeric", (("coinmarketcap", "percent_change_90d"),)),
+    "market_cap_dominance": ("numeric", (("coinmarketcap", "market_cap_dominance"),)),
+    "fully_diluted_market_cap": ("numeric", (("coinmarketcap", "fully_diluted_market_cap"), ("coingecko", "fully_diluted_valuation"))),
+    "circulating_supply": ("numeric", (("coinmarketcap", "circulating_supply"), ("coingecko", "circulating_supply"))),
+    "total_supply": ("numeric", (("coinmarketcap", "total_supply"), ("coingecko", "total_supply"))),
+    "max_supply": ("numeric", (("coinmarketcap", "max_supply"), ("coingecko", "max_supply"))),
+    "cmc_rank": ("integer", (("coinmarketcap", "cmc_rank"), ("coingecko", "market_cap_rank"))),
+    "tvl": ("numeric", (("coinmarketcap", "tvl"), ("coingecko", "tvl"))),
+    "tvl_ratio": ("numeric", (("coinmarketcap", "tvl_ratio"),)),
+}
+
+# Provider tag fields appended to the existing tags, in this order
+TAG_SOURCES = (("coinmarketcap", "cmc_tags"), ("coingecko", "gecko_categories"))
+
+MERGED_COLUMNS = tuple(COLUMN_SOURCES) + ("tags",)
+
+
+def _present(value):
+    """Missing and empty values never override another source; a real 0 does"""
+    return value is not None and value != ""
+
+
+def merge_provider_results(results, existing_tags=None):
+    """
+    Merge provider results for one DApp.
+    Args:
+        results: {provider: result dict or None}
+        existing_tags: current dapps.tags
+    Returns:
+        dict: {column: value} for the columns that get a new value
+    """
+    from dapp_scraper.store import combine_tags
+
+    merged = {}
+    for column, (sql_type, sources) in COLUMN_SOURCES.items():
+        for provider, key in sources:
+            value = (results.get(provider) or {}).get(key)
+            if sql_type != "varchar":
+                value = safe_numeric(value, None)
+            if _present(value):
+                merged[column] = int(value) if sql_type == "integer" else value
+                break
+
+    tags = existing_tags
+    for provider, key in TAG_SOURCES:
+        provider_tags = (results.get(provider) or {}).get(key)
+        if provider_tags:
+            tags = combine_tags(tags, provider_tags) if tags else provider_tags
+    if tags != existing_tags:
+        merged["tags"] = tags
+    return merged
+
+
+def write_merged_updates(cur, updates, page_size=500):
+    """
+    Write merged rows with one UPDATE of dapps and one upsert of
+    dapp_market_quotes per page of DApps; a DApp whose merge only has
+    quote values leaves its dapps row untouched.
+    Args:
+        updates: {dapp_id: merged dict from merge_provider_results}
+    Returns:
+        int: number of DApps updated
+    """
+    from dapp_scraper.links import sync_links
+    from dapp_scraper.store import QUOTE_COLUMNS
+
+    updates = {dapp_id: merged for dapp_id, merged in updates.items() if merged}
+    if not updates:
+        return 0
+
+    dapp_columns = [column for column in MERGED_COLUMNS if column not in QUOTE_COLUMNS]
+    quote_columns = [column for column in MERGED_COLUMNS if column in QUOTE_COLUMNS]
+
+    # NULL in the VALUES list means "keep the current value"
+    def rows_and_template(columns):
+        rows = [
+            (dapp_id,) + tuple(merged.get(column) for column in columns)
+            for dapp_id, merged in updates.items()
+            if any(column in merged for column in columns)
+        ]
+        types = [COLUMN_SOURCES[column][0] if column in COLUMN_SOURCES else "text" for column in columns]
+        return rows, "(%s, " + ", ".join(f"%s::{sql_type}" for sql_type in types) + ")"
+
+    rows, template = rows_and_template(dapp_columns)
+    if rows:
+        assignments = ",\n            ".join(f"{column} = COALESCE(v.{column}, d.{column})" for column in dapp_columns)
+        execute_values(
+            cur,
+            f"""
+            UPDATE dapps d SET
+                {assignments},
+                updated_at = CURRENT_TIMESTAMP
+            FROM (VALUES %s) AS v (id, {", ".join(dapp_columns)})
+            WHERE d.id = v.id;
+            """,
+            rows,
+            template=template,
+            page_size=page_size
+        )
+        sync_links(cur, "tags", {dapp_id: merged["tags"] for dapp_id, merged in updates.items() if "tags" in merged})
+
+    rows, template = rows_and_template(quote_columns)
+    if rows:
+        merged_values = [f"COALESCE(EXCLUDED.{column}, q.{column})" for column in quote_columns]
+        assignments = ",\n                ".join(
+            f"{column} = {value}" for column, value in zip(quote_columns, merged_values)
+        )
+        # Unchanged quotes are not rewritten at all
+        execute_values(
+            cur,
+            f"""
+            INSERT INTO dapp_market_quotes AS q (dapp_id, {", ".join(quote_columns)})
+            VALUES %s
+            ON CONFLICT (dapp_id) DO UPDATE SET
+                {assignments},
+                updated_at = CURRENT_TIMESTAMP
+            WHERE ({", ".join(merged_values)})
+                IS DISTINCT FROM ({", ".join(f"q.{column}" for column in quote_columns)});
+            """,
+            rows,
+            template=template,
+            page_size=page_size
+        )
+    return len(updates)
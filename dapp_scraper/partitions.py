@@ -0,0 +1,88 @@
+"""
+Date range partitions created on demand.
+
+Tables partitioned by RANGE on a date column get one partition per month
+(<table>_<yyyy>_<mm>) or per year (<table>_<yyyy>). There is no default
+partition: rows for a range without a partition would otherwise end up in
+it and then block creating the right one. Writers call ensure_partitions
+with the dates they are about to insert. Partitions that are committed are
+remembered per process, so the catalog is only read again when a date
+falls outside them. Missing partitions are created in the caller's
+transaction and are only remembered once the catalog shows them committed,
+so a rolled back batch never leaves a partition that does not exist behind.
+"""
+import threading
+from datetime import date
+
+from dapp_scraper.db import get_conn
+from dapp_scraper.log import get_logger
+
+log = get_logger(__name__)
+
+_committed = {}
+_lock = threading.Lock()
+
+
+def _as_date(day):
+    return day if isinstance(day, date) else date.fromisoformat(str(day)[:10])
+
+
+def partition_range(table, day, interval="month"):
+    """(partition name, first day, first day after) of the partition holding day"""
+    day = _as_date(day)
+    if interval == "year":
+        return f"{table}_{day.year}", date(day.year, 1, 1), date(day.year + 1, 1, 1)
+    start = date(day.year, day.month, 1)
+    end = date(day.year + 1, 1, 1) if day.month == 12 else date(day.year, day.month + 1, 1)
+    return f"{table}_{day.year}_{day.month:02d}", start, end
+
+
+def committed_partitions(table):
+    """Names of the committed partitions of table, read on a pooled connection of its own"""
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = to_regclass(%s);
+            """,
+            (table,)
+        )
+        return {row[0] for row in cur.fetchall()}
+    finally:
+        conn.close()
+
+
+def ensure_partitions(cur, table, days, interval="month"):
+    """
+    Create the partitions of table that days (dates or ISO date strings)
+    need and that do not exist yet, in the transaction of cur.
+    Returns the names of the partitions created.
+    """
+    needed = {partition_range(table, day, interval) for day in days if day}
+    with _lock:
+        known = _committed.setdefault(table, set())
+        missing = [spec for spec in needed if spec[0] not in known]
+    if not missing:
+        return []
+
+    existing = committed_partitions(table)
+    with _lock:
+        known.update(existing)
+
+    created = []
+    for name, start, end in sorted(missing, key=lambda spec: spec[1]):
+        if name in existing:
+            continue
+        cur.execute(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} FOR VALUES FROM (%s) TO (%s);",
+            (start, end)
+        )
+        created.append(name)
+    if created:
+        # Repeated until the creating transaction commits (CREATE ... IF NOT EXISTS is then a no-op)
+        log.debug("🧱 Created %s partition(s) of %s: %s", len(created), table, ", ".join(created))
+    return created
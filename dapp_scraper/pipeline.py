@@ -0,0 +1,162 @@
+"""
+Bounded-queue pipeline for overlapping network, parsing and DB work.
+
+A pipeline is a source iterable followed by stages. Each stage runs its own
+worker threads and reads from a bounded queue, so a slow stage makes the
+stages before it block on put() instead of piling items up in memory.
+Stages that keep state (a DB cursor, a dedup dict) must use workers=1.
+
+An error in a handler is logged and counted, and the pipeline goes on with
+the next item. In a fail_fast stage (typically the DB writer: once its
+transaction or connection is gone every later item fails too) the first
+error stops the pipeline instead: the source stops feeding, queued items
+are drained without being handled, on_close hooks are skipped and
+run_pipeline re-raises the error.
+"""
+import queue
+import threading
+import time
+
+from dapp_scraper.log import get_logger
+
+log = get_logger(__name__)
+
+_DONE = object()
+
+
+class Stage:
+    """
+    One pipeline step.
+    Args:
+        name: Label used in stats and error messages
+        handler: Callable(item) -> iterable of outputs for the next stage
+        workers: Number of threads running handler
+        queue_size: Capacity of this stage's input queue
+        on_close: Optional callable run once after the last worker finishes
+        fail_fast: Stop the whole pipeline on the first error of this stage
+                   (an error in on_close always stops it)
+    """
+
+    def __init__(self, name, handler, workers=1, queue_size=64, on_close=None, fail_fast=False):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.queue_size = queue_size
+        self.on_close = on_close
+        self.fail_fast = fail_fast
+
+
+def run_pipeline(source, stages):
+    """
+    Feed source through stages and block until everything is processed.
+    Returns:
+        dict: {stage name: {"in", "out", "errors", "busy_seconds"}} plus
+              "elapsed_seconds" for the whole run
+    Raises:
+        The first error of a fail_fast stage or of an on_close hook
+    """
+    started = time.time()
+    queues = [queue.Queue(maxsize=stage.queue_size) for stage in stages]
+    stats = {stage.name: {"in": 0, "out": 0, "errors": 0, "busy_seconds": 0.0} for stage in stages}
+    stats_lock = threading.Lock()
+    remaining = [stage.workers for stage in stages]
+    aborted = threading.Event()
+    fatal = []
+
+    def abort(stage, error):
+        with stats_lock:
+            fatal.append(error)
+        if not aborted.is_set():
+            log.error("🛑 Pipeline stopped by stage '%s': %s", stage.name, error)
+        aborted.set()
+
+    def worker(index):
+        stage = stages[index]
+        inbox = queues[index]
+        outbox = queues[index + 1] if index + 1 < len(stages) else None
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                break
+            if aborted.is_set():
+                # Drain the queue so upstream stages blocked on put() can finish
+                continue
+            busy_from = time.time()
+            produced = 0
+            try:
+                for output in stage.handler(item) or ():
+                    produced += 1
+                    if outbox is not None:
+                        outbox.put(output)
+                errored = 0
+            except Exception as e:
+                log.error("❌ Pipeline stage '%s' failed on an item: %s", stage.name, e)
+                errored = 1
+                if stage.fail_fast:
+                    abort(stage, e)
+            with stats_lock:
+                stage_stats = stats[stage.name]
+                stage_stats["in"] += 1
+                stage_stats["out"] += produced
+                stage_stats["errors"] += errored
+                stage_stats["busy_seconds"] += time.time() - busy_from
+
+        # The last worker of a stage closes it and releases the next stage
+        with stats_lock:
+            remaining[index] -= 1
+            last = remaining[index] == 0
+        if last:
+            if stage.on_close and not aborted.is_set():
+                try:
+                    stage.on_close()
+                except Exception as e:
+                    log.error("❌ Pipeline stage '%s' failed to close: %s", stage.name, e)
+                    with stats_lock:
+                        stats[stage.name]["errors"] += 1
+                    abort(stage, e)
+            if outbox is not None:
+                for _ in range(stages[index + 1].workers):
+                    outbox.put(_DONE)
+
+    threads = []
+    for index, stage in enumerate(stages):
+        for n in range(stage.workers):
+            thread = threading.Thread(target=worker, args=(index,), name=f"{stage.name}-{n}", daemon=True)
+            thread.start()
+            threads.append(thread)
+
+    try:
+        for item in source:
+            if aborted.is_set():
+                break
+            queues[0].put(item)
+    finally:
+        for _ in range(stages[0].workers):
+            queues[0].put(_DONE)
+        for thread in threads:
+            thread.join()
+
+    stats["elapsed_seconds"] = time.time() - started
+    if fatal:
+        raise fatal[0]
+    return stats
+
+
+def pipeline_errors(stats):
+    """Total number of items that failed in any stage"""
+    return sum(
+        stage_stats["errors"] for name, stage_stats in stats.items() if name != "elapsed_seconds"
+    )
+
+
+def print_pipeline_stats(stats):
+    """Log per-stage throughput so the bottleneck stage is obvious"""
+    elapsed = stats.get("elapsed_seconds", 0.0)
+    log.info("⏱️ Pipeline finished in %.1fs", elapsed)
+    for name, stage_stats in stats.items():
+        if name == "elapsed_seconds":
+            continue
+        log.info(
+            "  • %s: %s in, %s out, %s errors, %.1fs busy",
+            name, stage_stats["in"], stage_stats["out"], stage_stats["errors"], stage_stats["busy_seconds"],
+        )
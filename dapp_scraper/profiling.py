@@ -0,0 +1,215 @@
+"""
+Profiling for scraper scripts and analytics stages.
+
+Two modes:
+- sample (default): a background thread snapshots every thread's stack
+  every DEFAULT_INTERVAL seconds. It is cheap enough to leave on for
+  production runs. Stacks are written in folded format, one
+  "frame;frame;frame count" line per stack, for flamegraph.pl or
+  speedscope. Each stack starts with the active run phase and the thread name.
+- cprofile: deterministic cProfile of the whole run, saved as .prof for
+  snakeviz/pstats. Costly, meant for local investigation.
+
+Both write a top-N hot function summary next to the raw output in
+profiles/. Scripts enable it with --profile / --profile=cprofile
+(profile_from_argv). Any other script can be run through
+`python -m dapp_scraper.profiling [--cprofile] script.py [args]`.
+
+Only the standard library is used so the analytics stages can import it.
+"""
+import cProfile
+import io
+import os
+import pstats
+import runpy
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import nullcontext
+from datetime import datetime
+
+DEFAULT_INTERVAL = 0.01
+TOP_N = 25
+OUTPUT_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "profiles"))
+
+
+def _current_phase():
+    """Active run_metrics phase, if a run is being recorded in this process"""
+    run_metrics = sys.modules.get("dapp_scraper.run_metrics")
+    return run_metrics.current_phase() if run_metrics else None
+
+
+def _frame_label(code):
+    return f"{os.path.basename(code.co_filename).rsplit('.', 1)[0]}:{code.co_name}"
+
+
+class _Sampler(threading.Thread):
+    def __init__(self, interval):
+        super().__init__(name="profiler", daemon=True)
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self.stopped = threading.Event()
+
+    def run(self):
+        me = threading.get_ident()
+        while not self.stopped.wait(self.interval):
+            phase = _current_phase() or "main"
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                stack.append(phase)
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+
+class Profiler:
+    """Context manager profiling the enclosed code in sample or cprofile mode"""
+
+    def __init__(self, name, mode="sample", interval=DEFAULT_INTERVAL, top_n=TOP_N, output_dir=None):
+        if mode not in ("sample", "cprofile"):
+            raise ValueError(f"Unknown profile mode: {mode}")
+        self.name = name
+        self.mode = mode
+        self.interval = interval
+        self.top_n = top_n
+        self.output_dir = output_dir or OUTPUT_DIR
+        self._sampler = None
+        self._profile = None
+
+    def __enter__(self):
+        self._started = time.time()
+        print(f"🔬 Profiling {self.name} ({self.mode})")
+        if self.mode == "cprofile":
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            self._sampler = _Sampler(self.interval)
+            self._sampler.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._profile:
+            self._profile.disable()
+        if self._sampler:
+            self._sampler.stopped.set()
+            self._sampler.join()
+        try:
+            self.write()
+        except Exception as e:
+            print(f"⚠️ Could not write profile: {e}")
+        return False
+
+    def write(self):
+        """Write the raw profile and the top-N summary; returns their paths"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, f"{self.name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        elapsed = time.time() - self._started
+
+        if self._profile:
+            raw_path = base + ".prof"
+            self._profile.dump_stats(raw_path)
+            summary = self._cprofile_summary(elapsed)
+        else:
+            raw_path = base + ".folded"
+            with open(raw_path, "w") as f:
+                for stack, count in sorted(self._sampler.stacks.items()):
+                    f.write(f"{stack} {count}\n")
+            summary = self._sample_summary(elapsed)
+
+        summary_path = base + "_top.txt"
+        with open(summary_path, "w") as f:
+            f.write(summary)
+        print(summary)
+        print(f"🔬 Profile written to {raw_path} and {summary_path}")
+        return raw_path, summary_path
+
+    def _cprofile_summary(self, elapsed):
+        out = io.StringIO()
+        out.write(f"{self.name}: cProfile over {elapsed:.1f}s\n")
+        stats = pstats.Stats(self._profile, stream=out)
+        for sort_key in ("tottime", "cumulative"):
+            out.write(f"\nTop {self.top_n} by {sort_key}:\n")
+            stats.sort_stats(sort_key).print_stats(self.top_n)
+        return out.getvalue()
+
+    def _sample_summary(self, elapsed):
+        stacks = self._sampler.stacks
+        total = sum(stacks.values()) or 1
+        self_counts = Counter()
+        inclusive_counts = Counter()
+        phase_counts = Counter()
+        for stack, count in stacks.items():
+            phase, _thread, *frames = stack.split(";")
+            phase_counts[phase] += count
+            if frames:
+                self_counts[frames[-1]] += count
+            for frame in set(frames):
+                inclusive_counts[frame] += count
+
+        lines = [
+            f"{self.name}: {self._sampler.samples} samples every {self.interval * 1000:.0f}ms "
+            f"over {elapsed:.1f}s ({total} thread stacks)",
+            "",
+            "Samples by phase:",
+        ]
+        lines += [f"  {count / total:6.1%}  {phase}" for phase, count in phase_counts.most_common()]
+        lines += ["", f"Top {self.top_n} by self samples (waits show up as threading/queue/socket frames):"]
+        lines += [f"  {count / total:6.1%}  {frame}" for frame, count in self_counts.most_common(self.top_n)]
+        lines += ["", f"Top {self.top_n} by inclusive samples:"]
+        lines += [f"  {count / total:6.1%}  {frame}" for frame, count in inclusive_counts.most_common(self.top_n)]
+        return "\n".join(lines) + "\n"
+
+
+def profile_from_argv(name, argv=None):
+    """
+    Return a Profiler if --profile or --profile=cprofile is on the command
+    line, else a no-op context. The flag is removed from argv so the
+    script's own argument parsing is unaffected.
+    """
+    argv = sys.argv if argv is None else argv
+    for arg in list(argv[1:]):
+        if arg == "--profile" or arg.startswith("--profile="):
+            argv.remove(arg)
+            mode = arg.split("=", 1)[1] if "=" in arg else "sample"
+            return Profiler(name, mode=mode)
+    return nullcontext()
+
+
+def main():
+    """python -m dapp_scraper.profiling [--cprofile] [--interval S] script.py [args]"""
+    args = sys.argv[1:]
+    mode = "sample"
+    interval = DEFAULT_INTERVAL
+    while args and args[0].startswith("--"):
+        flag = args.pop(0)
+        if flag == "--cprofile":
+            mode = "cprofile"
+        elif flag == "--interval" and args:
+            interval = float(args.pop(0))
+        else:
+            print(f"❌ Error: Unknown option {flag}")
+            args = []
+            break
+    if not args:
+        print("Usage: python -m dapp_scraper.profiling [--cprofile] [--interval S] script.py [args]")
+        sys.exit(1)
+
+    script = args[0]
+    sys.argv = args
+    # Like `python script.py`: the script's folder comes first on sys.path
+    sys.path.insert(0, os.path.dirname(os.path.abspath(script)))
+    name = os.path.basename(script).rsplit(".", 1)[0]
+    with Profiler(name, mode=mode, interval=interval):
+        runpy.run_path(script, run_name="__main__")
+
+
+if __name__ == "__main__":
+    main()
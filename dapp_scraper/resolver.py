@@ -0,0 +1,187 @@
+"""
+Blocked fuzzy entity resolution between DApps and provider catalogs.
+
+Comparing every DApp with every CoinGecko / CMC / DeFiLlama entry is
+O(N x M), so candidates are first grouped into blocks (name tokens, a
+compact-name prefix and the token symbol). Only DApps and candidates that
+share a block are scored, one vectorized rapidfuzz cdist call per block.
+
+The blended score treats a name that contains the candidate's name as a
+near-perfect match ("Magic Eden" vs "Magic"), so every ranked candidate
+also says what confirms it: the same token symbol, the same website domain,
+or a full-string name score. Only confirmed matches are safe to store.
+"""
+import re
+from collections import defaultdict
+
+import numpy as np
+from rapidfuzz import fuzz, process
+from rapidfuzz.distance import JaroWinkler
+
+# Scores are 0-100; confirmed matches at or above ACCEPT_SCORE are safe to store,
+# the rest from REVIEW_SCORE up are returned as candidates for manual review
+ACCEPT_SCORE = 92
+REVIEW_SCORE = 80
+
+# Blocks larger than this come from generic tokens ("finance", "swap") and are skipped
+MAX_BLOCK_SIZE = 500
+
+SYMBOL_BONUS = 8
+TOKEN_SET_WEIGHT = 0.6
+JARO_WINKLER_WEIGHT = 0.4
+
+_VERSION_RE = re.compile(r"\bv\d+\b")
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+_STOPWORDS = {"the", "protocol", "finance", "network", "app", "dapp", "io", "exchange", "labs", "token"}
+
+
+def normalize_name(name):
+    """Lower-case, drop version suffixes ("V3") and punctuation"""
+    if not name:
+        return ""
+    lowered = _VERSION_RE.sub(" ", str(name).lower())
+    return " ".join(_NON_ALNUM_RE.sub(" ", lowered).split())
+
+
+def blocking_keys(normalized, symbol=None):
+    """Block keys for a normalized name: informative tokens, a 4-char prefix and the symbol"""
+    keys = set()
+    tokens = [t for t in normalized.split() if len(t) >= 3 and t not in _STOPWORDS]
+    keys.update(f"tok:{t}" for t in tokens)
+    compact = normalized.replace(" ", "")
+    if len(compact) >= 4:
+        keys.add(f"pre:{compact[:4]}")
+    if symbol:
+        keys.add(f"sym:{str(symbol).lower()}")
+    return keys
+
+
+def candidates_from_coingecko(coins):
+    """CoinGecko /coins/list entries -> resolver candidates"""
+    return [
+        {"provider": "coingecko", "external_id": c.get("id"), "name": c.get("name"), "symbol": c.get("symbol")}
+        for c in coins or []
+        if c.get("id") and c.get("name")
+    ]
+
+
+def candidates_from_coinmarketcap(coins):
+    """CMC /v1/cryptocurrency/map entries -> resolver candidates"""
+    return [
+        {"provider": "coinmarketcap", "external_id": str(c.get("id")), "name": c.get("name"), "symbol": c.get("symbol")}
+        for c in coins or []
+        if c.get("id") and c.get("name")
+    ]
+
+
+def candidates_from_defillama(protocols):
+    """DeFiLlama /protocols entries -> resolver candidates (external_id is the slug)"""
+    from dapp_scraper.dedup import website_domain
+
+    return [
+        {
+            "provider": "defillama", "external_id": p.get("slug"), "name": p.get("name"),
+            "symbol": p.get("symbol"), "domain": website_domain(p.get("url")),
+        }
+        for p in protocols or []
+        if p.get("slug") and p.get("name")
+    ]
+
+
+class EntityResolver:
+    """
+    Index of provider candidates that ranks fuzzy matches for batches of DApps.
+
+    Build it once per run from the downloaded catalogs, then call resolve()
+    with every DApp that still lacks a mapping.
+    """
+
+    def __init__(self, candidates):
+        self.candidates = [c for c in candidates if normalize_name(c["name"])]
+        self.names = [normalize_name(c["name"]) for c in self.candidates]
+        self.symbols = [str(c.get("symbol") or "").lower() for c in self.candidates]
+        self.domains = [c.get("domain") or "" for c in self.candidates]
+        self.blocks = defaultdict(list)
+        for idx, (name, symbol) in enumerate(zip(self.names, self.symbols)):
+            for key in blocking_keys(name, symbol):
+                self.blocks[key].append(idx)
+
+    def resolve(self, dapps, min_score=REVIEW_SCORE, top_n=3):
+        """
+        Rank candidates for each DApp.
+        Args:
+            dapps: list of dicts with "name" and optional "symbol" and "domain"
+            min_score: drop candidates scoring below this
+            top_n: best candidates kept per DApp and provider
+        Returns:
+            list (aligned with dapps) of candidate lists sorted by score, each
+            candidate a copy of the catalog entry plus "score" and
+            "confirmed_by" ("symbol", "domain", "name" or None)
+        """
+        query_names = [normalize_name(d.get("name")) for d in dapps]
+        query_symbols = [str(d.get("symbol") or "").lower() for d in dapps]
+
+        query_blocks = defaultdict(list)
+        for qi, (name, symbol) in enumerate(zip(query_names, query_symbols)):
+            if not name:
+                continue
+            for key in blocking_keys(name, symbol):
+                if key in self.blocks:
+                    query_blocks[key].append(qi)
+
+        # Best score per (dapp, candidate) pair over all shared blocks
+        best = defaultdict(dict)
+        for key, q_idx in query_blocks.items():
+            c_idx = self.blocks[key]
+            if len(c_idx) > MAX_BLOCK_SIZE:
+                continue
+            scores = self._score_block(query_names, query_symbols, q_idx, c_idx)
+            rows, cols = np.nonzero(scores >= min_score)
+            for r, c in zip(rows, cols):
+                qi, ci = q_idx[r], c_idx[c]
+                score = float(scores[r, c])
+                if score > best[qi].get(ci, -1.0):
+                    best[qi][ci] = score
+
+        results = []
+        for qi in range(len(dapps)):
+            per_provider = defaultdict(list)
+            for ci, score in best.get(qi, {}).items():
+                per_provider[self.candidates[ci]["provider"]].append((score, ci))
+            ranked = []
+            for matches in per_provider.values():
+                matches.sort(key=lambda m: -m[0])
+                ranked.extend(
+                    {
+                        **self.candidates[ci],
+                        "score": round(score, 1),
+                        "confirmed_by": self._confirmed_by(query_names[qi], query_symbols[qi], dapps[qi].get("domain"), ci),
+                    }
+                    for score, ci in matches[:top_n]
+                )
+            ranked.sort(key=lambda c: -c["score"])
+            results.append(ranked)
+        return results
+
+    def _confirmed_by(self, name, symbol, domain, ci):
+        """What backs a match beyond the blended score, or None for a bare subset match"""
+        if symbol and symbol == self.symbols[ci]:
+            return "symbol"
+        if domain and domain == self.domains[ci]:
+            return "domain"
+        if fuzz.token_sort_ratio(name, self.names[ci]) >= ACCEPT_SCORE:
+            return "name"
+        return None
+
+    def _score_block(self, query_names, query_symbols, q_idx, c_idx):
+        """Vectorized token-set / Jaro-Winkler blend with a symbol bonus for one block"""
+        q_names = [query_names[i] for i in q_idx]
+        c_names = [self.names[i] for i in c_idx]
+        token_set = process.cdist(q_names, c_names, scorer=fuzz.token_set_ratio, dtype=np.float32, workers=-1)
+        jaro = process.cdist(q_names, c_names, scorer=JaroWinkler.normalized_similarity, dtype=np.float32, workers=-1)
+        scores = TOKEN_SET_WEIGHT * token_set + JARO_WINKLER_WEIGHT * 100 * jaro
+
+        q_sym = np.array([query_symbols[i] for i in q_idx], dtype=object)
+        c_sym = np.array([self.symbols[i] for i in c_idx], dtype=object)
+        same_symbol = (q_sym[:, None] == c_sym[None, :]) & (q_sym[:, None] != "")
+        return np.minimum(scores + SYMBOL_BONUS * same_symbol, 100.0)
@@ -0,0 +1,135 @@
+"""
+Run journal for long enrichment runs.
+
+Every run gets a row in enrichment_runs and every processed DApp a row in
+enrichment_run_items. Items are committed together with the enrichment
+data in batches, so after a crash or Ctrl-C the journal shows exactly which
+DApps are done and a resumed run only processes the rest.
+"""
+import logging
+
+from psycopg2.extras import execute_values
+
+from dapp_scraper.log import get_logger
+from dapp_scraper.utils import CFG
+
+log = get_logger(__name__)
+
+COMMIT_BATCH_SIZE = CFG.getint("enrichment", "commit_batch_size", fallback=50)
+
+# Item statuses that count as done; failed DApps are retried on resume
+DONE_STATUSES = ("enriched", "no_data")
+
+
+def start_run(cur, total_dapps, incremental_tvl=True):
+    """Create a run row and return its run_id"""
+    cur.execute(
+        """
+        INSERT INTO enrichment_runs (status, incremental_tvl, total_dapps)
+        VALUES ('running', %s, %s)
+        RETURNING run_id;
+        """,
+        (incremental_tvl, total_dapps)
+    )
+    return cur.fetchone()[0]
+
+
+def load_run(cur, run_id):
+    """Return a run as a dict, or None if it does not exist"""
+    cur.execute(
+        """
+        SELECT run_id, status, incremental_tvl, total_dapps, processed_dapps,
+               enriched_dapps, last_dapp_id, started_at, finished_at
+        FROM enrichment_runs
+        WHERE run_id = %s;
+        """,
+        (run_id,)
+    )
+    row = cur.fetchone()
+    if not row:
+        return None
+    keys = (
+        "run_id", "status", "incremental_tvl", "total_dapps", "processed_dapps",
+        "enriched_dapps", "last_dapp_id", "started_at", "finished_at",
+    )
+    return dict(zip(keys, row))
+
+
+def reopen_run(cur, run_id):
+    """Mark an interrupted or failed run as running again"""
+    cur.execute(
+        "UPDATE enrichment_runs SET status = 'running', finished_at = NULL WHERE run_id = %s;",
+        (run_id,)
+    )
+
+
+def finish_run(cur, run_id, status):
+    """Close a run as completed, interrupted or failed"""
+    cur.execute(
+        "UPDATE enrichment_runs SET status = %s, finished_at = CURRENT_TIMESTAMP WHERE run_id = %s;",
+        (status, run_id)
+    )
+
+
+class RunCheckpointer:
+    """
+    Collects per-DApp outcomes and commits them together with the pending
+    enrichment writes every batch_size DApps. before_commit runs right
+    before each commit, e.g. to write buffered rows. Checkpoints of single
+    DApps (batch_size=1, streaming) are only logged at debug level.
+    """
+
+    def __init__(self, conn, cur, run_id, batch_size=None, processed=0, enriched=0, before_commit=None):
+        self.conn = conn
+        self.cur = cur
+        self.run_id = run_id
+        self.batch_size = batch_size or COMMIT_BATCH_SIZE
+        self.processed = processed
+        self.enriched = enriched
+        self.before_commit = before_commit
+        self.pending = []
+
+    def add(self, dapp_id, status, error=None):
+        self.pending.append((self.run_id, dapp_id, status, error))
+        self.processed += 1
+        if status == "enriched":
+            self.enriched += 1
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Journal the pending items, move the cursor and commit"""
+        if not self.pending:
+            return
+        if self.before_commit:
+            self.before_commit()
+        execute_values(
+            self.cur,
+            """
+            INSERT INTO enrichment_run_items (run_id, dapp_id, status, error)
+            VALUES %s
+            ON CONFLICT (run_id, dapp_id) DO UPDATE SET
+                status = EXCLUDED.status,
+                error = EXCLUDED.error,
+                processed_at = CURRENT_TIMESTAMP;
+            """,
+            self.pending,
+            page_size=1000
+        )
+        self.cur.execute(
+            """
+            UPDATE enrichment_runs SET
+                processed_dapps = %s,
+                enriched_dapps = %s,
+                last_dapp_id = %s,
+                checkpointed_at = CURRENT_TIMESTAMP
+            WHERE run_id = %s;
+            """,
+            (self.processed, self.enriched, self.pending[-1][1], self.run_id)
+        )
+        self.conn.commit()
+        log.log(
+            logging.DEBUG if self.batch_size == 1 else logging.INFO,
+            "💾 Checkpoint: %s DApps processed in run %s", self.processed, self.run_id
+        )
+        self.pending = []
@@ -0,0 +1,199 @@
+"""
+Run records for fetch, enrichment and export entry points.
+
+An entry point calls start_run() and finishes it with RunRecorder.finish().
+In between, library code reports through the module-level count() and
+record_request() helpers, which do nothing when no run is active.
+finish() writes the record to the runs table and to a JSON manifest in
+manifest_dir ([runs] config section).
+"""
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from urllib.parse import urlparse
+
+from dapp_scraper.log import get_logger
+from dapp_scraper.utils import CFG
+
+log = get_logger(__name__)
+
+# Relative manifest_dir values are taken from the repository root
+MANIFEST_DIR = os.path.join(
+    os.path.dirname(__file__), os.pardir, CFG.get("runs", "manifest_dir", fallback="runs")
+)
+
+_active = None
+
+
+class RunRecorder:
+    """Collects timings and counters for one run; safe to use from worker threads"""
+
+    def __init__(self, command, args=None):
+        self.command = command
+        self.args = list(sys.argv[1:] if args is None else args)
+        self.started_at = datetime.now()
+        self._started = time.time()
+        self.phases = {}
+        self.counters = {}
+        self.requests = {}
+        self._phase_stack = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name):
+        """Time a named phase; repeated phases add up"""
+        started = time.time()
+        self._phase_stack.append(name)
+        try:
+            yield
+        finally:
+            self._phase_stack.pop()
+            with self._lock:
+                self.phases[name] = self.phases.get(name, 0.0) + time.time() - started
+
+    def count(self, key, n=1):
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + n
+
+    def record_request(self, url, response=None, error=None, seconds=0.0):
+        host = urlparse(url).hostname or "unknown"
+        failed = error is not None or (response is not None and response.status_code >= 400)
+        size = len(response.content) if response is not None else 0
+        with self._lock:
+            stats = self.requests.setdefault(host, {"requests": 0, "bytes": 0, "errors": 0, "seconds": 0.0})
+            stats["requests"] += 1
+            stats["bytes"] += size
+            stats["errors"] += int(failed)
+            stats["seconds"] += seconds
+
+    def summary(self, status):
+        """Run record as a JSON-serialisable dict"""
+        duration = time.time() - self._started
+        processed = self.counters.get("records_processed", 0)
+        return {
+            "command": self.command,
+            "args": self.args,
+            "status": status,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "finished_at": datetime.now().isoformat(timespec="seconds"),
+            "duration_seconds": round(duration, 3),
+            "phases": {name: round(seconds, 3) for name, seconds in self.phases.items()},
+            "requests": sum(s["requests"] for s in self.requests.values()),
+            "request_bytes": sum(s["bytes"] for s in self.requests.values()),
+            "request_errors": sum(s["errors"] for s in self.requests.values()),
+            "requests_by_host": self.requests,
+            "rows_inserted": self.counters.get("rows_inserted", 0),
+            "rows_updated": self.counters.get("rows_updated", 0),
+            "records_processed": processed,
+            "throughput_per_second": round(processed / duration, 3) if duration > 0 else 0.0,
+            "counters": self.counters,
+        }
+
+    def finish(self, status="completed"):
+        """Store the run in the runs table and write its JSON manifest"""
+        global _active
+        if _active is self:
+            _active = None
+
+        record = self.summary(status)
+        record["run_id"] = _store_run(record)
+
+        os.makedirs(MANIFEST_DIR, exist_ok=True)
+        stamp = self.started_at.strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(MANIFEST_DIR, f"{self.command}_{stamp}_{record['run_id'] or 'local'}.json")
+        with open(path, "w") as f:
+            json.dump(record, f, indent=2, default=str)
+
+        log.info(
+            "🧾 Run %s %s in %.1fs: %s requests, %s records, %.2f/s → %s",
+            record["run_id"] or "(not stored)", status, record["duration_seconds"],
+            record["requests"], record["records_processed"], record["throughput_per_second"], path
+        )
+        return record
+
+
+def _store_run(record):
+    """Insert the run record; a missing runs table only costs the DB copy"""
+    from dapp_scraper.db import get_conn
+
+    conn = None
+    try:
+        conn = get_conn()
+        cur = conn.cursor()
+        cur.execute(
+            """
+            INSERT INTO runs (
+                command, args, status, started_at, finished_at, duration_seconds,
+                requests, request_bytes, request_errors, rows_inserted, rows_updated,
+                records_processed, throughput_per_second, metrics
+            )
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            RETURNING run_id;
+            """,
+            (
+                record["command"], " ".join(record["args"]), record["status"],
+                record["started_at"], record["finished_at"], record["duration_seconds"],
+                record["requests"], record["request_bytes"], record["request_errors"],
+                record["rows_inserted"], record["rows_updated"], record["records_processed"],
+                record["throughput_per_second"],
+                json.dumps({
+                    "phases": record["phases"],
+                    "requests_by_host": record["requests_by_host"],
+                    "counters": record["counters"],
+                }),
+            )
+        )
+        run_id = cur.fetchone()[0]
+        conn.commit()
+        cur.close()
+        return run_id
+    except Exception as e:
+        log.warning("⚠️ Could not store run record: %s", e)
+        return None
+    finally:
+        if conn is not None:
+            conn.close()
+
+
+def start_run(command, args=None):
+    """Start recording a run and make it the active one"""
+    global _active
+    _active = RunRecorder(command, args)
+    return _active
+
+
+def current_run():
+    return _active
+
+
+def current_phase():
+    """Innermost phase of the active run, or None"""
+    if _active is None or not _active._phase_stack:
+        return None
+    return _active._phase_stack[-1]
+
+
+def count(key, n=1):
+    """Add n to a counter of the active run"""
+    if _active is not None:
+        _active.count(key, n)
+
+
+def record_request(url, response=None, error=None, seconds=0.0):
+    """Account one HTTP request to the active run"""
+    if _active is not None:
+        _active.record_request(url, response, error, seconds)
+
+
+@contextmanager
+def phase(name):
+    """Time a phase of the active run"""
+    if _active is None:
+        yield
+        return
+    with _active.phase(name):
+        yield
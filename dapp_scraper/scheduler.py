@@ -0,0 +1,146 @@
+"""
+Staleness-driven enrichment scheduling.
+
+Enriched columns are grouped by how fast they change, and each group has
+a TTL. dapp_refresh_state records when each group was last refreshed for
+each DApp. A scheduled run only picks DApps with at least one expired
+group. It calls only the providers those groups need, works through DApps
+in order of importance and stops when the per-run request budget is used up.
+"""
+from psycopg2.extras import execute_values
+
+from dapp_scraper.id_mapping import PROVIDERS
+from dapp_scraper.log import get_logger
+from dapp_scraper.utils import CFG
+
+log = get_logger(__name__)
+
+# Field group -> providers that refresh it and default TTL in hours.
+# Raises and ids barely change; ids are additionally cached in dapp_external_ids
+FIELD_GROUPS = {
+    "market": {"providers": ("coinmarketcap", "coingecko"), "ttl_hours": 1},
+    "supply": {"providers": ("coinmarketcap", "coingecko"), "ttl_hours": 24},
+    "tvl": {"providers": ("defillama",), "ttl_hours": 24},
+    "raises": {"providers": ("defillama",), "ttl_hours": 24 * 30},
+}
+
+# Same weights as SIGNAL_WEIGHTS in analytics_new/config.py (sum of w * log1p(x))
+IMPORTANCE_WEIGHTS = {
+    "users": 1.0,
+    "volume": 1.0,
+    "tvl": 0.8,
+    "market_cap": 0.8,
+    "transactions": 0.6,
+}
+
+REQUEST_BUDGET = CFG.getint("scheduler", "request_budget", fallback=1000)
+
+
+def field_group_ttls():
+    """TTL in seconds per field group; override with <group>_ttl_hours in [scheduler]"""
+    return {
+        group: CFG.getfloat("scheduler", f"{group}_ttl_hours", fallback=spec["ttl_hours"]) * 3600
+        for group, spec in FIELD_GROUPS.items()
+    }
+
+
+def providers_for_groups(groups):
+    """Providers to call to refresh the given field groups"""
+    providers = {provider for group in groups for provider in FIELD_GROUPS[group]["providers"]}
+    # Keep the DeFiLlama -> CMC -> CoinGecko order enrichment relies on
+    return tuple(provider for provider in PROVIDERS if provider in providers)
+
+
+def refreshed_groups(providers):
+    """Field groups fully refreshed by a set of successfully called providers"""
+    return [
+        group for group, spec in FIELD_GROUPS.items()
+        if all(provider in providers for provider in spec["providers"])
+    ]
+
+
+def importance_sql():
+    """SQL expression for the importance score of a dapps_with_quotes row aliased d"""
+    return " + ".join(
+        f"{weight} * ln(1 + GREATEST(COALESCE(d.{column}, 0), 0))"
+        for column, weight in IMPORTANCE_WEIGHTS.items()
+    )
+
+
+def plan_refresh(cur, request_budget=None, ttls=None):
+    """
+    Pick the DApps to enrich in this run.
+    Args:
+        request_budget: maximum provider requests for the run
+        ttls: {field_group: seconds}, defaults to field_group_ttls()
+    Returns:
+        list of (dapp_row, providers) ordered by importance, where dapp_row is
+        (id, name, slug, token_symbol, tags)
+    Cluster members are only due for the groups their own providers refresh;
+    their token and market data comes from the canonical DApp.
+    """
+    from dapp_scraper.dedup import MEMBER_PROVIDERS
+
+    ttls = ttls or field_group_ttls()
+    budget = REQUEST_BUDGET if request_budget is None else request_budget
+    groups = list(ttls)
+    member_groups = [
+        group for group in groups
+        if all(provider in MEMBER_PROVIDERS for provider in FIELD_GROUPS[group]["providers"])
+    ]
+
+    cur.execute(
+        f"""
+        SELECT id, name, slug, token_symbol, tags, due_groups
+        FROM (
+            SELECT d.id, d.name, d.slug, d.token_symbol, d.tags,
+                   {importance_sql()} AS importance,
+                   ARRAY(
+                       SELECT t.field_group
+                       FROM unnest(%s::text[], %s::float8[]) AS t(field_group, ttl_seconds)
+                       WHERE (d.entity_id IS NULL OR d.entity_id = d.id OR t.field_group = ANY(%s::text[]))
+                         AND NOT EXISTS (
+                           SELECT 1 FROM dapp_refresh_state r
+                           WHERE r.dapp_id = d.id
+                             AND r.field_group = t.field_group
+                             AND r.refreshed_at > CURRENT_TIMESTAMP - make_interval(secs => t.ttl_seconds)
+                       )
+                   ) AS due_groups
+            FROM dapps_with_quotes d
+        ) ranked
+        WHERE cardinality(due_groups) > 0
+        ORDER BY importance DESC, id;
+        """,
+        (groups, [ttls[group] for group in groups], member_groups)
+    )
+    rows = cur.fetchall()
+
+    plan = []
+    spent = 0
+    for *dapp, due_groups in rows:
+        providers = providers_for_groups(due_groups)
+        # Skip DApps that no longer fit; a cheaper one further down still might
+        if spent + len(providers) > budget:
+            continue
+        spent += len(providers)
+        plan.append((tuple(dapp), providers))
+
+    log.info("🗓️ %s DApps have stale data, %s scheduled using %s/%s provider requests",
+             len(rows), len(plan), spent, budget)
+    return plan
+
+
+def mark_refreshed(cur, dapp_id, groups):
+    """Record that the given field groups of a DApp were refreshed now"""
+    if not groups:
+        return
+    execute_values(
+        cur,
+        """
+        INSERT INTO dapp_refresh_state (dapp_id, field_group, refreshed_at)
+        VALUES %s
+        ON CONFLICT (dapp_id, field_group) DO UPDATE SET refreshed_at = EXCLUDED.refreshed_at;
+        """,
+        [(dapp_id, group) for group in groups],
+        template="(%s, %s, CURRENT_TIMESTAMP)"
+    )
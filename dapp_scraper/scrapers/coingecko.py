@@ -1,12 +1,13 @@
 import requests
-from configparser import ConfigParser
-import os
 
+from dapp_scraper.config import get_config
 from dapp_scraper.utils import make_rate_limited_request, safe_numeric
+from dapp_scraper.log import get_logger
+
+log = get_logger(__name__)
 
 # Load API key and base URL
-_cfg = ConfigParser()
-_cfg.read(os.path.join(os.path.dirname(__file__), '..', '..', 'config', 'config.ini'))
+_cfg = get_config()
 
 # CoinGecko uses free public API
 try:
@@ -35,7 +36,7 @@ def fetch_coingecko_public_list():
         else:
             return None
     except Exception as e:
-        print(f"❌ Error fetching CoinGecko public list: {e}")
+        log.error("❌ Error fetching CoinGecko public list: %s", e)
         return None
 
 def fetch_single_project_coingecko(project_name, params=None):
@@ -45,7 +46,7 @@ def fetch_single_project_coingecko(project_name, params=None):
         project_name: Name of the project/DApp
         params: Dict with gecko_id - {"gecko_id": id}
     Returns:
-        dict: Enriched project data or None if not found
+        dict: Enriched project data, {} if the gecko_id does not exist, or None on errors
     """
     headers = {}
     if API_KEY:
@@ -54,7 +55,7 @@ def fetch_single_project_coingecko(project_name, params=None):
     try:
         # Only work with gecko_id parameter
         if not params or "gecko_id" not in params:
-            print(f"❌ No gecko_id provided for {project_name}")
+            log.warning("❌ No gecko_id provided for %s", project_name)
             return None
         
         gecko_id = params["gecko_id"]
@@ -66,14 +67,15 @@ def fetch_single_project_coingecko(project_name, params=None):
             coin_data = resp.json()
             return parse_coingecko_data(coin_data)
         elif resp.status_code == 404:
-            print(f"❌ CoinGecko project not found: {gecko_id}")
+            log.debug("❌ CoinGecko project not found: %s", gecko_id)
+            return {}
         else:
-            print(f"❌ CoinGecko API error for {gecko_id}: {resp.status_code}")
+            log.warning("❌ CoinGecko API error for %s: %s", gecko_id, resp.status_code)
         
         return None
         
     except Exception as e:
-        print(f"❌ Error fetching CoinGecko data for {project_name}: {e}")
+        log.error("❌ Error fetching CoinGecko data for %s: %s", project_name, e)
         return None
 
 def parse_coingecko_data(coin_data):
@@ -100,36 +102,36 @@ def parse_coingecko_data(coin_data):
         
         # Current price data
         current_price = market_data.get("current_price") or {}
-        price_usd = safe_numeric(current_price.get("usd"), 0)
+        price_usd = safe_numeric(current_price.get("usd"), None)
         
         # Market cap data
         market_cap = market_data.get("market_cap") or {}
-        market_cap_usd = safe_numeric(market_cap.get("usd"), 0)
+        market_cap_usd = safe_numeric(market_cap.get("usd"), None)
         
         # Volume data
         total_volume = market_data.get("total_volume") or {}
         total_value_locked = market_data.get("total_value_locked") or {}
-        tvl = safe_numeric(total_value_locked.get("usd"), 0)
-        volume_24h_usd = safe_numeric(total_volume.get("usd"), 0)
+        tvl = safe_numeric(total_value_locked.get("usd"), None)
+        volume_24h_usd = safe_numeric(total_volume.get("usd"), None)
         
         # Price change data
-        price_change_24h = safe_numeric(market_data.get("price_change_percentage_24h"), 0)
-        price_change_7d = safe_numeric(market_data.get("price_change_percentage_7d"), 0)
-        price_change_30d = safe_numeric(market_data.get("price_change_percentage_30d"), 0)
-        price_change_1y = safe_numeric(market_data.get("price_change_percentage_1y"), 0)
+        price_change_24h = safe_numeric(market_data.get("price_change_percentage_24h"), None)
+        price_change_7d = safe_numeric(market_data.get("price_change_percentage_7d"), None)
+        price_change_30d = safe_numeric(market_data.get("price_change_percentage_30d"), None)
+        price_change_1y = safe_numeric(market_data.get("price_change_percentage_1y"), None)
         
         # Supply data
-        circulating_supply = safe_numeric(market_data.get("circulating_supply"), 0)
-        total_supply = safe_numeric(market_data.get("total_supply"), 0)
-        max_supply = safe_numeric(market_data.get("max_supply"), 0)
+        circulating_supply = safe_numeric(market_data.get("circulating_supply"), None)
+        total_supply = safe_numeric(market_data.get("total_supply"), None)
+        max_supply = safe_numeric(market_data.get("max_supply"), None)
         
         # Market metrics
-        market_cap_rank = safe_numeric(coin_data.get("market_cap_rank"), 0)
+        market_cap_rank = safe_numeric(coin_data.get("market_cap_rank"), None)
         fully_diluted_valuation = market_data.get("fully_diluted_valuation") or {}
-        fdv_usd = safe_numeric(fully_diluted_valuation.get("usd"), 0)
+        fdv_usd = safe_numeric(fully_diluted_valuation.get("usd"), None)
         
         # Additional metrics
-        market_cap_change_24h = safe_numeric(market_data.get("market_cap_change_percentage_24h"), 0)
+        market_cap_change_24h = safe_numeric(market_data.get("market_cap_change_percentage_24h"), None)
         
         # Count social media presence - simple and bulletproof
         social_count = 0
@@ -196,5 +198,5 @@ def parse_coingecko_data(coin_data):
         }
         
     except Exception as e:
-        print(f"❌ Error parsing CoinGecko data: {e}")
+        log.error("❌ Error parsing CoinGecko data: %s", e)
         return None 
\ No newline at end of file
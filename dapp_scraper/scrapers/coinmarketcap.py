@@ -1,15 +1,43 @@
 import requests
-from configparser import ConfigParser
-import os
 
+from dapp_scraper.config import get_config
 from dapp_scraper.utils import make_rate_limited_request
+from dapp_scraper.log import get_logger
+
+log = get_logger(__name__)
 
 # Load API key and base URL
-_cfg = ConfigParser()
-_cfg.read(os.path.join(os.path.dirname(__file__), '..', '..', 'config', 'config.ini'))
+_cfg = get_config()
 API_KEY = _cfg["coinmarketcap"]["api_key"]
 API_ORIGIN = _cfg["coinmarketcap"]["api_origin"]
 
+def fetch_coinmarketcap_map(page_size=5000):
+    """
+    Fetch the CMC id map (id, name, symbol, slug) of all active coins
+    Returns:
+        list: CMC map entries, or None on errors
+    """
+    headers = {"X-CMC_PRO_API_KEY": API_KEY}
+    url = f"{API_ORIGIN}/v1/cryptocurrency/map"
+    entries = []
+    start = 1
+
+    try:
+        while True:
+            params = {"listing_status": "active", "start": start, "limit": page_size}
+            resp = make_rate_limited_request(url, headers=headers, params=params)
+            if resp.status_code != 200:
+                log.error("❌ CMC map request failed with status code %s", resp.status_code)
+                return None
+            page = resp.json().get("data", [])
+            entries.extend(page)
+            if len(page) < page_size:
+                return entries
+            start += page_size
+    except Exception as e:
+        log.error("❌ Error fetching CMC map: %s", e)
+        return None
+
 def fetch_single_project_coinmarketcap(project_name, params=None):
     """
     Fetch data for a single project from CoinMarketCap API
@@ -17,7 +45,7 @@ def fetch_single_project_coinmarketcap(project_name, params=None):
         project_name: Name of the project/DApp
         params: Dict with search parameters - {"id": id} or {"symbol": symbol} or {"slug": slug}
     Returns:
-        dict: Enriched project data or None if not found
+        dict: Enriched project data, {} if CMC has no matching coin, or None on errors
     """
     headers = {"X-CMC_PRO_API_KEY": API_KEY}
     
@@ -66,28 +94,35 @@ def fetch_single_project_coinmarketcap(project_name, params=None):
                         "cmc_symbol": coin_data.get("symbol"),
                         "cmc_slug": coin_data.get("slug"),
                         "cmc_tags": tags_str,
-                        "market_cap": quote_usd.get("market_cap", 0),
-                        "price": quote_usd.get("price", 0),
-                        "volume_24h": quote_usd.get("volume_24h", 0),
-                        "volume_change_24h": quote_usd.get("volume_change_24h", 0),
-                        "percent_change_1h": quote_usd.get("percent_change_1h", 0),
-                        "percent_change_24h": quote_usd.get("percent_change_24h", 0),
-                        "percent_change_7d": quote_usd.get("percent_change_7d", 0),
-                        "percent_change_30d": quote_usd.get("percent_change_30d", 0),
-                        "percent_change_60d": quote_usd.get("percent_change_60d", 0),
-                        "percent_change_90d": quote_usd.get("percent_change_90d", 0),
-                        "market_cap_dominance": quote_usd.get("market_cap_dominance", 0),
-                        "fully_diluted_market_cap": quote_usd.get("fully_diluted_market_cap", 0),
-                        "circulating_supply": coin_data.get("circulating_supply", 0),
-                        "total_supply": coin_data.get("total_supply", 0),
-                        "max_supply": coin_data.get("max_supply", 0),
-                        "cmc_rank": coin_data.get("cmc_rank", 0),
-                        "tvl": quote_usd.get("tvl", 0),
-                        "tvl_ratio": coin_data.get("tvl_ratio", 0),
+                        "market_cap": quote_usd.get("market_cap"),
+                        "price": quote_usd.get("price"),
+                        "volume_24h": quote_usd.get("volume_24h"),
+                        "volume_change_24h": quote_usd.get("volume_change_24h"),
+                        "percent_change_1h": quote_usd.get("percent_change_1h"),
+                        "percent_change_24h": quote_usd.get("percent_change_24h"),
+                        "percent_change_7d": quote_usd.get("percent_change_7d"),
+                        "percent_change_30d": quote_usd.get("percent_change_30d"),
+                        "percent_change_60d": quote_usd.get("percent_change_60d"),
+                        "percent_change_90d": quote_usd.get("percent_change_90d"),
+                        "market_cap_dominance": quote_usd.get("market_cap_dominance"),
+                        "fully_diluted_market_cap": quote_usd.get("fully_diluted_market_cap"),
+                        "circulating_supply": coin_data.get("circulating_supply"),
+                        "total_supply": coin_data.get("total_supply"),
+                        "max_supply": coin_data.get("max_supply"),
+                        "cmc_rank": coin_data.get("cmc_rank"),
+                        "tvl": quote_usd.get("tvl"),
+                        "tvl_ratio": coin_data.get("tvl_ratio"),
                     }
+            
+            # Successful response without a coin for these params
+            return {}
+        
+        if resp.status_code == 400:
+            # CMC answers 400 for an unknown id/slug/symbol
+            return {}
         
         return None
         
     except Exception as e:
-        print(f"❌ Error fetching CMC data for {project_name}: {e}")
+        log.error("❌ Error fetching CMC data for %s: %s", project_name, e)
         return None 
\ No newline at end of file
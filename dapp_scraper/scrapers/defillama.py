@@ -3,15 +3,64 @@ from datetime import datetime
 import time
 
 from dapp_scraper.utils import make_rate_limited_request, safe_numeric
+from dapp_scraper.log import get_logger
 
-def fetch_single_project_defillama(project_name, project_slug=None):
+log = get_logger(__name__)
+
+
+# chainTvls keys that are TVL breakdowns rather than chains ("staking", "Ethereum-borrowed", ...)
+NON_CHAIN_TVL_KEYS = {
+    "staking", "pool2", "borrowed", "treasury", "vesting", "offers",
+    "doublecounted", "liquidstaking", "dcandlsoverlap",
+}
+
+
+def _is_chain_key(key):
+    """True if a chainTvls key names a chain rather than a breakdown"""
+    lowered = key.lower()
+    if lowered in NON_CHAIN_TVL_KEYS:
+        return False
+    return lowered.rsplit("-", 1)[-1] not in NON_CHAIN_TVL_KEYS
+
+
+def _date_to_timestamp(day):
+    """
+    Local-time timestamp of the start of `day` (matches fromtimestamp below).
+    The since day itself is parsed again: its last point is an intraday value
+    that DeFiLlama keeps updating until the day is over.
+    """
+    return time.mktime(day.timetuple())
+
+
+def fetch_defillama_protocols():
+    """
+    Fetch the list of all DeFiLlama protocols (name, slug, symbol, ...)
+    Returns:
+        list: Protocol entries, or None on errors
+    """
+    try:
+        resp = make_rate_limited_request("https://api.llama.fi/protocols", headers={}, params={})
+        if resp.status_code == 200:
+            return resp.json()
+        log.error("❌ DeFiLlama protocols request failed with status code %s", resp.status_code)
+        return None
+    except Exception as e:
+        log.error("❌ Error fetching DeFiLlama protocols: %s", e)
+        return None
+
+
+def fetch_single_project_defillama(project_name, project_slug=None, tvl_since=None, chain_tvl_since=None):
     """
     Fetch data for a single project from DeFiLlama API
     Args:
         project_name: Name of the project/DApp
         project_slug: Slug of the project if known
+        tvl_since: Latest TVL date already stored; older points are not parsed
+        chain_tvl_since: {chain: latest TVL date already stored} for the per-chain
+                         series; chains without an entry are parsed whole
     Returns:
-        dict: Enriched project data with tvl_historical and raises data or None if not found
+        dict: Enriched project data with tvl_historical, chain_tvl_historical and raises data,
+              {} if DeFiLlama has no protocol under that slug, or None on other errors
     """
     try:        
         # Try to find the project by slug first
@@ -45,7 +94,8 @@ def fetch_single_project_defillama(project_name, project_slug=None):
             
             enriched_data = {
                 "name": detail_data.get("name"),
-                "mcap": safe_numeric(detail_data.get("mcap"), 0),
+                "defillama_slug": slug_to_try,
+                "mcap": safe_numeric(detail_data.get("mcap"), None),
                 "gecko_id": detail_data.get("geckoId"),
                 "cmc_id": detail_data.get("cmcId"),
                 "token_symbol": detail_data.get("symbol"),
@@ -59,6 +109,7 @@ def fetch_single_project_defillama(project_name, project_slug=None):
                 enriched_data["defillama_chains"] = detail_data["chains"]
             
             # Extract additional metrics from chainTvls
+            chain_tvl_historical = []
             if detail_data.get("chainTvls"):
                 chain_tvls = detail_data["chainTvls"]
                 for chain, tvl_data in chain_tvls.items():
@@ -68,12 +119,38 @@ def fetch_single_project_defillama(project_name, project_slug=None):
                             enriched_data[f"defillama_tvl_{chain.lower()}"] = safe_numeric(last_tvl, 0)
                         except (KeyError, IndexError, TypeError):
                             enriched_data[f"defillama_tvl_{chain.lower()}"] = 0
+
+                        # Keep the per-chain daily series for real chains only
+                        if not _is_chain_key(chain):
+                            continue
+                        chain_since = (chain_tvl_since or {}).get(chain.lower())
+                        chain_since_ts = _date_to_timestamp(chain_since) if chain_since else None
+                        for tvl_entry in tvl_data["tvl"]:
+                            if not isinstance(tvl_entry, dict) or "date" not in tvl_entry:
+                                continue
+                            if chain_since_ts is not None and safe_numeric(tvl_entry["date"], 0) < chain_since_ts:
+                                continue
+                            try:
+                                chain_tvl_historical.append({
+                                    "chain": chain.lower(),
+                                    "date": datetime.fromtimestamp(tvl_entry["date"]).date(),
+                                    "tvl": safe_numeric(tvl_entry.get("totalLiquidityUSD"), 0)
+                                })
+                            except (ValueError, TypeError, OSError):
+                                continue
+            enriched_data["chain_tvl_historical"] = chain_tvl_historical
             
             # Extract TVL historical data
+            # DeFiLlama has no delta endpoint for the series, so when we already hold
+            # history up to tvl_since we skip older points before converting them
+            # (the tvl_since day is kept so its partial value gets corrected)
             tvl_historical = []
+            since_ts = _date_to_timestamp(tvl_since) if tvl_since else None
             if detail_data.get("tvl"):
                 for tvl_entry in detail_data["tvl"]:
                     if isinstance(tvl_entry, dict) and "date" in tvl_entry and "totalLiquidityUSD" in tvl_entry:
+                        if since_ts is not None and safe_numeric(tvl_entry["date"], 0) < since_ts:
+                            continue
                         try:
                             tvl_historical.append({
                                 "date": datetime.fromtimestamp(tvl_entry["date"]).date(),
@@ -115,8 +192,12 @@ def fetch_single_project_defillama(project_name, project_slug=None):
             
             return enriched_data
         
+        if detail_resp.status_code in (400, 404):
+            # Unknown protocol slug - a definitive miss rather than an error
+            return {}
+        
         return None
         
     except Exception as e:
-        print(f"❌ Error fetching DeFiLlama data for {project_name}: {e}")
+        log.error("❌ Error fetching DeFiLlama data for %s: %s", project_name, e)
         return None
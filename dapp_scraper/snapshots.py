@@ -0,0 +1,102 @@
+"""
+Daily history of DApp metrics.
+
+dapps and dapp_market_quotes only hold the current values. Every write of
+those values also appends them to dapp_metric_snapshots, one row per DApp
+and day, so analyses can look at any past day instead of the latest
+cross-section only. A later write on the same day replaces that day's row
+(the snapshot of a day holds its last values); earlier days are never
+rewritten. The table is range partitioned by month on snapshot_date, with
+a BRIN index on snapshot_date for range scans over many DApps and the
+(dapp_id, snapshot_date) key for per-DApp lookups.
+"""
+from datetime import date
+
+from dapp_scraper.partitions import ensure_partitions
+
+SNAPSHOT_TABLE = "dapp_metric_snapshots"
+
+# Columns of dapps_with_quotes recorded per snapshot
+SNAPSHOT_COLUMNS = ("users", "volume", "transactions", "tvl", "market_cap", "price")
+
+
+def append_snapshots(cur, dapp_ids, day=None):
+    """
+    Record the current metrics of dapp_ids as their snapshot of day
+    (default today) in one statement. Returns the number of snapshots
+    added or changed.
+    """
+    dapp_ids = list(dapp_ids)
+    if not dapp_ids:
+        return 0
+    day = day or date.today()
+    ensure_partitions(cur, SNAPSHOT_TABLE, [day])
+
+    columns = ", ".join(SNAPSHOT_COLUMNS)
+    cur.execute(
+        f"""
+        INSERT INTO {SNAPSHOT_TABLE} AS s (dapp_id, snapshot_date, {columns})
+        SELECT d.id, %s, {", ".join(f"d.{column}" for column in SNAPSHOT_COLUMNS)}
+        FROM dapps_with_quotes d
+        WHERE d.id = ANY(%s)
+        ON CONFLICT (dapp_id, snapshot_date) DO UPDATE SET
+            {", ".join(f"{column} = EXCLUDED.{column}" for column in SNAPSHOT_COLUMNS)},
+            captured_at = CURRENT_TIMESTAMP
+        WHERE ({", ".join(f"s.{column}" for column in SNAPSHOT_COLUMNS)})
+            IS DISTINCT FROM ({", ".join(f"EXCLUDED.{column}" for column in SNAPSHOT_COLUMNS)});
+        """,
+        (day, dapp_ids)
+    )
+    return cur.rowcount
+
+
+def metrics_as_of(cur, at, dapp_ids=None, since=None):
+    """
+    Latest snapshot on or before the day at, per DApp.
+    Args:
+        dapp_ids: restrict to these DApps (default: all DApps)
+        since: ignore snapshots before this day; also skips the older partitions
+    Returns:
+        dict: {dapp_id: {"snapshot_date": date, column: value, ...}}
+    """
+    columns = ", ".join(f"s.{column}" for column in SNAPSHOT_COLUMNS)
+    # One backward index probe per DApp on the (dapp_id, snapshot_date) key
+    cur.execute(
+        f"""
+        SELECT d.id, s.snapshot_date, {columns}
+        FROM dapps d
+        CROSS JOIN LATERAL (
+            SELECT *
+            FROM {SNAPSHOT_TABLE} s
+            WHERE s.dapp_id = d.id
+              AND s.snapshot_date <= %(at)s
+              AND (%(since)s::date IS NULL OR s.snapshot_date >= %(since)s::date)
+            ORDER BY s.snapshot_date DESC
+            LIMIT 1
+        ) s
+        WHERE %(dapp_ids)s::integer[] IS NULL OR d.id = ANY(%(dapp_ids)s::integer[]);
+        """,
+        {"at": at, "since": since, "dapp_ids": list(dapp_ids) if dapp_ids is not None else None}
+    )
+    return {
+        dapp_id: dict(zip(("snapshot_date",) + SNAPSHOT_COLUMNS, values))
+        for dapp_id, *values in cur.fetchall()
+    }
+
+
+def metric_history(cur, start, end, dapp_ids=None):
+    """
+    Snapshots with start <= snapshot_date <= end, as
+    (dapp_id, snapshot_date, SNAPSHOT_COLUMNS...) rows ordered by DApp and day
+    """
+    cur.execute(
+        f"""
+        SELECT dapp_id, snapshot_date, {", ".join(SNAPSHOT_COLUMNS)}
+        FROM {SNAPSHOT_TABLE}
+        WHERE snapshot_date BETWEEN %(start)s AND %(end)s
+          AND (%(dapp_ids)s::integer[] IS NULL OR dapp_id = ANY(%(dapp_ids)s::integer[]))
+        ORDER BY dapp_id, snapshot_date;
+        """,
+        {"start": start, "end": end, "dapp_ids": list(dapp_ids) if dapp_ids is not None else None}
+    )
+    return cur.fetchall()
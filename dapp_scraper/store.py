@@ -1,85 +1,301 @@
-import os
-from configparser import ConfigParser
-import psycopg2
-from datetime import datetime
-
-_cfg = ConfigParser()
-_cfg.read(os.path.join(os.path.dirname(__file__), '..', 'config', 'config.ini'))
-DB_NAME = _cfg["database"]["name"]
-SUPERUSER = _cfg["database"]["user"]
-PASSWORD = _cfg["database"]["password"]
-HOST = _cfg["database"]["host"]
-PORT = _cfg["database"]["port"]
-
-def get_conn():
-    return psycopg2.connect(
-        dbname=DB_NAME,
-        user=SUPERUSER,
-        password=PASSWORD,
-        host=HOST,
-        port=PORT
-    )
+import io
+import json
+from psycopg2.extras import execute_values
+
+from dapp_scraper import run_metrics
+from dapp_scraper.config import get_config
+from dapp_scraper.db import get_conn
+from dapp_scraper.log import Progress, get_logger
+from dapp_scraper.links import sync_links
+from dapp_scraper.lookups import lookup
+from dapp_scraper.partitions import ensure_partitions
+from dapp_scraper.snapshots import append_snapshots
+
+log = get_logger(__name__)
+_cfg = get_config()
 
 def get_or_create_category(cur, category_name):
-    """Get or create category ID"""
-    if not category_name or category_name.strip() == "":
-        return None
-        
+    """Get or create category ID through the categories lookup cache (cur is not used)"""
+    return lookup("categories").get(category_name)
+
+
+def _copy_value(value):
+    """A value in COPY text format"""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return (
+        str(value).replace("\\", "\\\\").replace("\t", "\\t")
+        .replace("\n", "\\n").replace("\r", "\\r")
+    )
+
+
+def copy_rows(cur, table, columns, rows):
+    """COPY rows (tuples in columns order) into table in one round trip"""
+    buf = io.StringIO()
+    for row in rows:
+        buf.write("\t".join(_copy_value(value) for value in row))
+        buf.write("\n")
+    buf.seek(0)
+    cur.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buf)
+
+
+def merge_rows(cur, table, columns, key, rows, conflict=None, touch=None):
+    """
+    Merge rows (tuples in columns order, unique on the key columns) into
+    table in one statement: they are COPYed into a session temp table
+    <table>_stage and applied with INSERT ... ON CONFLICT (key) DO UPDATE.
+    conflict replaces the key as conflict target when the unique index is
+    on expressions of the key columns. Existing rows are only rewritten
+    when a value changed; the touch column is then set to the current time.
+    Returns the number of rows inserted or changed.
+    """
+    stage = f"{table}_stage"
+    column_list = ", ".join(columns)
+    values = [column for column in columns if column not in key]
+    assignments = [f"{column} = EXCLUDED.{column}" for column in values]
+    if touch:
+        assignments.append(f"{touch} = CURRENT_TIMESTAMP")
     cur.execute(
-        "INSERT INTO categories (name) VALUES (%s) ON CONFLICT (name) DO NOTHING;",
-        (category_name,)
+        f"""
+        CREATE TEMP TABLE IF NOT EXISTS {stage} ON COMMIT DELETE ROWS AS
+        SELECT {column_list} FROM {table} WITH NO DATA;
+        """
     )
-    cur.execute("SELECT id FROM categories WHERE name = %s;", (category_name,))
-    result = cur.fetchone()
-    return result[0] if result else None
+    copy_rows(cur, stage, columns, rows)
+    cur.execute(
+        f"""
+        INSERT INTO {table} ({column_list})
+        SELECT {column_list} FROM {stage}
+        ON CONFLICT ({", ".join(conflict or key)}) DO UPDATE SET
+            {", ".join(assignments)}
+        WHERE ({", ".join(f"{table}.{column}" for column in values)})
+            IS DISTINCT FROM ({", ".join(f"EXCLUDED.{column}" for column in values)});
+        """
+    )
+    merged = cur.rowcount
+    # Several merges can share a transaction; the stage is only emptied on commit
+    cur.execute(f"DELETE FROM {stage};")
+    return merged
 
 
-def store_tvl_historical(cur, dapp_id, tvl_data):
-    """Store TVL historical data for a DApp"""
-    if not tvl_data:
-        return
-    
-    for tvl_entry in tvl_data:
-        try:
-            cur.execute(
-                """
-                INSERT INTO tvl_historical (dapp_id, date, total_liquidity_usd)
-                VALUES (%s, %s, %s)
-                ON CONFLICT DO NOTHING;
-                """,
-                (dapp_id, tvl_entry["date"], tvl_entry["total_liquidity_usd"])
-            )
-        except Exception as e:
-            print(f"❌ Error storing TVL historical data: {e}")
+def get_latest_tvl_dates(cur, dapp_ids=None):
+    """Return {dapp_id: latest stored TVL date}, optionally restricted to dapp_ids"""
+    # The monthly rollups hold the last date of every month: ~30x fewer rows than the daily series
+    if dapp_ids is None:
+        cur.execute("SELECT dapp_id, MAX(last_date) FROM tvl_rollups WHERE period = 'month' GROUP BY dapp_id;")
+    else:
+        cur.execute(
+            """
+            SELECT dapp_id, MAX(last_date) FROM tvl_rollups
+            WHERE period = 'month' AND dapp_id = ANY(%s)
+            GROUP BY dapp_id;
+            """,
+            (list(dapp_ids),)
+        )
+    return dict(cur.fetchall())
+
+
+TVL_COLUMNS = ("dapp_id", "date", "total_liquidity_usd")
+
+# tvl_rollups periods; a week starts on Monday (date_trunc)
+TVL_ROLLUP_PERIODS = ("week", "month")
+
+
+def refresh_tvl_rollups(cur, rows):
+    """
+    Recompute, from tvl_historical, the weekly and monthly rollups of the
+    periods that TVL rows (TVL_COLUMNS tuples) fall in. Only those periods
+    are read, so a daily run touches one week and one month per DApp.
+    Returns the number of rollups added or changed.
+    """
+    cur.execute(
+        """
+        WITH touched AS (
+            SELECT DISTINCT p.dapp_id, r.period, date_trunc(r.period, p.day)::date AS period_start
+            FROM unnest(%s::integer[], %s::date[]) AS p (dapp_id, day)
+            CROSS JOIN unnest(%s::text[]) AS r (period)
+        )
+        INSERT INTO tvl_rollups AS u (
+            dapp_id, period, period_start, days, last_date, last_tvl, mean_tvl, min_tvl, max_tvl
+        )
+        SELECT x.dapp_id, x.period, x.period_start, COUNT(*), MAX(t.date),
+               (array_agg(t.total_liquidity_usd ORDER BY t.date DESC))[1],
+               AVG(t.total_liquidity_usd), MIN(t.total_liquidity_usd), MAX(t.total_liquidity_usd)
+        FROM touched x
+        JOIN tvl_historical t
+          ON t.dapp_id = x.dapp_id
+         AND t.date >= x.period_start
+         AND t.date < x.period_start + ('1 ' || x.period)::interval
+        GROUP BY x.dapp_id, x.period, x.period_start
+        ON CONFLICT (dapp_id, period, period_start) DO UPDATE SET
+            days = EXCLUDED.days, last_date = EXCLUDED.last_date, last_tvl = EXCLUDED.last_tvl,
+            mean_tvl = EXCLUDED.mean_tvl, min_tvl = EXCLUDED.min_tvl, max_tvl = EXCLUDED.max_tvl
+        WHERE (u.days, u.last_date, u.last_tvl, u.mean_tvl, u.min_tvl, u.max_tvl)
+            IS DISTINCT FROM (EXCLUDED.days, EXCLUDED.last_date, EXCLUDED.last_tvl,
+                              EXCLUDED.mean_tvl, EXCLUDED.min_tvl, EXCLUDED.max_tvl);
+        """,
+        ([row[0] for row in rows], [row[1] for row in rows], list(TVL_ROLLUP_PERIODS))
+    )
+    return cur.rowcount
+
+
+def merge_tvl_rows(cur, rows):
+    """
+    Merge TVL rows (TVL_COLUMNS tuples, unique on (dapp_id, date)) into the
+    yearly partitions of tvl_historical and refresh their rollups.
+    Returns the number of points inserted or changed.
+    """
+    ensure_partitions(cur, "tvl_historical", {row[1] for row in rows}, interval="year")
+    merged = merge_rows(cur, "tvl_historical", TVL_COLUMNS, ("dapp_id", "date"), rows)
+    if merged:
+        refresh_tvl_rollups(cur, rows)
+    return merged
+
+
+def get_tvl_rollups(cur, period, dapp_ids=None, since=None):
+    """
+    (dapp_id, period_start, days, last_tvl, mean_tvl, min_tvl, max_tvl) rows
+    of one rollup period ("week" or "month"), ordered by DApp and period
+    """
+    cur.execute(
+        """
+        SELECT dapp_id, period_start, days, last_tvl, mean_tvl, min_tvl, max_tvl
+        FROM tvl_rollups
+        WHERE period = %(period)s
+          AND (%(dapp_ids)s::integer[] IS NULL OR dapp_id = ANY(%(dapp_ids)s::integer[]))
+          AND (%(since)s::date IS NULL OR period_start >= %(since)s::date)
+        ORDER BY dapp_id, period_start;
+        """,
+        {"period": period, "dapp_ids": list(dapp_ids) if dapp_ids is not None else None, "since": since}
+    )
+    return cur.fetchall()
+
+
+def _tvl_rows(dapp_id, tvl_data, since=None):
+    """(dapp_id, date, total_liquidity_usd) rows, one per date; the last value seen wins"""
+    points = {}
+    for tvl_entry in tvl_data or []:
+        if since is None or tvl_entry["date"] >= since:
+            points[tvl_entry["date"]] = tvl_entry["total_liquidity_usd"]
+    return [(dapp_id, day, value) for day, value in points.items()]
+
+
+def store_tvl_historical(cur, dapp_id, tvl_data, since=None):
+    """
+    Merge TVL historical data for a DApp on its (dapp_id, date) key in one
+    statement and refresh the rollups of the weeks and months it changed.
+    If since is given, only points from that date on are sent; the since day
+    is sent again because its stored value may be a partial, intraday one.
+    Database errors are raised: the caller's per-DApp savepoint undoes the
+    DApp's other writes with them.
+    Returns the number of points inserted or changed.
+    """
+    rows = _tvl_rows(dapp_id, tvl_data, since)
+    if not rows:
+        return 0
+    return merge_tvl_rows(cur, rows)
+
+def get_latest_chain_tvl_dates(cur, dapp_ids=None):
+    """
+    Return {dapp_id: {chain: latest stored TVL date}}, optionally restricted
+    to dapp_ids. Cut-offs are per chain so that a chain DeFiLlama adds later,
+    with backfilled history, still gets its older points stored.
+    """
+    if dapp_ids is None:
+        cur.execute("SELECT dapp_id, chain, MAX(date) FROM chain_tvl_historical GROUP BY dapp_id, chain;")
+    else:
+        cur.execute(
+            """
+            SELECT dapp_id, chain, MAX(date) FROM chain_tvl_historical
+            WHERE dapp_id = ANY(%s) GROUP BY dapp_id, chain;
+            """,
+            (list(dapp_ids),)
+        )
+    latest = {}
+    for dapp_id, chain, day in cur.fetchall():
+        latest.setdefault(dapp_id, {})[chain] = day
+    return latest
+
+
+def _chain_tvl_rows(dapp_id, chain_tvl_data, since=None):
+    """
+    (dapp_id, chain, date, tvl) rows, one per (chain, date); the last value seen wins.
+    since is {chain: latest stored date}; chains without an entry are kept whole.
+    """
+    since = since or {}
+    points = {}
+    for entry in chain_tvl_data or []:
+        chain_since = since.get(entry["chain"])
+        if chain_since is None or entry["date"] >= chain_since:
+            points[(entry["chain"], entry["date"])] = entry["tvl"]
+    return [(dapp_id, chain, day, tvl) for (chain, day), tvl in points.items()]
+
+
+def store_chain_tvl_historical(cur, dapp_id, chain_tvl_data, since=None):
+    """
+    Store per-chain TVL history for a DApp in a single bulk upsert.
+    Rows are keyed by (dapp_id, chain, date); the last value seen for a key wins.
+    If since ({chain: latest stored date}) is given, only points of those chains
+    from that date on are sent (the latest stored day is corrected).
+    Database errors are raised, like store_tvl_historical.
+    Returns the number of points sent to the database.
+    """
+    rows = _chain_tvl_rows(dapp_id, chain_tvl_data, since)
+    if not rows:
+        return 0
+
+    execute_values(
+        cur,
+        """
+        INSERT INTO chain_tvl_historical (dapp_id, chain, date, tvl)
+        VALUES %s
+        ON CONFLICT (dapp_id, chain, date) DO UPDATE SET tvl = EXCLUDED.tvl;
+        """,
+        rows,
+        page_size=1000
+    )
+    return len(rows)
+
+RAISE_FIELDS = (
+    "date", "name", "round", "amount", "chains", "sector", "category", "category_group",
+    "source", "lead_investors", "other_investors", "valuation", "defillama_id",
+)
+# defillama_id is the protocol's id, the same for all of its rounds, so it is not part of the key
+RAISE_KEY = ("dapp_id", "date", "round", "amount")
+# Matches the idx_raises_natural_key expression index
+RAISE_CONFLICT = ("dapp_id", "COALESCE(date, '-infinity'::date)", "COALESCE(round, '')", "COALESCE(amount, -1)")
+
+
+def _raise_rows(dapp_id, raises_data):
+    """
+    (dapp_id, *RAISE_FIELDS) rows for a DApp's raises, one per funding round
+    (date, round, amount); the last entry seen for a round wins. Undated
+    rounds are kept, with a missing date counting as one value.
+    """
+    rounds = {}
+    for raise_entry in raises_data or []:
+        amount = raise_entry.get("amount")
+        key = (raise_entry.get("date"), raise_entry.get("round") or "", -1 if amount is None else amount)
+        rounds[key] = (dapp_id,) + tuple(raise_entry.get(field) for field in RAISE_FIELDS)
+    return list(rounds.values())
+
+
+def merge_raise_rows(cur, rows):
+    """Merge rows built by _raise_rows on the raises natural key; returns rows inserted or changed"""
+    return merge_rows(cur, "raises", ("dapp_id",) + RAISE_FIELDS, RAISE_KEY, rows, conflict=RAISE_CONFLICT)
+
 
 def store_raises(cur, dapp_id, raises_data):
-    """Store raises/funding data for a DApp"""
-    if not raises_data:
-        return
-    
-    for raise_entry in raises_data:
-        try:
-            cur.execute(
-                """
-                INSERT INTO raises (
-                    dapp_id, date, name, round, amount, chains, sector, 
-                    category, category_group, source, lead_investors, 
-                    other_investors, valuation, defillama_id
-                )
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT DO NOTHING;
-                """,
-                (
-                    dapp_id, raise_entry["date"], raise_entry["name"], 
-                    raise_entry["round"], raise_entry["amount"], raise_entry["chains"],
-                    raise_entry["sector"], raise_entry["category"], raise_entry["category_group"],
-                    raise_entry["source"], raise_entry["lead_investors"], 
-                    raise_entry["other_investors"], raise_entry["valuation"], 
-                    raise_entry["defillama_id"]
-                )
-            )
-        except Exception as e:
-            print(f"❌ Error storing raises data: {e}")
+    """
+    Store raises/funding data for a DApp, merged on the (dapp_id, date, round, amount) key.
+    Database errors are raised, like store_tvl_historical.
+    """
+    rows = _raise_rows(dapp_id, raises_data)
+    if not rows:
+        return 0
+    return merge_raise_rows(cur, rows)
 
 def combine_tags(*tag_sources):
     """Combine tags from multiple sources (DappRadar, CoinMarketCap, CoinGecko, DeFiLlama), removing duplicates"""
@@ -104,208 +320,257 @@ def combine_tags(*tag_sources):
     return ", ".join(unique_tags)
 
 
-def store_records(records):
+# DApps per transaction in store_records ([store] batch_size)
+STORE_BATCH_SIZE = _cfg.getint("store", "batch_size", fallback=5000)
+
+# dapps columns written by store_records, in staging table order
+DAPP_COLUMNS = (
+    "name", "slug", "category_id", "is_active", "description", "website",
+    "tags", "chains", "multi_chain",
+    "birth_date", "ownership_status", "level_of_decentralisation", "capital_raised",
+    "token_symbol", "token_format", "governance_type",
+    "tvl", "users", "volume", "transactions",
+)
+
+# dapp_market_quotes columns; quotes change far more often than the rest of
+# a DApp and live in their own narrow table (dapps_with_quotes joins both)
+QUOTE_COLUMNS = (
+    "market_cap", "circulating_supply", "total_supply", "max_supply",
+    "price", "volume_24h", "volume_change_24h",
+    "percent_change_1h", "percent_change_24h", "percent_change_7d", "percent_change_30d",
+    "percent_change_60d", "percent_change_90d", "cmc_rank",
+    "market_cap_dominance", "fully_diluted_market_cap",
+)
+
+
+def _dapp_row(rec, category_ids):
+    """Staging row (DAPP_COLUMNS values) for a normalized record; category_ids from the categories cache"""
+    # Prepare chains as comma-separated string
+    chains_str = ",".join(rec.get("chains", [])) if rec.get("chains") else ""
+
+    # Combine tags from all sources (DappRadar, CoinMarketCap, CoinGecko, DeFiLlama)
+    combined_tags = combine_tags(
+        rec.get("tags"),
+        rec.get("cmc_tags"),
+        rec.get("gecko_categories"),
+        rec.get("defillama_tags")
+    )
+
+    # Get token info (first token if multiple)
+    token_symbol = None
+    token_format = None
+    if rec.get("tokens"):
+        first_token = rec["tokens"][0]
+        token_symbol = first_token.get("symbol")
+        token_format = first_token.get("format")
+
+    # Get governance type (first one if multiple)
+    governance_type = rec["governance"][0] if rec.get("governance") else None
+
+    metrics = rec.get("metrics") or {}
+
+    return (
+        rec["name"], rec["slug"], category_ids.get(rec.get("category")), rec.get("is_active", True),
+        rec.get("description"), rec.get("website"), combined_tags,
+        chains_str, rec.get("multi_chain", False), rec.get("birth_date"),
+        rec.get("ownership_status"), rec.get("level_of_decentralisation"),
+        rec.get("capital_raised", 0),
+        token_symbol, token_format, governance_type,
+        metrics.get("tvl", 0), metrics.get("users", 0), metrics.get("volume", 0),
+        metrics.get("transactions", 0),
+    )
+
+
+def _quote_row(dapp_id, rec):
+    """(dapp_id, QUOTE_COLUMNS values) row for a normalized record"""
+    metrics = rec.get("metrics") or {}
+    market_data = rec.get("market_data") or {}
+    quote_usd = market_data.get("quote", {}).get("USD", {})
+
+    return (
+        dapp_id, metrics.get("market_cap", 0),
+        market_data.get("circulating_supply", 0), market_data.get("total_supply", 0),
+        market_data.get("max_supply", 0),
+        quote_usd.get("price", 0), quote_usd.get("volume_24h", 0), quote_usd.get("volume_change_24h", 0),
+        quote_usd.get("percent_change_1h", 0), quote_usd.get("percent_change_24h", 0),
+        quote_usd.get("percent_change_7d", 0), quote_usd.get("percent_change_30d", 0),
+        0.0, 0.0, 0,
+        quote_usd.get("market_cap_dominance", 0), quote_usd.get("fully_diluted_market_cap", 0),
+    )
+
+
+def _store_batch(cur, batch):
     """
-    Store records in the extended database schema
+    Upsert a batch of (record, staging row) pairs with unique slugs and
+    their history rows. Returns (inserted, updated); the caller commits.
     """
-    conn = get_conn()
-    cur = conn.cursor()
+    columns = ", ".join(DAPP_COLUMNS)
+    cur.execute(
+        f"""
+        CREATE TEMP TABLE IF NOT EXISTS dapps_stage ON COMMIT DELETE ROWS AS
+        SELECT {columns} FROM dapps WITH NO DATA;
+        """
+    )
+    copy_rows(cur, "dapps_stage", DAPP_COLUMNS, (row for _, row in batch))
 
+    # A record whose slug is new but whose name is already stored updates that
+    # DApp (as the old name-or-slug lookup did): move the stored row to the new slug first.
+    # A DApp whose current slug is also in the batch keeps it; that record updates it
+    cur.execute(
+        """
+        WITH candidates AS (
+            SELECT DISTINCT ON (s.slug) s.slug, d.id
+            FROM dapps_stage s
+            JOIN dapps d ON d.name = s.name
+            WHERE NOT EXISTS (SELECT 1 FROM dapps x WHERE x.slug = s.slug)
+              AND NOT EXISTS (SELECT 1 FROM dapps_stage s2 WHERE s2.slug = d.slug)
+            ORDER BY s.slug, d.id
+        ), renamed AS (
+            SELECT DISTINCT ON (id) id, slug FROM candidates ORDER BY id, slug
+        )
+        UPDATE dapps d SET slug = r.slug
+        FROM renamed r
+        WHERE d.id = r.id;
+        """
+    )
+
+    assignments = ",\n            ".join(
+        f"{column} = EXCLUDED.{column}" for column in DAPP_COLUMNS if column != "slug"
+    )
+    cur.execute(
+        f"""
+        INSERT INTO dapps (tvl_ratio, {columns})
+        SELECT 0.0, {columns}
+        FROM dapps_stage
+        ON CONFLICT (slug) DO UPDATE SET
+            {assignments},
+            updated_at = CURRENT_TIMESTAMP
+        RETURNING slug, id, (xmax = 0);
+        """
+    )
+    dapp_ids = {}
+    inserted = 0
+    for slug, dapp_id, is_insert in cur.fetchall():
+        dapp_ids[slug] = dapp_id
+        inserted += int(is_insert)
+
+    quote_rows, tvl_rows, chain_tvl_rows, raise_rows = [], [], [], []
+    for rec, _ in batch:
+        dapp_id = dapp_ids[rec["slug"]]
+        quote_rows.append(_quote_row(dapp_id, rec))
+        tvl_rows.extend(_tvl_rows(dapp_id, rec.get("tvl_historical")))
+        chain_tvl_rows.extend(_chain_tvl_rows(dapp_id, rec.get("chain_tvl_historical")))
+        raise_rows.extend(_raise_rows(dapp_id, rec.get("raises")))
+    merge_rows(cur, "dapp_market_quotes", ("dapp_id",) + QUOTE_COLUMNS, ("dapp_id",), quote_rows, touch="updated_at")
+    if tvl_rows:
+        merge_tvl_rows(cur, tvl_rows)
+    if chain_tvl_rows:
+        merge_rows(cur, "chain_tvl_historical", ("dapp_id", "chain", "date", "tvl"), ("dapp_id", "chain", "date"), chain_tvl_rows)
+    if raise_rows:
+        merge_raise_rows(cur, raise_rows)
+    for column in ("chains", "tags"):
+        position = DAPP_COLUMNS.index(column)
+        sync_links(cur, column, {dapp_ids[rec["slug"]]: row[position] for rec, row in batch})
+    append_snapshots(cur, dapp_ids.values())
+
+    cur.execute("DELETE FROM dapps_stage;")
+    return inserted, len(dapp_ids) - inserted
+
+
+def reject_record(cur, rec, error):
+    """
+    Log a record that could not be stored and keep it in store_rejects
+    (under its own savepoint, so a missing table never aborts the batch)
+    """
+    log.error("❌ Error storing DApp %s: %s", rec.get("name", "Unknown"), error)
+    run_metrics.count("store_errors")
+    run = run_metrics.current_run()
+    cur.execute("SAVEPOINT store_reject;")
+    try:
+        cur.execute(
+            """
+            INSERT INTO store_rejects (command, slug, name, error, record)
+            VALUES (%s, %s, %s, %s, %s);
+            """,
+            (
+                run.command if run else None, rec.get("slug"), rec.get("name"),
+                str(error).strip(), json.dumps(rec, default=str),
+            )
+        )
+        cur.execute("RELEASE SAVEPOINT store_reject;")
+    except Exception as e:
+        cur.execute("ROLLBACK TO SAVEPOINT store_reject;")
+        log.warning("⚠️ Could not keep rejected record %s (run migrations/migrate_store_rejects.py?): %s", rec.get("slug"), e)
+
+
+def _apply_isolated(cur, batch):
+    """
+    Apply a batch under a savepoint. A failing batch is rolled back to
+    the savepoint and split in halves until the bad records are isolated
+    and rejected; everything else in it is stored. Returns (inserted, updated).
+    """
+    cur.execute("SAVEPOINT store_batch;")
+    try:
+        result = _store_batch(cur, batch)
+        cur.execute("RELEASE SAVEPOINT store_batch;")
+        return result
+    except Exception as e:
+        cur.execute("ROLLBACK TO SAVEPOINT store_batch;")
+        cur.execute("RELEASE SAVEPOINT store_batch;")
+        error = e
+
+    if len(batch) == 1:
+        reject_record(cur, batch[0][0], error)
+        return 0, 0
+    log.debug("⚠️ Batch of %s DApps failed (%s), splitting it", len(batch), str(error).strip())
+    middle = len(batch) // 2
+    first = _apply_isolated(cur, batch[:middle])
+    second = _apply_isolated(cur, batch[middle:])
+    return first[0] + second[0], first[1] + second[1]
+
+
+def store_records(records):
+    """
+    Store records in the extended database schema.
+
+    Records are deduplicated by slug (the last one wins) and written in
+    transactions of STORE_BATCH_SIZE: each batch is COPYed into a staging
+    table and applied with one INSERT ... ON CONFLICT (slug) DO UPDATE plus
+    one merge into dapp_market_quotes and one per history table; chain
+    and tag links are synced and the stored metrics are appended to
+    dapp_metric_snapshots, then the batch is committed. A bad record only
+    loses itself: the batch is rolled back to a savepoint and bisected
+    until the record is isolated, and the record goes to store_rejects.
+    """
+    # Categories come from the lookup cache: no query once the names are known
+    category_ids = lookup("categories").resolve(rec.get("category") for rec in records)
+    staged = {}
+    invalid = []
     for rec in records:
         try:
-            print(f"Storing DApp: {rec['name']}")
-            
-            # Get category ID
-            category_id = None
-            if rec.get("category"):
-                category_id = get_or_create_category(cur, rec["category"])
-            
-            # Prepare chains as comma-separated string
-            chains_str = ",".join(rec.get("chains", [])) if rec.get("chains") else ""
-            
-            # Combine tags from all sources (DappRadar, CoinMarketCap, CoinGecko, DeFiLlama)
-            combined_tags = combine_tags(
-                rec.get("tags"), 
-                rec.get("cmc_tags"),
-                rec.get("gecko_categories"),
-                rec.get("defillama_tags")
-            )
-            
-            # Get token info (first token if multiple)
-            token_symbol = None
-            token_format = None
-            if rec.get("tokens") and len(rec["tokens"]) > 0:
-                first_token = rec["tokens"][0]
-                token_symbol = first_token.get("symbol")
-                token_format = first_token.get("format")
-            
-            # Get governance type (first one if multiple)
-            governance_type = None
-            if rec.get("governance") and len(rec["governance"]) > 0:
-                governance_type = rec["governance"][0]
-            
-            # Extract metrics data
-            metrics = rec.get("metrics", {})
-            tvl = metrics.get("tvl", 0)
-            users = metrics.get("users", 0)
-            volume = metrics.get("volume", 0)
-            transactions = metrics.get("transactions", 0)
-            market_cap = metrics.get("market_cap", 0)
-            
-            # Extract market data (from coinmarketcap)
-            market_data = rec.get("market_data", {})
-            circulating_supply = market_data.get("circulating_supply", 0)
-            total_supply = market_data.get("total_supply", 0)
-            max_supply = market_data.get("max_supply", 0)
-            
-            # Extract USD quote data
-            quote_usd = market_data.get("quote", {}).get("USD", {})
-            price = quote_usd.get("price", 0)
-            volume_24h = quote_usd.get("volume_24h", 0)
-            volume_change_24h = quote_usd.get("volume_change_24h", 0)
-            percent_change_1h = quote_usd.get("percent_change_1h", 0)
-            percent_change_24h = quote_usd.get("percent_change_24h", 0)
-            percent_change_7d = quote_usd.get("percent_change_7d", 0)
-            percent_change_30d = quote_usd.get("percent_change_30d", 0)
-            market_cap_dominance = quote_usd.get("market_cap_dominance", 0)
-            fully_diluted_market_cap = quote_usd.get("fully_diluted_market_cap", 0)
-            last_updated = quote_usd.get("last_updated")
-            
-            # Parse last_updated if it's a string
-            if last_updated and isinstance(last_updated, str):
-                try:
-                    last_updated = datetime.fromisoformat(last_updated.replace('Z', '+00:00'))
-                except:
-                    last_updated = None
-            
-            # Check if a record with the same name or slug already exists
-            cur.execute(
-                "SELECT id FROM dapps WHERE name = %s OR slug = %s;", 
-                (rec["name"], rec["slug"])
-            )
-            existing_record = cur.fetchone()
-            
-            if existing_record:
-                # Update existing record
-                existing_id = existing_record[0]
-                cur.execute(
-                    """
-                    UPDATE dapps SET
-                        name = %s,
-                        slug = %s,
-                        category_id = %s,
-                        is_active = %s,
-                        description = %s,
-                        website = %s,
-                        tags = %s,
-                        chains = %s,
-                        multi_chain = %s,
-                        birth_date = %s,
-                        ownership_status = %s,
-                        level_of_decentralisation = %s,
-                        capital_raised = %s,
-                        token_symbol = %s,
-                        token_format = %s,
-                        governance_type = %s,
-                        tvl = %s,
-                        users = %s,
-                        volume = %s,
-                        transactions = %s,
-                        market_cap = %s,
-                        circulating_supply = %s,
-                        total_supply = %s,
-                        max_supply = %s,
-                        price = %s,
-                        volume_24h = %s,
-                        volume_change_24h = %s,
-                        percent_change_1h = %s,
-                        percent_change_24h = %s,
-                        percent_change_7d = %s,
-                        percent_change_30d = %s,
-                        percent_change_60d = %s,
-                        percent_change_90d = %s,
-                        cmc_rank = %s,
-                        market_cap_dominance = %s,
-                        fully_diluted_market_cap = %s,
-                        updated_at = CURRENT_TIMESTAMP
-                    WHERE id = %s;
-                    """,
-                    (
-                        rec["name"], rec["slug"], category_id, rec.get("is_active", True),
-                        rec.get("description"), rec.get("website"), combined_tags,
-                        chains_str, rec.get("multi_chain", False), rec.get("birth_date"),
-                        rec.get("ownership_status"), rec.get("level_of_decentralisation"),
-                        rec.get("capital_raised", 0),
-                        token_symbol, token_format, governance_type,
-                        tvl, users, volume, transactions, market_cap,
-                        circulating_supply, total_supply, max_supply,
-                        price, volume_24h, volume_change_24h,
-                        percent_change_1h, percent_change_24h, percent_change_7d, percent_change_30d,
-                        0.0, 0.0, 0,
-                        market_cap_dominance, fully_diluted_market_cap,
-                        existing_id
-                    )
-                )
-                dapp_id = existing_id
-            else:
-                # Insert new record
-                cur.execute(
-                    """
-                    INSERT INTO dapps (
-                        name, slug, category_id, is_active, description, website,
-                        tags, chains, multi_chain, birth_date, ownership_status, level_of_decentralisation,
-                        capital_raised, token_symbol, token_format,
-                        governance_type, tvl, tvl_ratio, users, volume, transactions, market_cap,
-                        circulating_supply, total_supply, max_supply,
-                        price, volume_24h, volume_change_24h,
-                        percent_change_1h, percent_change_24h, percent_change_7d, percent_change_30d,
-                        percent_change_60d, percent_change_90d, cmc_rank,
-                        market_cap_dominance, fully_diluted_market_cap
-                    ) VALUES (
-                        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                    )
-                    RETURNING id;
-                    """,
-                    (
-                        rec["name"], rec["slug"], category_id, rec.get("is_active", True),
-                        rec.get("description"), rec.get("website"), combined_tags,
-                        chains_str, rec.get("multi_chain", False), rec.get("birth_date"),
-                        rec.get("ownership_status"), rec.get("level_of_decentralisation"),
-                        rec.get("capital_raised", 0),
-                        token_symbol, token_format, governance_type,
-                        tvl, 0.0, users, volume, transactions, market_cap,
-                        circulating_supply, total_supply, max_supply,
-                        price, volume_24h, volume_change_24h,
-                        percent_change_1h, percent_change_24h, percent_change_7d, percent_change_30d,
-                        0.0, 0.0, 0,
-                        market_cap_dominance, fully_diluted_market_cap
-                    )
-                )
-                dapp_id = cur.fetchone()
-                if dapp_id:
-                    dapp_id = dapp_id[0]
-                else:
-                    dapp_id = None
-            
-            # Store TVL historical data if present
-            if dapp_id and rec.get("tvl_historical"):
-                store_tvl_historical(cur, dapp_id, rec["tvl_historical"])
-            
-            # Store raises data if present
-            if dapp_id and rec.get("raises"):
-                store_raises(cur, dapp_id, rec["raises"])
-            
-            print(f"✅ Successfully stored DApp: {rec['name']}")
-            
+            staged[rec["slug"]] = (rec, _dapp_row(rec, category_ids))
         except Exception as e:
-            print(f"❌ Error storing DApp {rec.get('name', 'Unknown')}: {e}")
-            conn.rollback()
-            continue
+            invalid.append((rec, e))
+    pending = list(staged.values())
 
-    conn.commit()
-    cur.close()
-    conn.close()
+    conn = get_conn()
+    cur = conn.cursor()
+    progress = Progress(log, "store", len(pending))
+    try:
+        for rec, error in invalid:
+            reject_record(cur, rec, error)
+        conn.commit()
+
+        for start in range(0, len(pending), STORE_BATCH_SIZE):
+            batch = pending[start:start + STORE_BATCH_SIZE]
+            inserted, updated = _apply_isolated(cur, batch)
+            conn.commit()
+            run_metrics.count("rows_inserted", inserted)
+            run_metrics.count("rows_updated", updated)
+            progress.update(n=len(batch))
+    finally:
+        cur.close()
+        conn.close()
 
 def store_single_record(record):
     """Store a single record - wrapper for store_records"""
@@ -1,18 +1,15 @@
-import os
-import configparser
-import requests
+import time
 
-from scripts import rate_limiter
-from bs4 import BeautifulSoup
+from dapp_scraper.config import get_config
 
 # load config.ini
-CFG = configparser.ConfigParser()
-cfg_path = os.path.join(os.path.dirname(__file__), os.pardir, "config", "config.ini")
-CFG.read(cfg_path)
+CFG = get_config()
 
 
 def get_rate_limiter():
     if not hasattr(get_rate_limiter, "instance"):
+        from scripts import rate_limiter
+
         get_rate_limiter.instance = rate_limiter.DappRadarRateLimiter()
     return get_rate_limiter.instance
 
@@ -29,9 +26,20 @@ def make_rate_limited_request(url, headers, params=None):
     """
     Make a rate-limited request to DappRadar API
     """
+    import requests
+
+    from dapp_scraper import run_metrics
+
     rate_limiter_instance = get_rate_limiter()
     rate_limiter_instance.wait_if_needed()
-    return requests.get(url, headers=headers, params=params)
+    started = time.time()
+    try:
+        response = requests.get(url, headers=headers, params=params)
+    except requests.RequestException as e:
+        run_metrics.record_request(url, error=e, seconds=time.time() - started)
+        raise
+    run_metrics.record_request(url, response, seconds=time.time() - started)
+    return response
 
 
 def safe_numeric(value, default=0):
@@ -5,25 +5,12 @@ Adds: gecko_id, cmc_id, mcap columns
 """
 
 import os
-from configparser import ConfigParser
+import sys
 import psycopg2
 
-_cfg = ConfigParser()
-_cfg.read(os.path.join(os.path.dirname(__file__), '..', 'config', 'config.ini'))
-DB_NAME = _cfg["database"]["name"]
-SUPERUSER = _cfg["database"]["user"]
-PASSWORD = _cfg["database"]["password"]
-HOST = _cfg["database"]["host"]
-PORT = _cfg["database"]["port"]
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-def get_conn():
-    return psycopg2.connect(
-        dbname=DB_NAME,
-        user=SUPERUSER,
-        password=PASSWORD,
-        host=HOST,
-        port=PORT
-    )
+from dapp_scraper.db import get_conn
 
 def check_column_exists(cur, table_name, column_name):
     """Check if a column exists in a table"""
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Migration script to add per-chain TVL history
+Adds: chain_tvl_historical table (dapp_id, chain, date, tvl) and its rollup indexes
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from dapp_scraper.db import get_conn
+
+DDL = """
+CREATE TABLE IF NOT EXISTS chain_tvl_historical (
+  dapp_id INTEGER NOT NULL REFERENCES dapps(id) ON DELETE CASCADE,
+  chain VARCHAR(100) NOT NULL,
+  date DATE NOT NULL,
+  tvl NUMERIC NOT NULL,
+  PRIMARY KEY (dapp_id, chain, date)
+);
+
+CREATE INDEX IF NOT EXISTS idx_chain_tvl_historical_chain_date ON chain_tvl_historical(chain, date);
+CREATE INDEX IF NOT EXISTS idx_chain_tvl_historical_date ON chain_tvl_historical(date);
+"""
+
+def migrate():
+    conn = get_conn()
+    cur = conn.cursor()
+
+    try:
+        print("🔧 Creating chain_tvl_historical table and indexes...")
+        cur.execute(DDL)
+        conn.commit()
+        print("🎉 Migration completed successfully!")
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+if __name__ == "__main__":
+    print("🗃️ Database Migration: Per-chain TVL history")
+    print("=" * 50)
+
+    try:
+        migrate()
+    except Exception as e:
+        print(f"\n💥 Migration crashed: {e}")
+        sys.exit(1)
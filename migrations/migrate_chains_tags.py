@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Migration script to normalize DApp chains and tags
+Adds: chains and tags lookup tables and the dapp_chains / dapp_tags
+association tables, filled from the comma-separated dapps.chains and
+dapps.tags columns, and drops the English full-text indexes on those columns
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from dapp_scraper.db import get_conn
+
+DDL = """
+CREATE TABLE IF NOT EXISTS chains (
+  id SERIAL PRIMARY KEY,
+  name VARCHAR(100) UNIQUE NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS tags (
+  id SERIAL PRIMARY KEY,
+  name VARCHAR(255) UNIQUE NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS dapp_chains (
+  dapp_id INTEGER NOT NULL REFERENCES dapps(id) ON DELETE CASCADE,
+  chain_id INTEGER NOT NULL REFERENCES chains(id),
+  PRIMARY KEY (dapp_id, chain_id)
+);
+
+CREATE TABLE IF NOT EXISTS dapp_tags (
+  dapp_id INTEGER NOT NULL REFERENCES dapps(id) ON DELETE CASCADE,
+  tag_id INTEGER NOT NULL REFERENCES tags(id),
+  PRIMARY KEY (dapp_id, tag_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_dapp_chains_chain ON dapp_chains(chain_id, dapp_id);
+CREATE INDEX IF NOT EXISTS idx_dapp_tags_tag ON dapp_tags(tag_id, dapp_id);
+
+-- Stemming and stop words mean nothing for chain names and tag slugs
+DROP INDEX IF EXISTS idx_dapps_chains;
+DROP INDEX IF EXISTS idx_dapps_tags;
+"""
+
+# (dapps column, lookup table, association table, id column)
+LINKS = (
+    ("chains", "chains", "dapp_chains", "chain_id"),
+    ("tags", "tags", "dapp_tags", "tag_id"),
+)
+
+def backfill(cur, column, lookup_table, link_table, id_column):
+    """Intern the names of a comma-separated dapps column and link them; returns (names, links) added"""
+    cur.execute(
+        f"""
+        INSERT INTO {lookup_table} (name)
+        SELECT DISTINCT btrim(item)
+        FROM dapps, unnest(string_to_array({column}, ',')) AS item
+        WHERE btrim(item) <> ''
+        ON CONFLICT (name) DO NOTHING;
+        """
+    )
+    names = cur.rowcount
+    cur.execute(
+        f"""
+        INSERT INTO {link_table} (dapp_id, {id_column})
+        SELECT DISTINCT d.id, l.id
+        FROM dapps d, unnest(string_to_array(d.{column}, ',')) AS item
+        JOIN {lookup_table} l ON l.name = btrim(item)
+        ON CONFLICT DO NOTHING;
+        """
+    )
+    return names, cur.rowcount
+
+def migrate():
+    conn = get_conn()
+    cur = conn.cursor()
+
+    try:
+        print("🔧 Creating chains, tags, dapp_chains and dapp_tags tables...")
+        cur.execute(DDL)
+
+        for column, lookup_table, link_table, id_column in LINKS:
+            print(f"🔗 Linking DApps to their {column}...")
+            names, links = backfill(cur, column, lookup_table, link_table, id_column)
+            print(f"✅ Added {names} {lookup_table} and {links} {link_table} rows")
+
+        conn.commit()
+
+        conn.autocommit = True
+        for _, lookup_table, link_table, _ in LINKS:
+            cur.execute(f"ANALYZE {lookup_table};")
+            cur.execute(f"ANALYZE {link_table};")
+        print("🎉 Migration completed successfully!")
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        if not conn.autocommit:
+            conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+if __name__ == "__main__":
+    print("🗃️ Database Migration: Normalized chains and tags")
+    print("=" * 50)
+
+    try:
+        migrate()
+    except Exception as e:
+        print(f"\n💥 Migration crashed: {e}")
+        sys.exit(1)
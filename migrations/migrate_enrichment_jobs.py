@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the enrichment job queue
+Adds: enrichment_jobs table claimed by scripts/enrich_worker.py with FOR UPDATE SKIP LOCKED
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from dapp_scraper.db import get_conn
+
+DDL = """
+CREATE TABLE IF NOT EXISTS enrichment_jobs (
+  job_id BIGSERIAL PRIMARY KEY,
+  dapp_id INTEGER NOT NULL REFERENCES dapps(id) ON DELETE CASCADE,
+  task VARCHAR(32) NOT NULL DEFAULT 'enrich',
+  status VARCHAR(20) NOT NULL DEFAULT 'pending',
+  priority INTEGER NOT NULL DEFAULT 0,
+  attempts INTEGER NOT NULL DEFAULT 0,
+  max_attempts INTEGER NOT NULL DEFAULT 5,
+  run_after TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  locked_by VARCHAR(255),
+  locked_at TIMESTAMP,
+  heartbeat_at TIMESTAMP,
+  last_error TEXT,
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  finished_at TIMESTAMP,
+  UNIQUE (dapp_id, task)
+);
+
+CREATE INDEX IF NOT EXISTS idx_enrichment_jobs_claim ON enrichment_jobs(task, priority DESC, job_id) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_enrichment_jobs_running ON enrichment_jobs(heartbeat_at) WHERE status = 'running';
+"""
+
+def migrate():
+    conn = get_conn()
+    cur = conn.cursor()
+
+    try:
+        print("🔧 Creating enrichment_jobs table and indexes...")
+        cur.execute(DDL)
+        conn.commit()
+        print("🎉 Migration completed successfully!")
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+if __name__ == "__main__":
+    print("🗃️ Database Migration: Enrichment job queue")
+    print("=" * 50)
+
+    try:
+        migrate()
+    except Exception as e:
+        print(f"\n💥 Migration crashed: {e}")
+        sys.exit(1)
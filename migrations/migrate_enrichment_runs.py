@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the enrichment run journal
+Adds: enrichment_runs and enrichment_run_items tables used for batched commits and --resume
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from dapp_scraper.db import get_conn
+
+DDL = """
+CREATE TABLE IF NOT EXISTS enrichment_runs (
+  run_id SERIAL PRIMARY KEY,
+  status VARCHAR(20) NOT NULL DEFAULT 'running',
+  incremental_tvl BOOLEAN DEFAULT TRUE,
+  total_dapps INTEGER,
+  processed_dapps INTEGER DEFAULT 0,
+  enriched_dapps INTEGER DEFAULT 0,
+  last_dapp_id INTEGER,
+  started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  checkpointed_at TIMESTAMP,
+  finished_at TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS enrichment_run_items (
+  run_id INTEGER NOT NULL REFERENCES enrichment_runs(run_id) ON DELETE CASCADE,
+  dapp_id INTEGER NOT NULL REFERENCES dapps(id) ON DELETE CASCADE,
+  status VARCHAR(20) NOT NULL,
+  error TEXT,
+  processed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (run_id, dapp_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_enrichment_runs_status ON enrichment_runs(status);
+"""
+
+def migrate():
+    conn = get_conn()
+    cur = conn.cursor()
+
+    try:
+        print("🔧 Creating enrichment run journal tables...")
+        cur.execute(DDL)
+        conn.commit()
+        print("🎉 Migration completed successfully!")
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+if __name__ == "__main__":
+    print("🗃️ Database Migration: Enrichment run journal")
+    print("=" * 50)
+
+    try:
+        migrate()
+    except Exception as e:
+        print(f"\n💥 Migration crashed: {e}")
+        sys.exit(1)
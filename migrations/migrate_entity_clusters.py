@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Migration script to add DApp entity clustering
+Adds: dapps.entity_id (canonical DApp id of the duplicate cluster) and its index
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from dapp_scraper.db import get_conn
+
+DDL = """
+ALTER TABLE dapps ADD COLUMN IF NOT EXISTS entity_id INTEGER REFERENCES dapps(id) ON DELETE SET NULL;
+CREATE INDEX IF NOT EXISTS idx_dapps_entity_id ON dapps(entity_id);
+"""
+
+def migrate():
+    conn = get_conn()
+    cur = conn.cursor()
+
+    try:
+        print("🔧 Adding dapps.entity_id and index...")
+        cur.execute(DDL)
+        conn.commit()
+        print("🎉 Migration completed successfully!")
+        print("👉 Run python scripts/cluster_dapps.py to populate entity ids")
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+if __name__ == "__main__":
+    print("🗃️ Database Migration: DApp entity clusters")
+    print("=" * 50)
+
+    try:
+        migrate()
+    except Exception as e:
+        print(f"\n💥 Migration crashed: {e}")
+        sys.exit(1)
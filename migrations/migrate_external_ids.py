@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the cross-provider ID mapping table
+Adds: dapp_external_ids table, seeded from the existing dapps.gecko_id / dapps.cmc_id columns
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from dapp_scraper.db import get_conn
+
+DDL = """
+CREATE TABLE IF NOT EXISTS dapp_external_ids (
+  dapp_id INTEGER NOT NULL REFERENCES dapps(id) ON DELETE CASCADE,
+  provider VARCHAR(32) NOT NULL,
+  external_id VARCHAR(255),
+  match_method VARCHAR(50),
+  confidence NUMERIC,
+  verified_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  expires_at TIMESTAMP,
+  PRIMARY KEY (dapp_id, provider)
+);
+
+CREATE INDEX IF NOT EXISTS idx_dapp_external_ids_provider_id ON dapp_external_ids(provider, external_id);
+"""
+
+SEED_SQL = """
+INSERT INTO dapp_external_ids (dapp_id, provider, external_id, match_method, confidence)
+SELECT id, %s, {column}, 'legacy_column', 0.8
+FROM dapps
+WHERE {column} IS NOT NULL AND {column} != ''
+ON CONFLICT (dapp_id, provider) DO NOTHING;
+"""
+
+def migrate():
+    conn = get_conn()
+    cur = conn.cursor()
+
+    try:
+        print("🔧 Creating dapp_external_ids table and indexes...")
+        cur.execute(DDL)
+
+        print("🌱 Seeding mappings from existing dapps columns...")
+        for provider, column in (("coingecko", "gecko_id"), ("coinmarketcap", "cmc_id")):
+            cur.execute(SEED_SQL.format(column=column), (provider,))
+            print(f"  ✅ {provider}: {cur.rowcount} mappings seeded from dapps.{column}")
+
+        conn.commit()
+        print("🎉 Migration completed successfully!")
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+if __name__ == "__main__":
+    print("🗃️ Database Migration: Provider ID mappings")
+    print("=" * 50)
+
+    try:
+        migrate()
+    except Exception as e:
+        print(f"\n💥 Migration crashed: {e}")
+        sys.exit(1)
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Migration script to move price and market data out of dapps
+Adds: dapp_market_quotes table (filled from the dapps columns) and the
+dapps_with_quotes view, then drops the quote columns and their index from
+dapps and compacts it, so quote refreshes no longer rewrite whole DApp rows.
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from dapp_scraper.db import get_conn
+
+QUOTE_COLUMNS = (
+    "market_cap", "circulating_supply", "total_supply", "max_supply",
+    "price", "volume_24h", "volume_change_24h",
+    "percent_change_1h", "percent_change_24h", "percent_change_7d",
+    "percent_change_30d", "percent_change_60d", "percent_change_90d",
+    "cmc_rank", "market_cap_dominance", "fully_diluted_market_cap",
+)
+
+DDL = """
+-- Narrow rows with free page space and no index on the values, so a
+-- quote refresh is a HOT update that leaves dapps and its indexes alone
+CREATE TABLE IF NOT EXISTS dapp_market_quotes (
+  dapp_id INTEGER PRIMARY KEY REFERENCES dapps(id) ON DELETE CASCADE,
+  market_cap NUMERIC DEFAULT 0,
+  circulating_supply NUMERIC DEFAULT 0,
+  total_supply NUMERIC DEFAULT 0,
+  max_supply NUMERIC DEFAULT 0,
+  price NUMERIC DEFAULT 0,
+  volume_24h NUMERIC DEFAULT 0,
+  volume_change_24h NUMERIC DEFAULT 0,
+  percent_change_1h NUMERIC DEFAULT 0,
+  percent_change_24h NUMERIC DEFAULT 0,
+  percent_change_7d NUMERIC DEFAULT 0,
+  percent_change_30d NUMERIC DEFAULT 0,
+  percent_change_60d NUMERIC DEFAULT 0,
+  percent_change_90d NUMERIC DEFAULT 0,
+  cmc_rank INTEGER DEFAULT 0,
+  market_cap_dominance NUMERIC DEFAULT 0,
+  fully_diluted_market_cap NUMERIC DEFAULT 0,
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP  -- last time a value changed
+) WITH (fillfactor = 70);
+"""
+
+VIEW = """
+DROP VIEW IF EXISTS dapps_with_quotes;
+CREATE VIEW dapps_with_quotes AS
+SELECT d.*,
+       q.market_cap, q.circulating_supply, q.total_supply, q.max_supply,
+       q.price, q.volume_24h, q.volume_change_24h,
+       q.percent_change_1h, q.percent_change_24h, q.percent_change_7d,
+       q.percent_change_30d, q.percent_change_60d, q.percent_change_90d,
+       q.cmc_rank, q.market_cap_dominance, q.fully_diluted_market_cap,
+       q.updated_at AS quotes_updated_at
+FROM dapps d
+LEFT JOIN dapp_market_quotes q ON q.dapp_id = d.id;
+"""
+
+def dapps_quote_columns(cur):
+    """Quote columns still present on dapps"""
+    cur.execute(
+        """
+        SELECT column_name FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = 'dapps' AND column_name = ANY(%s);
+        """,
+        (list(QUOTE_COLUMNS),)
+    )
+    present = {row[0] for row in cur.fetchall()}
+    return [column for column in QUOTE_COLUMNS if column in present]
+
+def table_size(cur):
+    cur.execute("SELECT COUNT(*), pg_size_pretty(pg_total_relation_size('dapps')) FROM dapps;")
+    return cur.fetchone()
+
+def migrate():
+    conn = get_conn()
+    cur = conn.cursor()
+
+    try:
+        rows, size = table_size(cur)
+        print(f"📊 dapps before: {rows} rows, {size}")
+
+        print("🔧 Creating dapp_market_quotes table...")
+        cur.execute(DDL)
+
+        columns = dapps_quote_columns(cur)
+        if columns:
+            column_list = ", ".join(columns)
+            print(f"📋 Copying {len(columns)} quote columns from dapps...")
+            cur.execute(
+                f"""
+                INSERT INTO dapp_market_quotes (dapp_id, {column_list})
+                SELECT id, {column_list} FROM dapps
+                ON CONFLICT (dapp_id) DO NOTHING;
+                """
+            )
+            print(f"✅ Copied quotes of {cur.rowcount} DApps")
+
+            print("🗑️ Dropping quote columns from dapps...")
+            cur.execute("DROP VIEW IF EXISTS dapps_with_quotes;")
+            cur.execute("DROP INDEX IF EXISTS idx_dapps_market_cap;")
+            cur.execute("ALTER TABLE dapps " + ", ".join(f"DROP COLUMN {column}" for column in columns) + ";")
+        else:
+            print("✅ dapps has no quote columns left")
+
+        print("🔧 Creating dapps_with_quotes view...")
+        cur.execute(VIEW)
+        conn.commit()
+
+        if columns:
+            # Dropped columns keep their space until the rows are rewritten
+            print("🗜️ Compacting dapps (VACUUM FULL)...")
+            conn.autocommit = True
+            cur.execute("VACUUM (FULL, ANALYZE) dapps;")
+            cur.execute("VACUUM ANALYZE dapp_market_quotes;")
+
+            rows, size = table_size(cur)
+            print(f"📊 dapps after: {rows} rows, {size}")
+        print("🎉 Migration completed successfully!")
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        if not conn.autocommit:
+            conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+if __name__ == "__main__":
+    print("🗃️ Database Migration: Market quotes table")
+    print("=" * 50)
+
+    try:
+        migrate()
+    except Exception as e:
+        print(f"\n💥 Migration crashed: {e}")
+        sys.exit(1)
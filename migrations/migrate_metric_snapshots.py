@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the daily metric history
+Adds: dapp_metric_snapshots table (range partitioned by month on
+snapshot_date, BRIN index on snapshot_date), seeded with today's snapshot
+of every DApp
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from dapp_scraper.db import get_conn
+
+DDL = """
+CREATE TABLE IF NOT EXISTS dapp_metric_snapshots (
+  dapp_id INTEGER NOT NULL REFERENCES dapps(id) ON DELETE CASCADE,
+  snapshot_date DATE NOT NULL,
+  users BIGINT,
+  volume NUMERIC,
+  transactions BIGINT,
+  tvl NUMERIC,
+  market_cap NUMERIC,
+  price NUMERIC,
+  captured_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,  -- last write of the day
+  PRIMARY KEY (dapp_id, snapshot_date)
+) PARTITION BY RANGE (snapshot_date);
+
+-- Snapshots are appended in date order, so a BRIN index stays tiny
+CREATE INDEX IF NOT EXISTS idx_dapp_metric_snapshots_date ON dapp_metric_snapshots USING brin(snapshot_date);
+"""
+
+def migrate():
+    from dapp_scraper.snapshots import append_snapshots
+
+    conn = get_conn()
+    cur = conn.cursor()
+
+    try:
+        print("🔧 Creating dapp_metric_snapshots table and index...")
+        cur.execute(DDL)
+        conn.commit()
+
+        print("📸 Recording today's snapshot of every DApp...")
+        cur.execute("SELECT id FROM dapps;")
+        added = append_snapshots(cur, [row[0] for row in cur.fetchall()])
+        conn.commit()
+        print(f"✅ Recorded {added} snapshots")
+        print("🎉 Migration completed successfully!")
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+if __name__ == "__main__":
+    print("🗃️ Database Migration: Metric snapshot history")
+    print("=" * 50)
+
+    try:
+        migrate()
+    except Exception as e:
+        print(f"\n💥 Migration crashed: {e}")
+        sys.exit(1)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Migration script to give raises a natural key
+Removes the funding rounds earlier enrichment runs inserted more than once
+(keeping the newest row of each (dapp_id, date, round, amount)), lets
+undated rounds be stored, (re)creates the unique index the raises loader
+merges on, and compacts the table.
+Safe to run again on a database migrated before undated rounds were kept.
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from dapp_scraper.db import get_conn
+
+DEDUPLICATE = """
+LOCK TABLE raises IN SHARE ROW EXCLUSIVE MODE;
+
+DELETE FROM raises
+WHERE id IN (
+  SELECT id FROM (
+    SELECT id, ROW_NUMBER() OVER (
+      PARTITION BY dapp_id, COALESCE(date, '-infinity'::date), COALESCE(round, ''), COALESCE(amount, -1)
+      ORDER BY id DESC
+    ) AS copy
+    FROM raises
+  ) rounds
+  WHERE copy > 1
+);
+"""
+
+DDL = """
+-- DeFiLlama does not date every round; undated rounds share the '-infinity' key date
+ALTER TABLE raises ALTER COLUMN date DROP NOT NULL;
+
+-- defillama_id is DeFiLlama's protocol id, shared by all rounds of a protocol, so it is not part of the key
+-- An index from an earlier run of this migration keyed on the bare date
+DROP INDEX IF EXISTS idx_raises_natural_key;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_raises_natural_key ON raises(dapp_id, COALESCE(date, '-infinity'::date), COALESCE(round, ''), COALESCE(amount, -1));
+
+-- Lookups by dapp_id use the leading column of the key
+DROP INDEX IF EXISTS idx_raises_dapp_id;
+"""
+
+def table_size(cur):
+    cur.execute("SELECT COUNT(*), COALESCE(SUM(amount), 0), pg_size_pretty(pg_total_relation_size('raises')) FROM raises;")
+    return cur.fetchone()
+
+def migrate():
+    conn = get_conn()
+    cur = conn.cursor()
+
+    try:
+        rows, total, size = table_size(cur)
+        print(f"📊 raises before: {rows} rows, ${total:,.0f} raised in total, {size}")
+
+        print("🧹 Removing duplicate funding rounds...")
+        cur.execute(DEDUPLICATE)
+        print(f"✅ Removed {cur.rowcount} duplicate rows")
+
+        print("🔧 Adding natural key index...")
+        cur.execute(DDL)
+        conn.commit()
+
+        # VACUUM cannot run inside a transaction
+        print("🗜️ Compacting raises (VACUUM FULL)...")
+        conn.autocommit = True
+        cur.execute("VACUUM (FULL, ANALYZE) raises;")
+
+        rows, total, size = table_size(cur)
+        print(f"📊 raises after: {rows} rows, ${total:,.0f} raised in total, {size}")
+        print("🎉 Migration completed successfully!")
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        if not conn.autocommit:
+            conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+if __name__ == "__main__":
+    print("🗃️ Database Migration: raises natural key and compaction")
+    print("=" * 50)
+
+    try:
+        migrate()
+    except Exception as e:
+        print(f"\n💥 Migration crashed: {e}")
+        sys.exit(1)
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Migration script to add per-field-group refresh tracking
+Adds: dapp_refresh_state table used by run_fetch_enrich.py --scheduled
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from dapp_scraper.db import get_conn
+
+DDL = """
+CREATE TABLE IF NOT EXISTS dapp_refresh_state (
+  dapp_id INTEGER NOT NULL REFERENCES dapps(id) ON DELETE CASCADE,
+  field_group VARCHAR(32) NOT NULL,
+  refreshed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (dapp_id, field_group)
+);
+"""
+
+def migrate():
+    conn = get_conn()
+    cur = conn.cursor()
+
+    try:
+        print("🔧 Creating dapp_refresh_state table...")
+        cur.execute(DDL)
+        conn.commit()
+        print("🎉 Migration completed successfully!")
+        print("ℹ️ The first scheduled run refreshes every DApp, later runs only stale ones")
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+if __name__ == "__main__":
+    print("🗃️ Database Migration: Refresh state")
+    print("=" * 50)
+
+    try:
+        migrate()
+    except Exception as e:
+        print(f"\n💥 Migration crashed: {e}")
+        sys.exit(1)
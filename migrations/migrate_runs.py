@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the run records table
+Adds: runs table written by run_fetch.py, run_fetch_enrich.py and the CSV exporters
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from dapp_scraper.db import get_conn
+
+DDL = """
+CREATE TABLE IF NOT EXISTS runs (
+  run_id SERIAL PRIMARY KEY,
+  command VARCHAR(50) NOT NULL,
+  args TEXT,
+  status VARCHAR(20) NOT NULL,
+  started_at TIMESTAMP NOT NULL,
+  finished_at TIMESTAMP,
+  duration_seconds NUMERIC,
+  requests INTEGER DEFAULT 0,
+  request_bytes BIGINT DEFAULT 0,
+  request_errors INTEGER DEFAULT 0,
+  rows_inserted INTEGER DEFAULT 0,
+  rows_updated INTEGER DEFAULT 0,
+  records_processed INTEGER DEFAULT 0,
+  throughput_per_second NUMERIC,
+  metrics JSONB
+);
+CREATE INDEX IF NOT EXISTS idx_runs_command_started ON runs(command, started_at);
+"""
+
+def migrate():
+    conn = get_conn()
+    cur = conn.cursor()
+
+    try:
+        print("🔧 Creating runs table and index...")
+        cur.execute(DDL)
+        conn.commit()
+        print("🎉 Migration completed successfully!")
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+if __name__ == "__main__":
+    print("🗃️ Database Migration: Run records")
+    print("=" * 50)
+
+    try:
+        migrate()
+    except Exception as e:
+        print(f"\n💥 Migration crashed: {e}")
+        sys.exit(1)
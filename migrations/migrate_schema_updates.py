@@ -9,28 +9,11 @@ Migration script to update database schema:
 
 import os
 import sys
-from configparser import ConfigParser
-import psycopg2
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-_cfg = ConfigParser()
-_cfg.read(os.path.join(os.path.dirname(__file__), '..', 'config', 'config.ini'))
-DB_NAME = _cfg["database"]["name"]
-SUPERUSER = _cfg["database"]["user"]
-PASSWORD = _cfg["database"]["password"]
-HOST = _cfg["database"]["host"]
-PORT = _cfg["database"]["port"]
-
-def get_conn():
-    return psycopg2.connect(
-        dbname=DB_NAME,
-        user=SUPERUSER,
-        password=PASSWORD,
-        host=HOST,
-        port=PORT
-    )
+from dapp_scraper.db import get_conn
 
 def migrate():
     conn = get_conn()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the store reject table
+Adds: store_rejects table, where store_records keeps the records it could not write
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from dapp_scraper.db import get_conn
+
+DDL = """
+CREATE TABLE IF NOT EXISTS store_rejects (
+  reject_id SERIAL PRIMARY KEY,
+  rejected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  command VARCHAR(50),  -- run that tried to store the record
+  slug TEXT,
+  name TEXT,
+  error TEXT,
+  record JSONB  -- the normalized record as passed to store_records
+);
+CREATE INDEX IF NOT EXISTS idx_store_rejects_slug ON store_rejects(slug);
+"""
+
+def migrate():
+    conn = get_conn()
+    cur = conn.cursor()
+
+    try:
+        print("🔧 Creating store_rejects table and index...")
+        cur.execute(DDL)
+        conn.commit()
+        print("🎉 Migration completed successfully!")
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+if __name__ == "__main__":
+    print("🗃️ Database Migration: Store reject table")
+    print("=" * 50)
+
+    try:
+        migrate()
+    except Exception as e:
+        print(f"\n💥 Migration crashed: {e}")
+        sys.exit(1)
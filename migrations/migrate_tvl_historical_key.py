@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Migration script to give tvl_historical a natural key
+Removes the duplicate (dapp_id, date) points earlier enrichment runs appended
+(keeping the newest row of each), adds the UNIQUE (dapp_id, date) key the TVL
+loader merges on, and compacts the table to reclaim the space.
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from dapp_scraper.db import get_conn
+
+DEDUPLICATE = """
+LOCK TABLE tvl_historical IN SHARE ROW EXCLUSIVE MODE;
+
+DELETE FROM tvl_historical
+WHERE id IN (
+  SELECT id FROM (
+    SELECT id, ROW_NUMBER() OVER (PARTITION BY dapp_id, date ORDER BY id DESC) AS copy
+    FROM tvl_historical
+  ) points
+  WHERE copy > 1
+);
+"""
+
+DDL = """
+DO $$
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'tvl_historical_dapp_id_date_key') THEN
+    ALTER TABLE tvl_historical ADD CONSTRAINT tvl_historical_dapp_id_date_key UNIQUE (dapp_id, date);
+  END IF;
+END $$;
+
+-- Lookups by dapp_id use the leading column of the key
+DROP INDEX IF EXISTS idx_tvl_historical_dapp_id;
+"""
+
+def table_size(cur):
+    cur.execute("SELECT COUNT(*), pg_size_pretty(pg_total_relation_size('tvl_historical')) FROM tvl_historical;")
+    return cur.fetchone()
+
+def migrate():
+    conn = get_conn()
+    cur = conn.cursor()
+
+    try:
+        rows, size = table_size(cur)
+        print(f"📊 tvl_historical before: {rows} rows, {size}")
+
+        print("🧹 Removing duplicate (dapp_id, date) points...")
+        cur.execute(DEDUPLICATE)
+        print(f"✅ Removed {cur.rowcount} duplicate rows")
+
+        print("🔧 Adding UNIQUE (dapp_id, date) key...")
+        cur.execute(DDL)
+        conn.commit()
+
+        # VACUUM cannot run inside a transaction
+        print("🗜️ Compacting tvl_historical (VACUUM FULL)...")
+        conn.autocommit = True
+        cur.execute("VACUUM (FULL, ANALYZE) tvl_historical;")
+
+        rows, size = table_size(cur)
+        print(f"📊 tvl_historical after: {rows} rows, {size}")
+        print("🎉 Migration completed successfully!")
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        if not conn.autocommit:
+            conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+if __name__ == "__main__":
+    print("🗃️ Database Migration: tvl_historical natural key and compaction")
+    print("=" * 50)
+
+    try:
+        migrate()
+    except Exception as e:
+        print(f"\n💥 Migration crashed: {e}")
+        sys.exit(1)
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Migration script to partition tvl_historical and add TVL rollups
+Rebuilds tvl_historical as a table range partitioned by year on date (its
+(dapp_id, date) key becomes the primary key and the id column is dropped),
+copies the points over, and adds tvl_rollups filled with the weekly and
+monthly last/mean/min/max TVL of every DApp.
+Run migrate_tvl_historical_key.py first on databases that predate the key.
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from dapp_scraper.db import get_conn
+
+PARTITIONED_TABLE = """
+CREATE TABLE tvl_historical (
+  dapp_id INTEGER NOT NULL REFERENCES dapps(id) ON DELETE CASCADE,
+  date DATE NOT NULL,
+  total_liquidity_usd NUMERIC NOT NULL,
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (dapp_id, date)
+) PARTITION BY RANGE (date);
+
+CREATE INDEX IF NOT EXISTS idx_tvl_historical_date ON tvl_historical(date);
+"""
+
+ROLLUPS = """
+CREATE TABLE IF NOT EXISTS tvl_rollups (
+  dapp_id INTEGER NOT NULL REFERENCES dapps(id) ON DELETE CASCADE,
+  period VARCHAR(5) NOT NULL,  -- week (starting Monday) or month
+  period_start DATE NOT NULL,
+  days INTEGER NOT NULL,  -- daily points in the period
+  last_date DATE NOT NULL,
+  last_tvl NUMERIC NOT NULL,
+  mean_tvl NUMERIC NOT NULL,
+  min_tvl NUMERIC NOT NULL,
+  max_tvl NUMERIC NOT NULL,
+  PRIMARY KEY (dapp_id, period, period_start)
+);
+
+INSERT INTO tvl_rollups (dapp_id, period, period_start, days, last_date, last_tvl, mean_tvl, min_tvl, max_tvl)
+SELECT t.dapp_id, r.period, date_trunc(r.period, t.date)::date, COUNT(*), MAX(t.date),
+       (array_agg(t.total_liquidity_usd ORDER BY t.date DESC))[1],
+       AVG(t.total_liquidity_usd), MIN(t.total_liquidity_usd), MAX(t.total_liquidity_usd)
+FROM tvl_historical t
+CROSS JOIN (VALUES ('week'), ('month')) AS r (period)
+GROUP BY t.dapp_id, r.period, date_trunc(r.period, t.date)
+ON CONFLICT (dapp_id, period, period_start) DO NOTHING;
+"""
+
+def is_partitioned(cur):
+    cur.execute("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('tvl_historical'));")
+    return cur.fetchone()[0]
+
+def table_size(cur):
+    cur.execute(
+        """
+        SELECT (SELECT COUNT(*) FROM tvl_historical),
+               pg_size_pretty(COALESCE(SUM(pg_total_relation_size(oid)), 0)::bigint)
+        FROM (
+          SELECT inhrelid AS oid FROM pg_inherits WHERE inhparent = 'tvl_historical'::regclass
+          UNION ALL SELECT 'tvl_historical'::regclass
+        ) relations;
+        """
+    )
+    return cur.fetchone()
+
+def migrate():
+    from dapp_scraper.partitions import ensure_partitions
+
+    conn = get_conn()
+    cur = conn.cursor()
+
+    try:
+        rows, size = table_size(cur)
+        print(f"📊 tvl_historical before: {rows} points, {size}")
+
+        if is_partitioned(cur):
+            print("✅ tvl_historical is already partitioned")
+        else:
+            print("🔧 Rebuilding tvl_historical partitioned by year...")
+            cur.execute("LOCK TABLE tvl_historical IN ACCESS EXCLUSIVE MODE;")
+            cur.execute("ALTER TABLE tvl_historical RENAME TO tvl_historical_unpartitioned;")
+            # Index names are unique per schema; the new table reuses them
+            cur.execute("ALTER TABLE tvl_historical_unpartitioned DROP CONSTRAINT IF EXISTS tvl_historical_dapp_id_date_key;")
+            cur.execute("ALTER TABLE tvl_historical_unpartitioned DROP CONSTRAINT IF EXISTS tvl_historical_pkey;")
+            cur.execute("DROP INDEX IF EXISTS idx_tvl_historical_date;")
+            cur.execute(PARTITIONED_TABLE)
+
+            cur.execute("SELECT DISTINCT date_trunc('year', date)::date FROM tvl_historical_unpartitioned;")
+            created = ensure_partitions(cur, "tvl_historical", [row[0] for row in cur.fetchall()], interval="year")
+            print(f"🧱 Created {len(created)} yearly partitions")
+
+            cur.execute(
+                """
+                INSERT INTO tvl_historical (dapp_id, date, total_liquidity_usd, created_at)
+                SELECT dapp_id, date, total_liquidity_usd, created_at
+                FROM tvl_historical_unpartitioned
+                WHERE dapp_id IS NOT NULL
+                ON CONFLICT (dapp_id, date) DO NOTHING;
+                """
+            )
+            print(f"✅ Copied {cur.rowcount} points")
+            cur.execute("DROP TABLE tvl_historical_unpartitioned;")
+
+        print("📈 Creating and filling tvl_rollups...")
+        cur.execute(ROLLUPS)
+        print(f"✅ Added {cur.rowcount} weekly and monthly rollups")
+        conn.commit()
+
+        conn.autocommit = True
+        cur.execute("ANALYZE tvl_historical;")
+        cur.execute("ANALYZE tvl_rollups;")
+
+        rows, size = table_size(cur)
+        print(f"📊 tvl_historical after: {rows} points, {size}")
+        print("🎉 Migration completed successfully!")
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        if not conn.autocommit:
+            conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+if __name__ == "__main__":
+    print("🗃️ Database Migration: tvl_historical partitions and rollups")
+    print("=" * 50)
+
+    try:
+        migrate()
+    except Exception as e:
+        print(f"\n💥 Migration crashed: {e}")
+        sys.exit(1)
@@ -2,7 +2,7 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from dapp_scraper.store import get_conn
+from dapp_scraper.db import get_conn
 
 def analyze_database():
     """Analyze stored DApp data"""
@@ -53,7 +53,7 @@ def analyze_database():
     # Top by Market Cap
     cur.execute("""
         SELECT d.name, d.market_cap 
-        FROM dapps d
+        FROM dapps_with_quotes d
         WHERE d.market_cap > 0
         ORDER BY d.market_cap DESC
         LIMIT 10;
@@ -87,7 +87,7 @@ def analyze_database():
             COUNT(CASE WHEN market_cap > 0 THEN 1 END) as with_market_cap,
             COUNT(CASE WHEN price > 0 THEN 1 END) as with_price,
             COUNT(CASE WHEN volume > 0 THEN 1 END) as with_volume
-        FROM dapps;
+        FROM dapps_with_quotes;
     """)
     total_dapps, with_tvl, with_users, with_market_cap, with_price, with_volume = cur.fetchone()
     
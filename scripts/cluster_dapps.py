@@ -0,0 +1,70 @@
+import sys
+import os
+from collections import Counter
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from dapp_scraper.db import get_conn
+from dapp_scraper.dedup import cluster_dapps, load_dapps_for_clustering, store_entity_clusters
+import time
+
+
+def main(dry_run=False):
+    """
+    Cluster near-duplicate DApps and store the canonical id in dapps.entity_id
+    """
+    print("🧩 Clustering near-duplicate DApps")
+
+    conn = get_conn()
+    cur = conn.cursor()
+
+    dapps = load_dapps_for_clustering(cur)
+    print(f"📊 Loaded {len(dapps)} DApps")
+
+    started = time.time()
+    assignments = cluster_dapps(dapps)
+    print(f"⚡ Clustered in {time.time() - started:.2f}s")
+
+    sizes = Counter(assignments.values())
+    multi = {entity_id: size for entity_id, size in sizes.items() if size > 1}
+    names = {d["id"]: d["name"] for d in dapps}
+    print(f"🔗 {len(sizes)} entities, {len(multi)} with more than one DApp "
+          f"({sum(multi.values()) - len(multi)} duplicates)")
+    for entity_id, size in sorted(multi.items(), key=lambda item: -item[1])[:10]:
+        members = [names[d] for d, e in assignments.items() if e == entity_id]
+        print(f"  • {names[entity_id]} ({size}): {', '.join(members)}")
+
+    if dry_run:
+        conn.rollback()
+    else:
+        store_entity_clusters(cur, assignments)
+        conn.commit()
+        print("✅ Stored entity ids")
+
+    cur.close()
+    conn.close()
+    return len(sizes)
+
+
+def print_usage():
+    """Print usage instructions"""
+    print("Usage:")
+    print("  python cluster_dapps.py             # Cluster DApps and store dapps.entity_id")
+    print("  python cluster_dapps.py --dry-run   # Only report the clusters")
+    print("  Add --profile (sampling) or --profile=cprofile to any command to write a profile to profiles/")
+
+
+if __name__ == "__main__":
+    from dapp_scraper.profiling import profile_from_argv
+
+    with profile_from_argv("cluster_dapps"):
+        if len(sys.argv) == 1:
+            main()
+        elif sys.argv[1] == "--dry-run":
+            main(dry_run=True)
+        elif sys.argv[1] == "help" or sys.argv[1] == "--help":
+            print_usage()
+        else:
+            print("❌ Error: Invalid arguments!")
+            print_usage()
+            sys.exit(1)
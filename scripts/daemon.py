@@ -0,0 +1,339 @@
+import sys
+import os
+import json
+import signal
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import psycopg2
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from dapp_scraper.db import get_conn
+from dapp_scraper.utils import CFG
+from dapp_scraper import run_metrics
+from dapp_scraper.log import get_logger
+
+log = get_logger("scripts.daemon")
+
+# Job -> default interval and the field groups it refreshes (None: DappRadar top lists)
+DAEMON_JOBS = {
+    "dappradar": {"interval_minutes": 24 * 60, "groups": None},
+    "quotes": {"interval_minutes": 5, "groups": ("market",)},
+    "tvl": {"interval_minutes": 60, "groups": ("tvl",)},
+    "slow": {"interval_minutes": 6 * 60, "groups": ("supply", "raises")},
+}
+
+STATUS_HOST = CFG.get("daemon", "status_host", fallback="127.0.0.1")
+STATUS_PORT = CFG.getint("daemon", "status_port", fallback=8787)
+DAPPRADAR_LIMIT = CFG.getint("daemon", "dappradar_limit", fallback=500)
+FETCH_WORKERS = CFG.getint("daemon", "fetch_workers", fallback=4)
+POLL_SECONDS = 30
+
+
+def job_spec(job):
+    """
+    {"interval": seconds, "groups": ..., "budget": ...} of a job; override with
+    <job>_interval_minutes and <job>_budget (provider requests per run) in [daemon]
+    """
+    spec = DAEMON_JOBS[job]
+    return {
+        "interval": CFG.getfloat("daemon", f"{job}_interval_minutes", fallback=spec["interval_minutes"]) * 60,
+        "groups": spec["groups"],
+        "budget": CFG.getint("daemon", f"{job}_budget", fallback=0) or None,
+    }
+
+
+def job_schedule():
+    """Specs of the enabled jobs; an interval of 0 disables a job"""
+    return {job: job_spec(job) for job in DAEMON_JOBS if job_spec(job)["interval"] > 0}
+
+
+class Daemon:
+    """
+    Runs the scheduled jobs one at a time on a warm connection and
+    enrichment context. A job that is due while another one runs waits
+    for it, so runs never overlap within a daemon; an advisory lock per
+    job keeps a second daemon on the same database from running it too.
+    """
+
+    def __init__(self, schedule):
+        from scripts.run_fetch_enrich import EnrichmentContext
+
+        self.schedule = schedule
+        self.started_at = datetime.now()
+        self.stopping = threading.Event()
+        self.lock = threading.Lock()
+        self.current_job = None
+
+        self.conn = get_conn()
+        cur = self.conn.cursor()
+        self.ctx = EnrichmentContext(cur)
+        self.jobs = {
+            job: {"last_status": None, "last_started": None, "last_finished": None,
+                  "last_duration_seconds": None, "last_error": None, "runs": 0, "failures": 0,
+                  "next_run": datetime.now()}
+            for job in schedule
+        }
+        # Continue the previous daemon's schedule instead of running everything at start
+        for job, finished_at in self._last_completed(cur).items():
+            if job in self.jobs:
+                self.jobs[job]["last_finished"] = finished_at
+                self.jobs[job]["next_run"] = finished_at + timedelta(seconds=schedule[job]["interval"])
+        self.conn.commit()
+        cur.close()
+
+    def _last_completed(self, cur):
+        """{job: finished_at} of the last completed daemon run per job, from the runs table"""
+        try:
+            cur.execute(
+                """
+                SELECT substring(command FROM 8), MAX(finished_at)
+                FROM runs
+                WHERE command LIKE 'daemon\\_%' AND status = 'completed'
+                GROUP BY command;
+                """
+            )
+            return dict(cur.fetchall())
+        except Exception as e:
+            self.conn.rollback()
+            log.warning("⚠️ Could not read previous runs, all jobs are due now: %s", e)
+            return {}
+
+    def _check_connection(self):
+        """
+        Replace the warm connection with a fresh pooled one if the database
+        dropped it (restart, idle kill). conn.closed is only set once a query
+        has failed, so the connection is pinged before each job.
+        """
+        if not self.conn.closed:
+            try:
+                cur = self.conn.cursor()
+                cur.execute("SELECT 1;")
+                cur.close()
+                self.conn.rollback()
+                return
+            except psycopg2.Error as e:
+                log.warning("🔌 Database connection lost, reconnecting: %s", e)
+        else:
+            log.warning("🔌 Database connection lost, reconnecting")
+        # The pool discards the broken connection
+        self.conn.close()
+        self.conn = get_conn()
+
+    def run_job(self, job):
+        """Run one job under its advisory lock; returns the run status"""
+        self._check_connection()
+        cur = self.conn.cursor()
+        cur.execute("SELECT pg_try_advisory_lock(hashtext(%s));", (f"dapp-scan:{job}",))
+        if not cur.fetchone()[0]:
+            self.conn.commit()
+            cur.close()
+            log.warning("⏭️ %s is running in another process, skipping", job)
+            return "skipped"
+        self.conn.commit()
+
+        state = self.jobs[job]
+        with self.lock:
+            self.current_job = job
+            state["last_started"] = datetime.now()
+        log.info("▶️ Starting %s", job)
+
+        run = run_metrics.start_run(f"daemon_{job}", [])
+        status = "failed"
+        error = None
+        try:
+            if self.schedule[job]["groups"] is None:
+                self._fetch_dappradar(run)
+            else:
+                self._refresh_groups(run, job)
+            status = "completed"
+        except KeyboardInterrupt:
+            status = "interrupted"
+            raise
+        except Exception as e:
+            error = str(e)
+            log.error("❌ %s failed: %s", job, e)
+            try:
+                self.conn.rollback()
+            except psycopg2.Error:
+                pass  # the connection is checked again before the next job
+        finally:
+            run.finish(status)
+            try:
+                cur.execute("SELECT pg_advisory_unlock(hashtext(%s));", (f"dapp-scan:{job}",))
+                self.conn.commit()
+                cur.close()
+            except psycopg2.Error as e:
+                # A lost session releases its advisory locks itself
+                log.warning("🔌 Could not release the %s lock: %s", job, e)
+            finished = datetime.now()
+            with self.lock:
+                self.current_job = None
+                state["runs"] += 1
+                state["failures"] += int(status == "failed")
+                state["last_status"] = status
+                state["last_error"] = error
+                state["last_finished"] = finished
+                state["last_duration_seconds"] = round((finished - state["last_started"]).total_seconds(), 1)
+        return status
+
+    def _fetch_dappradar(self, run):
+        from dapp_scraper.scrapers.dappradar import fetch_dappradar
+        from dapp_scraper.store import store_records
+
+        with run.phase("dappradar"):
+            records = fetch_dappradar(DAPPRADAR_LIMIT)
+        if not records:
+            raise RuntimeError("No data retrieved from DappRadar")
+        with run.phase("store"):
+            store_records(records)
+        # New coins get listed every day; match against a fresh list from now on
+        self.ctx.forget_gecko_list()
+
+    def _refresh_groups(self, run, job):
+        from dapp_scraper.scheduler import field_group_ttls
+        from scripts.run_fetch_enrich import enrich_database_records
+
+        ttls = field_group_ttls()
+        with run.phase("enrich"):
+            enrich_database_records(
+                fetch_workers=FETCH_WORKERS,
+                scheduled=True,
+                request_budget=self.schedule[job]["budget"],
+                ttls={group: ttls[group] for group in self.schedule[job]["groups"]},
+                conn=self.conn,
+                ctx=self.ctx,
+            )
+
+    def next_due(self):
+        """(job, next_run) of the most overdue job"""
+        with self.lock:
+            return min(((job, state["next_run"]) for job, state in self.jobs.items()), key=lambda item: item[1])
+
+    def serve_forever(self):
+        log.info("😈 Daemon started with jobs: %s", ", ".join(
+            f"{job} every {spec['interval'] / 60:g} min" for job, spec in self.schedule.items()
+        ))
+        while not self.stopping.is_set():
+            job, next_run = self.next_due()
+            wait = (next_run - datetime.now()).total_seconds()
+            if wait > 0:
+                self.stopping.wait(min(wait, POLL_SECONDS))
+                continue
+            try:
+                self.run_job(job)
+            except Exception as e:
+                # Record the failure and retry at the next interval instead of exiting
+                log.error("❌ %s crashed: %s", job, e)
+                with self.lock:
+                    self.current_job = None
+                    state = self.jobs[job]
+                    state["failures"] += 1
+                    state["last_status"] = "failed"
+                    state["last_error"] = str(e)
+                    state["last_finished"] = datetime.now()
+            with self.lock:
+                # Intervals count from the end of a run, so a slow run never queues a backlog
+                self.jobs[job]["next_run"] = datetime.now() + timedelta(seconds=self.schedule[job]["interval"])
+
+    def status(self):
+        """Health and progress snapshot for the status endpoint"""
+        with self.lock:
+            jobs = {job: dict(state) for job, state in self.jobs.items()}
+            current_job = self.current_job
+        run = run_metrics.current_run()
+        return {
+            "status": "degraded" if any(state["last_status"] == "failed" for state in jobs.values()) else "ok",
+            "started_at": self.started_at,
+            "uptime_seconds": round((datetime.now() - self.started_at).total_seconds()),
+            "current_job": current_job,
+            "current_run": run.summary("running") if current_job and run else None,
+            "jobs": jobs,
+        }
+
+    def close(self):
+        self.conn.close()
+
+
+def start_status_server(daemon, host=None, port=None):
+    """Serve GET /health and GET /status as JSON on a background thread"""
+
+    class StatusHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            status = daemon.status()
+            if self.path == "/health":
+                body = {key: status[key] for key in ("status", "uptime_seconds", "current_job")}
+                code = 200 if status["status"] == "ok" else 503
+            elif self.path in ("/", "/status"):
+                body, code = status, 200
+            else:
+                body, code = {"error": "not found"}, 404
+            payload = json.dumps(body, default=str, indent=2).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            log.debug("🌐 %s", format % args)
+
+    server = ThreadingHTTPServer((host or STATUS_HOST, port or STATUS_PORT), StatusHandler)
+    threading.Thread(target=server.serve_forever, name="status-server", daemon=True).start()
+    log.info("🌐 Status endpoint on http://%s:%s/status", *server.server_address[:2])
+    return server
+
+
+def _raise_interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def main(once=None):
+    """Run the daemon, or with once=<job> run that job a single time and exit"""
+    if once and once not in DAEMON_JOBS:
+        print(f"❌ Error: Unknown job {once}, expected one of {', '.join(DAEMON_JOBS)}")
+        sys.exit(1)
+
+    daemon = Daemon({once: job_spec(once)} if once else job_schedule())
+    if once:
+        try:
+            return daemon.run_job(once)
+        finally:
+            daemon.close()
+
+    # systemd and docker stop with SIGTERM; treat it like Ctrl-C
+    signal.signal(signal.SIGTERM, _raise_interrupt)
+    server = start_status_server(daemon)
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        log.warning("⏹️ Daemon stopping")
+    finally:
+        server.shutdown()
+        daemon.close()
+
+
+def print_usage():
+    """Print usage instructions"""
+    print("Usage:")
+    print("  python daemon.py                   # Run scheduled jobs until stopped, status on [daemon] status_port")
+    print("  python daemon.py --once <job>      # Run one job now: " + ", ".join(DAEMON_JOBS))
+    print("  Add --profile (sampling) or --profile=cprofile to any command to write a profile to profiles/")
+
+
+if __name__ == "__main__":
+    from dapp_scraper.profiling import profile_from_argv
+
+    with profile_from_argv("daemon"):
+        if len(sys.argv) == 1:
+            main()
+        elif sys.argv[1] in ("help", "--help"):
+            print_usage()
+        elif sys.argv[1] == "--once" and len(sys.argv) == 3:
+            main(once=sys.argv[2])
+        else:
+            print("❌ Error: Invalid arguments!")
+            print_usage()
+            sys.exit(1)
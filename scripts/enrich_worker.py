@@ -0,0 +1,241 @@
+import sys
+import os
+import socket
+import threading
+
+import psycopg2
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from dapp_scraper.db import get_conn
+from dapp_scraper.job_queue import (
+    CLAIM_BATCH_SIZE,
+    HEARTBEAT_SECONDS,
+    claim_jobs,
+    complete_job,
+    enqueue_jobs,
+    fail_job,
+    heartbeat_jobs,
+    job_counts,
+    requeue_stale_jobs,
+)
+from scripts.run_fetch_enrich import (
+    EnrichmentContext,
+    fetch_dapp_enrichment,
+    write_dapp_enrichment,
+)
+from dapp_scraper.log import Progress, get_logger
+import time
+
+log = get_logger("scripts.enrich_worker")
+
+POLL_SECONDS = 10
+
+
+def enqueue_all():
+    """
+    Queue an enrichment job for every DApp (cluster members only call DeFiLlama)
+    """
+    conn = get_conn()
+    cur = conn.cursor()
+
+    cur.execute("SELECT id FROM dapps ORDER BY id;")
+    dapp_ids = [row[0] for row in cur.fetchall()]
+    added = enqueue_jobs(cur, dapp_ids)
+    conn.commit()
+    print(f"📥 Queued {added} enrichment jobs ({len(dapp_ids) - added} already pending or running)")
+
+    cur.close()
+    conn.close()
+    return added
+
+
+class _Heartbeat(threading.Thread):
+    """Keeps the claimed jobs of a worker alive on a separate connection"""
+
+    def __init__(self, worker_id):
+        super().__init__(name="heartbeat", daemon=True)
+        self.worker_id = worker_id
+        self.job_ids = set()
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+
+    def hold(self, job_ids):
+        with self.lock:
+            self.job_ids = set(job_ids)
+
+    def release(self, job_id):
+        with self.lock:
+            self.job_ids.discard(job_id)
+
+    def run(self):
+        conn = None
+        try:
+            while not self.stopped.wait(HEARTBEAT_SECONDS):
+                with self.lock:
+                    job_ids = list(self.job_ids)
+                try:
+                    # The pool health-checks the connection when it is checked out again
+                    if conn is None:
+                        conn = get_conn()
+                    cur = conn.cursor()
+                    heartbeat_jobs(cur, self.worker_id, job_ids)
+                    conn.commit()
+                    cur.close()
+                except psycopg2.Error as e:
+                    # Keep beating: a silent stop lets other workers requeue jobs we still run
+                    log.error("💔 Heartbeat of %s failed, reconnecting: %s", self.worker_id, e)
+                    if conn is not None:
+                        conn.close()
+                        conn = None
+        finally:
+            if conn is not None:
+                conn.close()
+
+
+def work(batch_size=None, once=False):
+    """
+    Claim and process enrichment jobs until the queue is empty (once=True)
+    or forever. Start as many workers as the provider quotas allow, on one
+    or several hosts.
+    """
+    from dapp_scraper.dedup import propagate_entity_enrichment
+
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    log.info("👷 Worker %s starting", worker_id)
+
+    conn = get_conn()
+    cur = conn.cursor()
+
+    heartbeat = _Heartbeat(worker_id)
+    heartbeat.start()
+
+    ctx = EnrichmentContext(cur)
+    conn.commit()
+    processed = 0
+    progress = Progress(log, f"worker {worker_id}")
+
+    try:
+        while True:
+            released = requeue_stale_jobs(cur)
+            if released:
+                log.warning("♻️ Released %s jobs with a lost heartbeat", released)
+            jobs = claim_jobs(cur, worker_id, limit=batch_size or CLAIM_BATCH_SIZE)
+            conn.commit()
+
+            if not jobs:
+                counts = job_counts(cur)
+                if counts["running"] == 0 and counts["pending"] == 0:
+                    propagated = propagate_entity_enrichment(cur)
+                    log.info("🧩 Copied entity data to %s duplicate DApps", propagated)
+                conn.commit()
+                if once:
+                    break
+                log.debug("💤 No runnable jobs, sleeping %ss", POLL_SECONDS)
+                time.sleep(POLL_SECONDS)
+                # Pick up id mappings and TVL dates written by other workers
+                ctx = EnrichmentContext(cur)
+                conn.commit()
+                continue
+
+            heartbeat.hold(job_id for job_id, _, _ in jobs)
+            cur.execute(
+                "SELECT id, name, slug, token_symbol, tags FROM dapps WHERE id = ANY(%s);",
+                ([dapp_id for _, dapp_id, _ in jobs],)
+            )
+            dapps = {row[0]: row for row in cur.fetchall()}
+            conn.commit()
+
+            for job_id, dapp_id, attempt in jobs:
+                dapp = dapps.get(dapp_id)
+                try:
+                    if dapp is None:
+                        raise ValueError(f"DApp {dapp_id} no longer exists")
+                    progress.update(f"job {job_id}, attempt {attempt}: {dapp[1]}")
+                    result = fetch_dapp_enrichment(dapp, ctx)
+                    write_dapp_enrichment(cur, dapp, result, ctx)
+                    ctx.flush_updates(cur)
+                    complete_job(cur, job_id)
+                    conn.commit()
+                    processed += 1
+                except Exception as e:
+                    conn.rollback()
+                    ctx.discard_updates()
+                    status = fail_job(cur, job_id, e)
+                    conn.commit()
+                    log.error("❌ Job %s failed (%s): %s", job_id, status, e)
+                finally:
+                    heartbeat.release(job_id)
+    except KeyboardInterrupt:
+        # Claimed jobs are released by requeue_stale_jobs once their heartbeat expires
+        conn.rollback()
+        log.warning("⏹️ Worker %s stopped", worker_id)
+    finally:
+        heartbeat.stopped.set()
+        cur.close()
+        conn.close()
+
+    log.info("✅ Worker %s processed %s jobs", worker_id, processed)
+    return processed
+
+
+def show_status():
+    """Print job counts per status and the latest dead-lettered jobs"""
+    conn = get_conn()
+    cur = conn.cursor()
+
+    counts = job_counts(cur)
+    print("📋 Enrichment jobs:")
+    for status, count in counts.items():
+        print(f"  • {status}: {count}")
+
+    cur.execute(
+        """
+        SELECT j.job_id, d.name, j.attempts, j.last_error
+        FROM enrichment_jobs j
+        JOIN dapps d ON d.id = j.dapp_id
+        WHERE j.status = 'dead'
+        ORDER BY j.updated_at DESC
+        LIMIT 10;
+        """
+    )
+    for job_id, name, attempts, last_error in cur.fetchall():
+        print(f"  💀 job {job_id} {name} after {attempts} attempts: {last_error}")
+
+    cur.close()
+    conn.close()
+    return counts
+
+
+def print_usage():
+    """Print usage instructions"""
+    print("Usage:")
+    print("  python enrich_worker.py enqueue                  # Queue a job for every DApp")
+    print("  python enrich_worker.py work [--batch N]         # Process jobs, poll when idle")
+    print("  python enrich_worker.py work --once [--batch N]  # Process jobs until the queue is empty")
+    print("  python enrich_worker.py status                   # Show job counts and dead jobs")
+    print("  Add --profile (sampling) or --profile=cprofile to any command to write a profile to profiles/")
+
+
+if __name__ == "__main__":
+    from dapp_scraper.profiling import profile_from_argv
+
+    with profile_from_argv("enrich_worker"):
+        if len(sys.argv) < 2 or sys.argv[1] in ("help", "--help"):
+            print_usage()
+        elif sys.argv[1] == "enqueue":
+            enqueue_all()
+        elif sys.argv[1] == "work":
+            try:
+                batch_size = int(sys.argv[sys.argv.index("--batch") + 1]) if "--batch" in sys.argv else None
+            except (ValueError, IndexError):
+                print("❌ Error: --batch needs a positive integer!")
+                print_usage()
+                sys.exit(1)
+            work(batch_size=batch_size, once="--once" in sys.argv)
+        elif sys.argv[1] == "status":
+            show_status()
+        else:
+            print("❌ Error: Invalid arguments!")
+            print_usage()
+            sys.exit(1)
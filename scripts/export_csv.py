@@ -2,30 +2,15 @@ import sys
 import os
 import csv
 from datetime import datetime
-from configparser import ConfigParser
-import psycopg2
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-_cfg = ConfigParser()
-_cfg.read(os.path.join(os.path.dirname(__file__), '..', 'config', 'config.ini'))
-DB_NAME = _cfg["database"]["name"]
-SUPERUSER = _cfg["database"]["user"]
-PASSWORD = _cfg["database"]["password"]
-HOST = _cfg["database"]["host"]
-PORT = _cfg["database"]["port"]
-
-def get_conn():
-    return psycopg2.connect(
-        dbname=DB_NAME,
-        user=SUPERUSER,
-        password=PASSWORD,
-        host=HOST,
-        port=PORT
-    )
+from dapp_scraper.db import get_conn
 
 def export_pilot_dataset(output_file="pilot_dataset.csv"):
     """Export 500 DApps with maximum non-null fields including TVL historical data"""
     
+    from dapp_scraper.dedup import entity_tvl
+
     conn = get_conn()
     cur = conn.cursor()
     
@@ -95,7 +80,7 @@ def export_pilot_dataset(output_file="pilot_dataset.csv"):
             CASE WHEN d.percent_change_24h IS NOT NULL THEN 1 ELSE 0 END +
             CASE WHEN d.percent_change_7d IS NOT NULL THEN 1 ELSE 0 END
         ) as completeness_score
-    FROM dapps d
+    FROM dapps_with_quotes d
     LEFT JOIN categories c ON d.category_id = c.id
     ORDER BY completeness_score DESC, d.name
     LIMIT 500;
@@ -111,19 +96,22 @@ def export_pilot_dataset(output_file="pilot_dataset.csv"):
     # Get DApp IDs for TVL historical queries
     dapp_ids = [row[0] for row in main_rows]
     
-    # Get most recent TVL historical data for these DApps
+    # Get most recent TVL historical data for these DApps (the last point of their latest month)
     tvl_historical_query = """
     SELECT DISTINCT ON (dapp_id)
         dapp_id,
-        total_liquidity_usd
-    FROM tvl_historical 
-    WHERE dapp_id = ANY(%s)
-    ORDER BY dapp_id, date DESC;
+        last_tvl
+    FROM tvl_rollups
+    WHERE period = 'month' AND dapp_id = ANY(%s)
+    ORDER BY dapp_id, period_start DESC;
     """
     
     cur.execute(tvl_historical_query, (dapp_ids,))
     tvl_historical_data = dict(cur.fetchall())
     
+    # Canonical entity of each DApp and its summed TVL so analytics can collapse near-duplicates
+    entities = entity_tvl(cur, dapp_ids)
+    
     # Build headers with governance, decentralization, and metrics
     headers = [
         'name', 'dapp_category', 'sub_category', 'is_active', 'is_multi_chain', 'governance_type',
@@ -132,7 +120,7 @@ def export_pilot_dataset(output_file="pilot_dataset.csv"):
         'raised_capital', 'tvl', 'tvl_ratio', 'market_cap', 'circulating_supply', 
         'total_supply', 'price', 'users', 'volume', 'transactions', 'total_liquidity_usd',
         'percent_change_1h', 'percent_change_24h', 'percent_change_7d', 'percent_change_30d', 
-        'percent_change_60d', 'percent_change_90d'
+        'percent_change_60d', 'percent_change_90d', 'entity_id', 'entity_tvl'
     ]
     
     # Build output rows
@@ -145,6 +133,8 @@ def export_pilot_dataset(output_file="pilot_dataset.csv"):
         
         # Add TVL historical data
         output_row.append(tvl_historical_data.get(dapp_id, ''))
+        entity_id, entity_tvl_value = entities.get(dapp_id, (dapp_id, ''))
+        output_row.extend([entity_id, entity_tvl_value])
         
         output_rows.append(output_row)
     
@@ -263,18 +253,79 @@ def export_raises_data(output_file="dapp_raises.csv"):
     
     return len(rows)
 
-if __name__ == "__main__":
-    print("📤 Exporting DApp data...")
-    print("=" * 40)
+def export_chain_tvl(output_file="dapp_chain_tvl.csv"):
+    """Export the latest per-chain TVL of every DApp from chain_tvl_historical"""
+    
+    conn = get_conn()
+    cur = conn.cursor()
+    
+    chain_tvl_query = """
+    SELECT DISTINCT ON (t.dapp_id, t.chain)
+        d.name as dapp_name,
+        d.slug as dapp_slug,
+        c.name as dapp_category,
+        t.chain,
+        t.date,
+        t.tvl
+    FROM chain_tvl_historical t
+    JOIN dapps d ON t.dapp_id = d.id
+    LEFT JOIN categories c ON d.category_id = c.id
+    ORDER BY t.dapp_id, t.chain, t.date DESC;
+    """
+    
+    cur.execute(chain_tvl_query)
+    rows = cur.fetchall()
+    
+    cur.close()
+    conn.close()
+    
+    if not rows:
+        print("No per-chain TVL data found in database")
+        return 0
+    
+    headers = ['dapp_name', 'dapp_slug', 'dapp_category', 'chain', 'date', 'tvl']
     
-    # Export main dataset
-    dapp_count = export_pilot_dataset("pilot_dataset.csv")
-    print()
+    with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(headers)
+        writer.writerows(rows)
     
-    # Export raises data
-    raises_count = export_raises_data("dapp_raises.csv")
+    print(f"✅ Exported {len(rows)} DApp/chain TVL rows to {output_file}")
+    print(f"  • Chains covered: {len({row[3] for row in rows})}")
+    
+    return len(rows)
+
+if __name__ == "__main__":
+    from dapp_scraper.profiling import profile_from_argv
+    from dapp_scraper import run_metrics
+
+    with profile_from_argv("export_csv"):
+        print("📤 Exporting DApp data...")
+        print("=" * 40)
+    
+        run = run_metrics.start_run("export_csv")
+        status = "failed"
+        try:
+            # Export main dataset
+            with run.phase("pilot_dataset"):
+                dapp_count = export_pilot_dataset("pilot_dataset.csv")
+            print()
+        
+            # Export raises data
+            with run.phase("raises"):
+                raises_count = export_raises_data("dapp_raises.csv")
+            print()
+        
+            # Export per-chain TVL
+            with run.phase("chain_tvl"):
+                chain_tvl_count = export_chain_tvl("dapp_chain_tvl.csv")
+            run.count("records_processed", dapp_count + raises_count + chain_tvl_count)
+            status = "completed"
+        finally:
+            run.finish(status)
     
-    print(f"\n🎉 Export complete!")
-    print(f"📊 Summary:")
-    print(f"  • {dapp_count} DApps exported to pilot_dataset.csv")
-    print(f"  • {raises_count} funding rounds exported to dapp_raises.csv") 
\ No newline at end of file
+        print(f"\n🎉 Export complete!")
+        print(f"📊 Summary:")
+        print(f"  • {dapp_count} DApps exported to pilot_dataset.csv")
+        print(f"  • {raises_count} funding rounds exported to dapp_raises.csv")
+        print(f"  • {chain_tvl_count} DApp/chain TVL rows exported to dapp_chain_tvl.csv") 
\ No newline at end of file
@@ -2,30 +2,15 @@ import sys
 import os
 import csv
 from datetime import datetime
-from configparser import ConfigParser
-import psycopg2
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-_cfg = ConfigParser()
-_cfg.read(os.path.join(os.path.dirname(__file__), '..', 'config', 'config.ini'))
-DB_NAME = _cfg["database"]["name"]
-SUPERUSER = _cfg["database"]["user"]
-PASSWORD = _cfg["database"]["password"]
-HOST = _cfg["database"]["host"]
-PORT = _cfg["database"]["port"]
-
-def get_conn():
-    return psycopg2.connect(
-        dbname=DB_NAME,
-        user=SUPERUSER,
-        password=PASSWORD,
-        host=HOST,
-        port=PORT
-    )
+from dapp_scraper.db import get_conn
 
 def export_pilot_dataset_base(output_file="pilot_dataset_base.csv"):
     """Export all DApps without completeness scoring, ordered by name"""
     
+    from dapp_scraper.dedup import entity_tvl
+
     conn = get_conn()
     cur = conn.cursor()
     
@@ -69,7 +54,7 @@ def export_pilot_dataset_base(output_file="pilot_dataset_base.csv"):
         d.percent_change_30d,
         d.percent_change_60d,
         d.percent_change_90d
-    FROM dapps d
+    FROM dapps_with_quotes d
     LEFT JOIN categories c ON d.category_id = c.id
     ORDER BY d.name;
     """
@@ -84,19 +69,22 @@ def export_pilot_dataset_base(output_file="pilot_dataset_base.csv"):
     # Get DApp IDs for TVL historical queries
     dapp_ids = [row[0] for row in main_rows]
     
-    # Get most recent TVL historical data for these DApps
+    # Get most recent TVL historical data for these DApps (the last point of their latest month)
     tvl_historical_query = """
     SELECT DISTINCT ON (dapp_id)
         dapp_id,
-        total_liquidity_usd
-    FROM tvl_historical 
-    WHERE dapp_id = ANY(%s)
-    ORDER BY dapp_id, date DESC;
+        last_tvl
+    FROM tvl_rollups
+    WHERE period = 'month' AND dapp_id = ANY(%s)
+    ORDER BY dapp_id, period_start DESC;
     """
     
     cur.execute(tvl_historical_query, (dapp_ids,))
     tvl_historical_data = dict(cur.fetchall())
     
+    # Canonical entity of each DApp and its summed TVL so analytics can collapse near-duplicates
+    entities = entity_tvl(cur, dapp_ids)
+    
     # Build headers with governance, decentralization, and metrics
     headers = [
         'name', 'dapp_category', 'sub_category', 'is_active', 'is_multi_chain', 'governance_type',
@@ -105,7 +93,7 @@ def export_pilot_dataset_base(output_file="pilot_dataset_base.csv"):
         'raised_capital', 'tvl', 'tvl_ratio', 'market_cap', 'circulating_supply', 
         'total_supply', 'price', 'users', 'volume', 'transactions', 'total_liquidity_usd',
         'percent_change_1h', 'percent_change_24h', 'percent_change_7d', 'percent_change_30d', 
-        'percent_change_60d', 'percent_change_90d'
+        'percent_change_60d', 'percent_change_90d', 'entity_id', 'entity_tvl'
     ]
     
     # Build output rows
@@ -118,6 +106,8 @@ def export_pilot_dataset_base(output_file="pilot_dataset_base.csv"):
         
         # Add TVL historical data
         output_row.append(tvl_historical_data.get(dapp_id, ''))
+        entity_id, entity_tvl_value = entities.get(dapp_id, (dapp_id, ''))
+        output_row.extend([entity_id, entity_tvl_value])
         
         output_rows.append(output_row)
     
@@ -239,19 +229,32 @@ def export_raises_data_base(output_file="dapp_raises_base.csv"):
     return len(rows)
 
 if __name__ == "__main__":
-    print("📤 Exporting DApp data (Base - No Completeness Scoring)...")
-    print("=" * 60)
-    
-    # Export main dataset
-    dapp_count = export_pilot_dataset_base("pilot_dataset_base.csv")
-    print()
+    from dapp_scraper.profiling import profile_from_argv
+    from dapp_scraper import run_metrics
+
+    with profile_from_argv("export_csv_base"):
+        print("📤 Exporting DApp data (Base - No Completeness Scoring)...")
+        print("=" * 60)
     
-    # Export raises data
-    raises_count = export_raises_data_base("dapp_raises_base.csv")
+        run = run_metrics.start_run("export_csv_base")
+        status = "failed"
+        try:
+            # Export main dataset
+            with run.phase("pilot_dataset"):
+                dapp_count = export_pilot_dataset_base("pilot_dataset_base.csv")
+            print()
+        
+            # Export raises data
+            with run.phase("raises"):
+                raises_count = export_raises_data_base("dapp_raises_base.csv")
+            run.count("records_processed", dapp_count + raises_count)
+            status = "completed"
+        finally:
+            run.finish(status)
     
-    print(f"\n🎉 Export complete!")
-    print(f"📊 Summary:")
-    print(f"  • {dapp_count} DApps exported to pilot_dataset_base.csv")
-    print(f"  • {raises_count} funding rounds exported to dapp_raises_base.csv")
-    print("\n💡 Tip: Compare with pilot_dataset.csv and dapp_raises.csv to see differences")
+        print(f"\n🎉 Export complete!")
+        print(f"📊 Summary:")
+        print(f"  • {dapp_count} DApps exported to pilot_dataset_base.csv")
+        print(f"  • {raises_count} funding rounds exported to dapp_raises_base.csv")
+        print("\n💡 Tip: Compare with pilot_dataset.csv and dapp_raises.csv to see differences")
 
@@ -13,28 +13,12 @@ Updates existing dapps with new column values:
 import os
 import sys
 import csv
-from configparser import ConfigParser
-import psycopg2
 from psycopg2.extras import execute_values
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-_cfg = ConfigParser()
-_cfg.read(os.path.join(os.path.dirname(__file__), '..', 'config', 'config.ini'))
-DB_NAME = _cfg["database"]["name"]
-SUPERUSER = _cfg["database"]["user"]
-PASSWORD = _cfg["database"]["password"]
-HOST = _cfg["database"]["host"]
-PORT = _cfg["database"]["port"]
-
-def get_conn():
-    return psycopg2.connect(
-        dbname=DB_NAME,
-        user=SUPERUSER,
-        password=PASSWORD,
-        host=HOST,
-        port=PORT
-    )
+from dapp_scraper.db import get_conn
+from dapp_scraper.lookups import lookup
 
 def clean_value(value):
     """Clean and normalize CSV values"""
@@ -50,6 +34,8 @@ def ingest_pilot_data(csv_file):
     
     conn = get_conn()
     cur = conn.cursor()
+    # dapp_category holds category names; ids come from the categories cache
+    categories = lookup("categories")
     
     # Read CSV file
     with open(csv_file, 'r', encoding='utf-8') as f:
@@ -105,7 +91,7 @@ def ingest_pilot_data(csv_file):
             
             if dapp_category is not None:
                 update_parts.append("category_id = %s")
-                update_values.append(dapp_category)
+                update_values.append(categories.get(dapp_category))
 
             if sub_category is not None:
                 update_parts.append("sub_category = %s")
@@ -1,10 +1,13 @@
 import os
-from configparser import ConfigParser
+import sys
 import psycopg2
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 
-_cfg = ConfigParser()
-_cfg.read(os.path.join(os.path.dirname(__file__), '..', 'config', 'config.ini'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from dapp_scraper.config import get_config
+
+_cfg = get_config()
 DB_NAME = _cfg["database"]["name"]
 SUPERUSER = _cfg["database"]["user"]
 PASSWORD = _cfg["database"]["password"]
@@ -33,14 +36,10 @@ def create_database():
     conn.close()
 
 def create_schema():
+    from dapp_scraper.db import get_conn
+
     # Connect to the database
-    conn = psycopg2.connect(
-        dbname=DB_NAME,
-        user=SUPERUSER,
-        password=PASSWORD,
-        host=HOST,
-        port=PORT
-    )
+    conn = get_conn()
     cur = conn.cursor()
     ddl = """
     -- Create ENUM types for standardized values
@@ -118,15 +117,11 @@ def create_schema():
       token_symbol VARCHAR(20),
       token_format VARCHAR(50),
       
-      -- External IDs
-      gecko_id VARCHAR(100),
-      cmc_id VARCHAR(20),
-      
       -- Governance and Decentralization
       governance_type governance_type_enum,
       ownership_status ownership_status_enum,
       level_of_decentralisation decentralisation_level_enum,
-      research_comments TEXT  -- Research notes and comments
+      research_comments TEXT,  -- Research notes and comments
       
       -- DApp Metrics
       tvl NUMERIC DEFAULT 0,
@@ -134,13 +129,48 @@ def create_schema():
       users BIGINT DEFAULT 0,
       volume NUMERIC DEFAULT 0,
       transactions BIGINT DEFAULT 0,
-      market_cap NUMERIC DEFAULT 0,
       mcap NUMERIC DEFAULT 0,
+      
+      -- Timestamps
+      created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+      updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+
+    -- Canonical DApp of each near-duplicate cluster (scripts/cluster_dapps.py)
+    ALTER TABLE dapps ADD COLUMN IF NOT EXISTS entity_id INTEGER REFERENCES dapps(id) ON DELETE SET NULL;
+
+    -- Chains and tags of each DApp, interned; dapps.chains / dapps.tags keep the comma-separated text
+    CREATE TABLE IF NOT EXISTS chains (
+      id SERIAL PRIMARY KEY,
+      name VARCHAR(100) UNIQUE NOT NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS tags (
+      id SERIAL PRIMARY KEY,
+      name VARCHAR(255) UNIQUE NOT NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS dapp_chains (
+      dapp_id INTEGER NOT NULL REFERENCES dapps(id) ON DELETE CASCADE,
+      chain_id INTEGER NOT NULL REFERENCES chains(id),
+      PRIMARY KEY (dapp_id, chain_id)
+    );
+
+    CREATE TABLE IF NOT EXISTS dapp_tags (
+      dapp_id INTEGER NOT NULL REFERENCES dapps(id) ON DELETE CASCADE,
+      tag_id INTEGER NOT NULL REFERENCES tags(id),
+      PRIMARY KEY (dapp_id, tag_id)
+    );
+
+    -- Price and market data, refreshed far more often than the rest of a DApp.
+    -- Narrow rows with free page space and no index on the values, so a
+    -- quote refresh is a HOT update that leaves dapps and its indexes alone
+    CREATE TABLE IF NOT EXISTS dapp_market_quotes (
+      dapp_id INTEGER PRIMARY KEY REFERENCES dapps(id) ON DELETE CASCADE,
+      market_cap NUMERIC DEFAULT 0,
       circulating_supply NUMERIC DEFAULT 0,
       total_supply NUMERIC DEFAULT 0,
       max_supply NUMERIC DEFAULT 0,
-      
-      -- Price and Market Data
       price NUMERIC DEFAULT 0,
       volume_24h NUMERIC DEFAULT 0,
       volume_change_24h NUMERIC DEFAULT 0,
@@ -153,26 +183,46 @@ def create_schema():
       cmc_rank INTEGER DEFAULT 0,
       market_cap_dominance NUMERIC DEFAULT 0,
       fully_diluted_market_cap NUMERIC DEFAULT 0,
-      
-      -- Timestamps
-      created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-      updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    );
+      updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP  -- last time a value changed
+    ) WITH (fillfactor = 70);
 
-    -- TVL Historical Data table (from DeFiLlama)
+    -- TVL Historical Data table (from DeFiLlama); the TVL loader creates the yearly partitions
     CREATE TABLE IF NOT EXISTS tvl_historical (
-      id SERIAL PRIMARY KEY,
-      dapp_id INTEGER REFERENCES dapps(id) ON DELETE CASCADE,
+      dapp_id INTEGER NOT NULL REFERENCES dapps(id) ON DELETE CASCADE,
       date DATE NOT NULL,
       total_liquidity_usd NUMERIC NOT NULL,
-      created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+      created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+      PRIMARY KEY (dapp_id, date)
+    ) PARTITION BY RANGE (date);
+
+    -- Weekly and monthly TVL per DApp, refreshed by the TVL loader for the periods it changes
+    CREATE TABLE IF NOT EXISTS tvl_rollups (
+      dapp_id INTEGER NOT NULL REFERENCES dapps(id) ON DELETE CASCADE,
+      period VARCHAR(5) NOT NULL,  -- week (starting Monday) or month
+      period_start DATE NOT NULL,
+      days INTEGER NOT NULL,  -- daily points in the period
+      last_date DATE NOT NULL,
+      last_tvl NUMERIC NOT NULL,
+      mean_tvl NUMERIC NOT NULL,
+      min_tvl NUMERIC NOT NULL,
+      max_tvl NUMERIC NOT NULL,
+      PRIMARY KEY (dapp_id, period, period_start)
+    );
+
+    -- Per-chain TVL Historical Data table (from DeFiLlama chainTvls)
+    CREATE TABLE IF NOT EXISTS chain_tvl_historical (
+      dapp_id INTEGER NOT NULL REFERENCES dapps(id) ON DELETE CASCADE,
+      chain VARCHAR(100) NOT NULL,
+      date DATE NOT NULL,
+      tvl NUMERIC NOT NULL,
+      PRIMARY KEY (dapp_id, chain, date)
     );
 
     -- Raises/Funding Data table (from DeFiLlama)  
     CREATE TABLE IF NOT EXISTS raises (
       id SERIAL PRIMARY KEY,
       dapp_id INTEGER REFERENCES dapps(id) ON DELETE CASCADE,
-      date DATE NOT NULL,
+      date DATE,  -- NULL when DeFiLlama does not date the round
       name VARCHAR(255),
       round VARCHAR(100),
       amount NUMERIC,
@@ -188,24 +238,154 @@ def create_schema():
       created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
     );
 
+    -- Cross-provider ID mappings; NULL external_id = known miss until expires_at
+    CREATE TABLE IF NOT EXISTS dapp_external_ids (
+      dapp_id INTEGER NOT NULL REFERENCES dapps(id) ON DELETE CASCADE,
+      provider VARCHAR(32) NOT NULL,  -- defillama, coinmarketcap, coingecko
+      external_id VARCHAR(255),
+      match_method VARCHAR(50),
+      confidence NUMERIC,
+      verified_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+      expires_at TIMESTAMP,
+      PRIMARY KEY (dapp_id, provider)
+    );
+
+    -- Enrichment run journal: one row per run, one row per processed DApp
+    CREATE TABLE IF NOT EXISTS enrichment_runs (
+      run_id SERIAL PRIMARY KEY,
+      status VARCHAR(20) NOT NULL DEFAULT 'running',  -- running, completed, interrupted, failed
+      incremental_tvl BOOLEAN DEFAULT TRUE,
+      total_dapps INTEGER,
+      processed_dapps INTEGER DEFAULT 0,
+      enriched_dapps INTEGER DEFAULT 0,
+      last_dapp_id INTEGER,
+      started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+      checkpointed_at TIMESTAMP,
+      finished_at TIMESTAMP
+    );
+
+    CREATE TABLE IF NOT EXISTS enrichment_run_items (
+      run_id INTEGER NOT NULL REFERENCES enrichment_runs(run_id) ON DELETE CASCADE,
+      dapp_id INTEGER NOT NULL REFERENCES dapps(id) ON DELETE CASCADE,
+      status VARCHAR(20) NOT NULL,  -- enriched, no_data, failed
+      error TEXT,
+      processed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+      PRIMARY KEY (run_id, dapp_id)
+    );
+
+    -- Enrichment work queue claimed by scripts/enrich_worker.py with SKIP LOCKED
+    CREATE TABLE IF NOT EXISTS enrichment_jobs (
+      job_id BIGSERIAL PRIMARY KEY,
+      dapp_id INTEGER NOT NULL REFERENCES dapps(id) ON DELETE CASCADE,
+      task VARCHAR(32) NOT NULL DEFAULT 'enrich',
+      status VARCHAR(20) NOT NULL DEFAULT 'pending',  -- pending, running, done, dead
+      priority INTEGER NOT NULL DEFAULT 0,
+      attempts INTEGER NOT NULL DEFAULT 0,
+      max_attempts INTEGER NOT NULL DEFAULT 5,
+      run_after TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+      locked_by VARCHAR(255),
+      locked_at TIMESTAMP,
+      heartbeat_at TIMESTAMP,
+      last_error TEXT,
+      created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+      updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+      finished_at TIMESTAMP,
+      UNIQUE (dapp_id, task)
+    );
+
+    -- Last refresh per DApp and field group, read by the staleness scheduler
+    CREATE TABLE IF NOT EXISTS dapp_refresh_state (
+      dapp_id INTEGER NOT NULL REFERENCES dapps(id) ON DELETE CASCADE,
+      field_group VARCHAR(32) NOT NULL,  -- market, supply, tvl, raises
+      refreshed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+      PRIMARY KEY (dapp_id, field_group)
+    );
+
+    -- One record per fetch / enrich / export run (dapp_scraper/run_metrics.py)
+    CREATE TABLE IF NOT EXISTS runs (
+      run_id SERIAL PRIMARY KEY,
+      command VARCHAR(50) NOT NULL,  -- run_fetch, run_fetch_enrich, export_csv, ...
+      args TEXT,
+      status VARCHAR(20) NOT NULL,  -- completed, interrupted, failed
+      started_at TIMESTAMP NOT NULL,
+      finished_at TIMESTAMP,
+      duration_seconds NUMERIC,
+      requests INTEGER DEFAULT 0,
+      request_bytes BIGINT DEFAULT 0,
+      request_errors INTEGER DEFAULT 0,
+      rows_inserted INTEGER DEFAULT 0,
+      rows_updated INTEGER DEFAULT 0,
+      records_processed INTEGER DEFAULT 0,
+      throughput_per_second NUMERIC,
+      metrics JSONB  -- phases, requests_by_host and all counters
+    );
+
+    -- Records store_records could not write (one row per rejected record)
+    CREATE TABLE IF NOT EXISTS store_rejects (
+      reject_id SERIAL PRIMARY KEY,
+      rejected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+      command VARCHAR(50),  -- run that tried to store the record
+      slug TEXT,
+      name TEXT,
+      error TEXT,
+      record JSONB  -- the normalized record as passed to store_records
+    );
+
+    -- Daily history of DApp metrics (dapp_scraper/snapshots.py); writers create the monthly partitions
+    CREATE TABLE IF NOT EXISTS dapp_metric_snapshots (
+      dapp_id INTEGER NOT NULL REFERENCES dapps(id) ON DELETE CASCADE,
+      snapshot_date DATE NOT NULL,
+      users BIGINT,
+      volume NUMERIC,
+      transactions BIGINT,
+      tvl NUMERIC,
+      market_cap NUMERIC,
+      price NUMERIC,
+      captured_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,  -- last write of the day
+      PRIMARY KEY (dapp_id, snapshot_date)
+    ) PARTITION BY RANGE (snapshot_date);
+
     -- Create indexes for better performance
     CREATE INDEX IF NOT EXISTS idx_dapps_category ON dapps(category_id);
-    CREATE INDEX IF NOT EXISTS idx_dapps_chains ON dapps USING gin(to_tsvector('english', chains));
     CREATE INDEX IF NOT EXISTS idx_dapps_tvl ON dapps(tvl);
     CREATE INDEX IF NOT EXISTS idx_dapps_users ON dapps(users);
     CREATE INDEX IF NOT EXISTS idx_dapps_volume ON dapps(volume);
-    CREATE INDEX IF NOT EXISTS idx_dapps_market_cap ON dapps(market_cap);
     CREATE INDEX IF NOT EXISTS idx_dapps_is_active ON dapps(is_active);
-    CREATE INDEX IF NOT EXISTS idx_dapps_tags ON dapps USING gin(to_tsvector('english', tags));
+    CREATE INDEX IF NOT EXISTS idx_dapps_entity_id ON dapps(entity_id);
     CREATE INDEX IF NOT EXISTS idx_dapps_governance_type ON dapps(governance_type);
     CREATE INDEX IF NOT EXISTS idx_dapps_ownership_status ON dapps(ownership_status);
     CREATE INDEX IF NOT EXISTS idx_dapps_level_of_decentralisation ON dapps(level_of_decentralisation);
     
     -- Indexes for new tables
-    CREATE INDEX IF NOT EXISTS idx_tvl_historical_dapp_id ON tvl_historical(dapp_id);
+    CREATE INDEX IF NOT EXISTS idx_dapp_chains_chain ON dapp_chains(chain_id, dapp_id);
+    CREATE INDEX IF NOT EXISTS idx_dapp_tags_tag ON dapp_tags(tag_id, dapp_id);
     CREATE INDEX IF NOT EXISTS idx_tvl_historical_date ON tvl_historical(date);
-    CREATE INDEX IF NOT EXISTS idx_raises_dapp_id ON raises(dapp_id);
+    CREATE INDEX IF NOT EXISTS idx_chain_tvl_historical_chain_date ON chain_tvl_historical(chain, date);
+    CREATE INDEX IF NOT EXISTS idx_chain_tvl_historical_date ON chain_tvl_historical(date);
+    -- Natural key of a funding round; DeFiLlama's defillama_id names the protocol, not the round
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_raises_natural_key ON raises(dapp_id, COALESCE(date, '-infinity'::date), COALESCE(round, ''), COALESCE(amount, -1));
     CREATE INDEX IF NOT EXISTS idx_raises_date ON raises(date);
+    CREATE INDEX IF NOT EXISTS idx_dapp_external_ids_provider_id ON dapp_external_ids(provider, external_id);
+    CREATE INDEX IF NOT EXISTS idx_enrichment_runs_status ON enrichment_runs(status);
+    CREATE INDEX IF NOT EXISTS idx_enrichment_jobs_claim ON enrichment_jobs(task, priority DESC, job_id) WHERE status = 'pending';
+    CREATE INDEX IF NOT EXISTS idx_enrichment_jobs_running ON enrichment_jobs(heartbeat_at) WHERE status = 'running';
+    CREATE INDEX IF NOT EXISTS idx_runs_command_started ON runs(command, started_at);
+    CREATE INDEX IF NOT EXISTS idx_store_rejects_slug ON store_rejects(slug);
+    -- Snapshots are appended in date order, so a BRIN index stays tiny
+    CREATE INDEX IF NOT EXISTS idx_dapp_metric_snapshots_date ON dapp_metric_snapshots USING brin(snapshot_date);
+
+    -- dapps with its market quote columns, for exports and analysis
+    DROP VIEW IF EXISTS dapps_with_quotes;
+    CREATE VIEW dapps_with_quotes AS
+    SELECT d.*,
+           q.market_cap, q.circulating_supply, q.total_supply, q.max_supply,
+           q.price, q.volume_24h, q.volume_change_24h,
+           q.percent_change_1h, q.percent_change_24h, q.percent_change_7d,
+           q.percent_change_30d, q.percent_change_60d, q.percent_change_90d,
+           q.cmc_rank, q.market_cap_dominance, q.fully_diluted_market_cap,
+           q.updated_at AS quotes_updated_at
+    FROM dapps d
+    LEFT JOIN dapp_market_quotes q ON q.dapp_id = d.id;
     """
     cur.execute(ddl)
     conn.commit()
@@ -223,8 +403,14 @@ if __name__ == "__main__":
     print("📋 Tables created:")
     print("  • categories - DApp categories lookup")
     print("  • dapps - Extended DApp information with governance & metrics")
-    print("  • tvl_historical - Historical TVL data from DeFiLlama")
+    print("  • chains, tags, dapp_chains, dapp_tags - Normalized chains and tags of each DApp")
+    print("  • dapp_market_quotes - Price and market data per DApp (view dapps_with_quotes joins both)")
+    print("  • dapp_metric_snapshots - Daily history of DApp metrics, partitioned by month")
+    print("  • tvl_historical - Historical TVL data from DeFiLlama, partitioned by year")
+    print("  • tvl_rollups - Weekly and monthly TVL per DApp")
+    print("  • chain_tvl_historical - Per-chain historical TVL data from DeFiLlama")
     print("  • raises - Funding/raises data from DeFiLlama")
+    print("  • dapp_external_ids - Provider ID mappings and known misses")
     print("\n📝 Schema includes:")
     print("  • Governance tracking (type, ownership, decentralisation)")
     print("  • Sub-category and research comments")
@@ -0,0 +1,132 @@
+import sys
+import os
+import csv
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from dapp_scraper.scrapers.defillama import fetch_defillama_protocols
+from dapp_scraper.scrapers.coinmarketcap import fetch_coinmarketcap_map
+from dapp_scraper.scrapers.coingecko import fetch_coingecko_public_list
+from dapp_scraper.db import get_conn
+from dapp_scraper.dedup import website_domain
+from dapp_scraper.id_mapping import PROVIDERS, load_id_mappings, save_id_mapping
+from dapp_scraper.resolver import (
+    ACCEPT_SCORE,
+    EntityResolver,
+    candidates_from_coingecko,
+    candidates_from_coinmarketcap,
+    candidates_from_defillama,
+)
+import time
+
+
+def resolve_unmatched_dapps(dry_run=False, review_file="fuzzy_match_review.csv"):
+    """
+    Fuzzy-match every DApp that has no positive mapping for a provider.
+    Matches scoring at least ACCEPT_SCORE that are confirmed by the token
+    symbol, website domain or full name are stored in dapp_external_ids
+    (replacing known misses); other candidates go to review_file.
+    """
+    conn = get_conn()
+    cur = conn.cursor()
+
+    cur.execute("SELECT id, name, slug, token_symbol, website FROM dapps ORDER BY id;")
+    dapps = cur.fetchall()
+    id_mappings = load_id_mappings(cur)
+
+    unmatched = [
+        (dapp_id, name, slug, token_symbol, website)
+        for dapp_id, name, slug, token_symbol, website in dapps
+        if any(
+            not (id_mappings.get((dapp_id, provider)) or {}).get("external_id")
+            for provider in PROVIDERS
+        )
+    ]
+    print(f"🔎 {len(unmatched)} of {len(dapps)} DApps lack at least one provider mapping")
+    if not unmatched:
+        cur.close()
+        conn.close()
+        return 0
+
+    print("📥 Downloading provider catalogs...")
+    candidates = (
+        candidates_from_coingecko(fetch_coingecko_public_list())
+        + candidates_from_coinmarketcap(fetch_coinmarketcap_map())
+        + candidates_from_defillama(fetch_defillama_protocols())
+    )
+    print(f"📚 {len(candidates)} provider candidates")
+
+    started = time.time()
+    resolver = EntityResolver(candidates)
+    ranked = resolver.resolve(
+        [
+            {"name": name, "symbol": token_symbol, "domain": website_domain(website)}
+            for _, name, _, token_symbol, website in unmatched
+        ]
+    )
+    print(f"⚡ Resolved {len(unmatched)} DApps in {time.time() - started:.2f}s")
+
+    accepted = 0
+    review_rows = []
+    for (dapp_id, name, slug, token_symbol, _), candidates_for_dapp in zip(unmatched, ranked):
+        for provider in PROVIDERS:
+            if (id_mappings.get((dapp_id, provider)) or {}).get("external_id"):
+                continue
+            provider_candidates = [c for c in candidates_for_dapp if c["provider"] == provider]
+            if not provider_candidates:
+                continue
+            best = provider_candidates[0]
+            if best["score"] >= ACCEPT_SCORE and best["confirmed_by"]:
+                accepted += 1
+                if not dry_run:
+                    save_id_mapping(cur, dapp_id, provider, best["external_id"], "fuzzy", best["score"] / 100)
+            else:
+                for candidate in provider_candidates:
+                    review_rows.append([
+                        dapp_id, name, slug, provider, candidate["external_id"],
+                        candidate["name"], candidate.get("symbol"), candidate["score"],
+                        candidate["confirmed_by"] or ""
+                    ])
+
+    if dry_run:
+        conn.rollback()
+    else:
+        conn.commit()
+    cur.close()
+    conn.close()
+
+    with open(review_file, "w", newline="", encoding="utf-8") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow([
+            "dapp_id", "dapp_name", "dapp_slug", "provider", "external_id",
+            "candidate_name", "candidate_symbol", "score", "confirmed_by"
+        ])
+        writer.writerows(review_rows)
+
+    print(f"✅ {'Would store' if dry_run else 'Stored'} {accepted} fuzzy matches (score >= {ACCEPT_SCORE}, confirmed)")
+    print(f"📝 {len(review_rows)} candidates for manual review written to {review_file}")
+    return accepted
+
+
+def print_usage():
+    """Print usage instructions"""
+    print("Usage:")
+    print("  python resolve_ids.py               # Store confident fuzzy matches, write review CSV")
+    print("  python resolve_ids.py --dry-run     # Only report matches and write review CSV")
+    print("  Add --profile (sampling) or --profile=cprofile to any command to write a profile to profiles/")
+
+
+if __name__ == "__main__":
+    from dapp_scraper.profiling import profile_from_argv
+
+    with profile_from_argv("resolve_ids"):
+        if len(sys.argv) == 1:
+            resolve_unmatched_dapps()
+        elif sys.argv[1] == "--dry-run":
+            resolve_unmatched_dapps(dry_run=True)
+        elif sys.argv[1] == "help" or sys.argv[1] == "--help":
+            print_usage()
+        else:
+            print("❌ Error: Invalid arguments!")
+            print_usage()
+            sys.exit(1)
@@ -7,44 +7,195 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from scripts.run_fetch_enrich import enrich_database_records
 
 from dapp_scraper.scrapers.dappradar import fetch_dappradar
+from dapp_scraper.db import get_conn
 from dapp_scraper.store import store_records, get_dapp_count, get_recent_dapps
+from dapp_scraper import run_metrics
+from dapp_scraper.log import Progress, get_logger
 import time
 
+log = get_logger("scripts.run_fetch")
+
 def main(limit):
     """
     Main function to fetch and enrich DApp data
     1. Fetch all DApps from DappRadar and save to DB
     2. Enrich each saved DApp with CMC and DeFiLlama data
     """
-    print("🚀 Starting DApp data collection and enrichment")
+    log.info("🚀 Starting DApp data collection and enrichment")
     
     initial_count = get_dapp_count()
-    print(f"📊 Current DApps in database: {initial_count}")
+    log.info("📊 Current DApps in database: %s", initial_count)
     
-    # Phase 1: Fetch DappRadar data
-    print("\n📱 Phase 1: Fetching DappRadar data...")
+    run = run_metrics.start_run("run_fetch")
+    status = "failed"
     try:
-        dappradar_data = fetch_dappradar(limit)
-        if dappradar_data:
-            print(f"✅ Retrieved {len(dappradar_data)} DApps from DappRadar")
-            store_records(dappradar_data)
-            print(f"✅ Saved {len(dappradar_data)} DApps to database")
-        else:
-            print("❌ No data retrieved from DappRadar")
+        # Phase 1: Fetch DappRadar data
+        log.info("📱 Phase 1: Fetching DappRadar data...")
+        try:
+            with run.phase("dappradar"):
+                dappradar_data = fetch_dappradar(limit)
+            if dappradar_data:
+                log.info("✅ Retrieved %s DApps from DappRadar", len(dappradar_data))
+                with run.phase("store"):
+                    store_records(dappradar_data)
+                log.info("✅ Saved %s DApps to database", len(dappradar_data))
+            else:
+                log.error("❌ No data retrieved from DappRadar")
+                return
+        except Exception as e:
+            log.error("❌ Error with DappRadar: %s", e)
             return
-    except Exception as e:
-        print(f"❌ Error with DappRadar: {e}")
-        return
+        
+        # Phase 2: Enrich with CMC and DeFiLlama data
+        log.info("💰 Phase 2: Enriching with CMC and DeFiLlama data...")
+        with run.phase("enrich"):
+            enriched_count = enrich_database_records()
+        status = "completed"
+    except KeyboardInterrupt:
+        status = "interrupted"
+        raise
+    finally:
+        run.finish(status)
     
-    # Phase 2: Enrich with CMC and DeFiLlama data
-    print("\n💰 Phase 2: Enriching with CMC and DeFiLlama data...")
-    enriched_count = enrich_database_records()
+    final_count = get_dapp_count()
+    log.info("🎉 Process complete!")
+    log.info("📈 DApps processed: %s", len(dappradar_data) if 'dappradar_data' in locals() else 0)
+    log.info("💎 Records enriched: %s", enriched_count)
+    log.info("📊 Total DApps in database: %s", final_count)
+
+def main_streaming(limit, fetch_workers=4):
+    """
+    Fetch, store and enrich DApps as one pipeline instead of three phases:
+    DappRadar categories -> dedup + store -> provider fetch (fetch_workers
+    threads) -> enrichment writer. Bounded queues between the stages keep
+    memory flat and let network calls overlap with database writes.
+    Enrichment is journaled like run_fetch_enrich.py (enrichment_runs), each
+    DApp in its own savepoint; an error that escapes the savepoint stops the
+    pipeline.
+    """
+    from dapp_scraper.pipeline import Stage, run_pipeline, print_pipeline_stats, pipeline_errors
+    from dapp_scraper.run_journal import RunCheckpointer, finish_run, start_run
+    from dapp_scraper.scrapers.dappradar import (
+        DAPPRADAR_CATEGORIES,
+        fetch_dappradar_category,
+        merge_duplicate_record,
+    )
+    from dapp_scraper.dedup import propagate_entity_enrichment
+    from scripts.run_fetch_enrich import (
+        EnrichmentContext,
+        fetch_dapp_enrichment,
+        _write_and_journal,
+    )
+
+    log.info("🚀 Starting streaming DApp collection and enrichment")
     
+    initial_count = get_dapp_count()
+    log.info("📊 Current DApps in database: %s", initial_count)
+
+    lookup_conn = get_conn()
+    lookup_cur = lookup_conn.cursor()
+    write_conn = get_conn()
+    write_cur = write_conn.cursor()
+
+    run = run_metrics.start_run("run_fetch")
+    ctx = EnrichmentContext(write_cur)
+    # The number of DApps is only known once DappRadar is done
+    run_id = start_run(write_cur, None)
+    write_conn.commit()
+    # Batches of one DApp: the store stage updates DApp rows on its own
+    # connection and would wait for the writer's row locks, while the writer
+    # waits for the DApps the store stage hands over
+    checkpointer = RunCheckpointer(
+        write_conn, write_cur, run_id, batch_size=1,
+        before_commit=lambda: ctx.flush_updates(write_cur),
+    )
+    unique_records = {}
+    enqueued_ids = set()
+    counts = {"stored": 0}
+    progress = Progress(log, "streaming enrichment")
+
+    def fetch_category(category):
+        records = fetch_dappradar_category(category, limit)
+        return [records] if records else []
+
+    def store_batch(records):
+        merged = [merge_duplicate_record(unique_records, record) for record in records]
+        merged = [record for record in merged if record]
+        if not merged:
+            return []
+        store_records(merged)
+        counts["stored"] += len(merged)
+        
+        # Hand the stored DApps to enrichment, once each
+        lookup_cur.execute(
+            """
+            SELECT id, name, slug, token_symbol, tags
+            FROM dapps
+            WHERE slug = ANY(%s)
+            ORDER BY id;
+            """,
+            ([record["slug"] for record in merged],)
+        )
+        lookup_conn.commit()
+        rows = [row for row in lookup_cur.fetchall() if row[0] not in enqueued_ids]
+        enqueued_ids.update(row[0] for row in rows)
+        return rows
+
+    def fetch(dapp):
+        return [(dapp, fetch_dapp_enrichment(dapp, ctx))]
+
+    def write(item):
+        dapp, result = item
+        progress.update(dapp[1])
+        _write_and_journal(write_cur, dapp, result, ctx, checkpointer)
+        return ()
+
+    def finish_write():
+        propagated = propagate_entity_enrichment(write_cur)
+        log.info("🧩 Copied entity data to %s duplicate DApps", propagated)
+        write_conn.commit()
+
+    status = "failed"
+    try:
+        stats = run_pipeline(
+            DAPPRADAR_CATEGORIES,
+            [
+                Stage("dappradar", fetch_category, workers=2, queue_size=len(DAPPRADAR_CATEGORIES)),
+                Stage("store", store_batch, workers=1, queue_size=2),
+                Stage("fetch", fetch, workers=fetch_workers, queue_size=fetch_workers * 4),
+                Stage("write", write, workers=1, queue_size=fetch_workers * 4,
+                      on_close=finish_write, fail_fast=True),
+            ],
+        )
+        failed = pipeline_errors(stats)
+        if failed:
+            log.warning("⚠️ %s DApps or categories failed in the pipeline", failed)
+        status = "failed" if failed else "completed"
+        # Pipeline stages overlap, so their busy time is recorded as phases
+        for name, stage_stats in stats.items():
+            if name != "elapsed_seconds":
+                run.phases[name] = stage_stats["busy_seconds"]
+    except KeyboardInterrupt:
+        status = "interrupted"
+        raise
+    finally:
+        try:
+            finish_run(lookup_cur, run_id, status)
+            lookup_conn.commit()
+        except Exception as e:
+            log.warning("⚠️ Could not close enrichment run %s: %s", run_id, e)
+        lookup_cur.close()
+        lookup_conn.close()
+        write_cur.close()
+        write_conn.close()
+        run.finish(status)
+
+    print_pipeline_stats(stats)
     final_count = get_dapp_count()
-    print(f"\n🎉 Process complete!")
-    print(f"📈 DApps processed: {len(dappradar_data) if 'dappradar_data' in locals() else 0}")
-    print(f"💎 Records enriched: {enriched_count}")
-    print(f"📊 Total DApps in database: {final_count}")
+    log.info("🎉 Process complete!")
+    log.info("📈 DApps processed: %s", counts["stored"])
+    log.info("💎 Records enriched: %s", checkpointer.enriched)
+    log.info("📊 Total DApps in database: %s", final_count)
 
 def test_single_source(source_name, limit):
     """
@@ -75,34 +226,44 @@ def print_usage():
     """Print usage instructions"""
     print("Usage:")
     print("  python run_fetch.py <limit>                    # Fetch and enrich DApps")
+    print("  python run_fetch.py <limit> --stream [--workers N]")
+    print("                                                 # Fetch, store and enrich as one pipeline")
     print("  python run_fetch.py test dappradar <limit>     # Test DappRadar fetching")
     print("")
     print("Examples:")
     print("  python run_fetch.py 500                        # Fetch 500 DApps and enrich")
     print("  python run_fetch.py test dappradar 10          # Test with 10 records")
+    print("  Add --profile (sampling) or --profile=cprofile to any command to write a profile to profiles/")
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("❌ Error: Limit parameter is required!")
-        print_usage()
-        sys.exit(1)
-    
-    if sys.argv[1] == "test":
-        if len(sys.argv) < 4:
-            print("❌ Error: Test mode requires source name and limit!")
-            print("Usage: python run_fetch.py test <source> <limit>")
+    from dapp_scraper.profiling import profile_from_argv
+
+    with profile_from_argv("run_fetch"):
+        if len(sys.argv) < 2:
+            print("❌ Error: Limit parameter is required!")
+            print_usage()
             sys.exit(1)
-        test_single_source(sys.argv[2], int(sys.argv[3]))
-    elif sys.argv[1] == "help" or sys.argv[1] == "--help":
-        print_usage()
-    else:
-        try:
-            limit = int(sys.argv[1])
-            if limit <= 0:
-                print("❌ Error: Limit must be a positive integer!")
+    
+        if sys.argv[1] == "test":
+            if len(sys.argv) < 4:
+                print("❌ Error: Test mode requires source name and limit!")
+                print("Usage: python run_fetch.py test <source> <limit>")
                 sys.exit(1)
-            main(limit)
-        except ValueError:
-            print("❌ Error: Limit must be a valid integer!")
+            test_single_source(sys.argv[2], int(sys.argv[3]))
+        elif sys.argv[1] == "help" or sys.argv[1] == "--help":
             print_usage()
-            sys.exit(1) 
\ No newline at end of file
+        else:
+            try:
+                limit = int(sys.argv[1])
+                if limit <= 0:
+                    print("❌ Error: Limit must be a positive integer!")
+                    sys.exit(1)
+                fetch_workers = int(sys.argv[sys.argv.index("--workers") + 1]) if "--workers" in sys.argv else 4
+                if "--stream" in sys.argv:
+                    main_streaming(limit, fetch_workers=fetch_workers)
+                else:
+                    main(limit)
+            except ValueError:
+                print("❌ Error: Limit must be a valid integer!")
+                print_usage()
+                sys.exit(1) 
\ No newline at end of file
@@ -3,306 +3,579 @@ import os
 
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 
-from dapp_scraper.utils import safe_numeric
 from dapp_scraper.scrapers.defillama import fetch_single_project_defillama
 from dapp_scraper.scrapers.coinmarketcap import fetch_single_project_coinmarketcap
 from dapp_scraper.scrapers.coingecko import fetch_coingecko_public_list, fetch_single_project_coingecko
 from dapp_scraper.store import get_dapp_count
+from dapp_scraper.id_mapping import PROVIDERS
+from dapp_scraper import run_metrics
+from dapp_scraper.log import Progress, get_logger, truncate
+import threading
 import time
 
+log = get_logger("scripts.run_fetch_enrich")
 
-def main():
+
+def main(
+    incremental_tvl=True,
+    fetch_workers=1,
+    batch_size=None,
+    resume_run_id=None,
+    scheduled=False,
+    request_budget=None,
+):
     """
     Main function to enrich existing DApp data
     Enrich each existing DApp in the database with CMC and DeFiLlama data
     """
-    print("🚀 Starting DApp data enrichment")
+    log.info("🚀 Starting DApp data enrichment")
 
     initial_count = get_dapp_count()
-    print(f"📊 Current DApps in database: {initial_count}")
+    log.info("📊 Current DApps in database: %s", initial_count)
 
     if initial_count == 0:
-        print("❌ No DApps found in database. Please run the main fetcher first.")
+        log.error("❌ No DApps found in database. Please run the main fetcher first.")
         return
 
-    # Enrich with CMC and DeFiLlama data
-    print("\n💰 Enriching with CMC and DeFiLlama data...")
-    enriched_count = enrich_database_records()
+    run = run_metrics.start_run("run_fetch_enrich")
+    status = "failed"
+    try:
+        # Enrich with CMC and DeFiLlama data
+        log.info("💰 Enriching with CMC and DeFiLlama data...")
+        with run.phase("enrich"):
+            enriched_count = enrich_database_records(
+                incremental_tvl=incremental_tvl,
+                fetch_workers=fetch_workers,
+                batch_size=batch_size,
+                resume_run_id=resume_run_id,
+                scheduled=scheduled,
+                request_budget=request_budget,
+            )
+        status = "completed"
+    except KeyboardInterrupt:
+        status = "interrupted"
+        raise
+    finally:
+        run.finish(status)
 
     final_count = get_dapp_count()
-    print(f"\n🎉 Enrichment complete!")
-    print(f"💎 Records enriched: {enriched_count}")
-    print(f"📊 Total DApps in database: {final_count}")
+    log.info("🎉 Enrichment complete!")
+    log.info("💎 Records enriched: %s", enriched_count)
+    log.info("📊 Total DApps in database: %s", final_count)
 
 
-def enrich_database_records():
+class EnrichmentContext:
     """
-    Go through each record in database and enrich with CMC and DeFiLlama data
+    Run-wide lookups shared by the fetch and write phases of enrichment:
+    latest stored TVL dates, cached provider ids, the providers scheduled
+    per DApp and the lazily downloaded CoinGecko coin list (guarded by a
+    lock so fetch workers can share it)
     """
-    from dapp_scraper.store import get_conn, combine_tags
 
-    conn = get_conn()
-    cur = conn.cursor()
+    def __init__(self, cur, incremental_tvl=True, providers_by_dapp=None):
+        # Merged dapps columns per DApp, written in one UPDATE per batch
+        self.pending_updates = {}
 
-    # Get all DApps that need enrichment
-    cur.execute(
-        """
-        SELECT id, name, slug, token_symbol, tags 
-        FROM dapps 
-        ORDER BY id
-    """
-    )
+        # The CoinGecko coin list is only downloaded once a DApp actually needs matching
+        self._gecko_list = None
+        self._gecko_lock = threading.Lock()
 
-    dapps = cur.fetchall()
-    total_dapps = len(dapps)
-    enriched_count = 0
-
-    # Start by fetching CoinGecko list of coins    
-    gecko_list = fetch_coingecko_public_list()
-    print(f"🦎 CoinGecko list fetched a number of coins: {len(gecko_list)}")
-
-    print(f"🎯 Enriching {total_dapps} DApps...")
-
-    for i, (dapp_id, name, slug, token_symbol, existing_tags) in enumerate(
-        dapps, 1
-    ):
-        print(f"[{i}/{total_dapps}] {name}")
-
-        enrichment_data = {}
-        updated_tags = existing_tags  # Start with existing tags
-
-        print(f"🦙 Calling DeFiLlama with params: {name}, {slug}")
-
-        # Try to get DeFiLlama data
-        defillama_data = fetch_single_project_defillama(name, slug)
-        print(f"🦙 DeFiLlama data: {defillama_data}")
-        if defillama_data:
-            mcap = safe_numeric(defillama_data.get("mcap"), 0)
-            gecko_id = defillama_data.get("gecko_id")
-            cmc_id = defillama_data.get("cmc_id")
-            token_symbol = defillama_data.get("token_symbol")
-
-            # Update dapps table with DeFiLlama data
-            cur.execute(
-                """
-                UPDATE dapps SET
-                    mcap = %s,
-                    gecko_id = %s,
-                    cmc_id = %s,
-                    token_symbol = %s,
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE id = %s
-            """,
-                (mcap, gecko_id, cmc_id, token_symbol, dapp_id),
-            )
-
-            # Store TVL historical data if present
-            if defillama_data.get("tvl_historical"):
-                from dapp_scraper.store import store_tvl_historical
-
-                store_tvl_historical(cur, dapp_id, defillama_data["tvl_historical"])
-
-            # Store raises data if present
-            if defillama_data.get("raises"):
-                from dapp_scraper.store import store_raises
+        self.refresh(cur, incremental_tvl, providers_by_dapp)
 
-                store_raises(cur, dapp_id, defillama_data["raises"])
+    def refresh(self, cur, incremental_tvl=True, providers_by_dapp=None):
+        """
+        Reload the per-run lookups from the database. A long-lived context
+        (the daemon) calls this before each run and keeps the CoinGecko list
+        """
+        from dapp_scraper.store import get_latest_tvl_dates, get_latest_chain_tvl_dates
+        from dapp_scraper.id_mapping import load_id_mappings
+        from dapp_scraper.dedup import cluster_member_ids
+
+        # One query for every DApp's latest stored TVL date instead of one per DApp
+        self.latest_tvl_dates = get_latest_tvl_dates(cur) if incremental_tvl else {}
+        self.latest_chain_tvl_dates = get_latest_chain_tvl_dates(cur) if incremental_tvl else {}
+
+        # Known provider ids and unexpired known misses from earlier runs
+        self.id_mappings = load_id_mappings(cur)
+        log.info("🔗 Loaded %s cached provider mappings", len(self.id_mappings))
+
+        # Scheduled runs only call the providers of a DApp's stale field groups
+        self.providers_by_dapp = providers_by_dapp
+
+        # Cluster members get their token and market data from the canonical DApp
+        self.member_ids = cluster_member_ids(cur)
+
+    def forget_gecko_list(self):
+        """Download the CoinGecko list again the next time it is needed"""
+        with self._gecko_lock:
+            self._gecko_list = None
+
+    def gecko_list(self):
+        with self._gecko_lock:
+            if self._gecko_list is None:
+                self._gecko_list = fetch_coingecko_public_list() or []
+                log.info("🦎 CoinGecko list fetched a number of coins: %s", len(self._gecko_list))
+            return self._gecko_list
+
+    def flush_updates(self, cur):
+        """Write the queued merged rows and snapshot their metrics; call before every commit"""
+        from dapp_scraper.merge import write_merged_updates
+        from dapp_scraper.snapshots import append_snapshots
+
+        written = write_merged_updates(cur, self.pending_updates)
+        run_metrics.count("rows_updated", written)
+        run_metrics.count("snapshots_written", append_snapshots(cur, self.pending_updates))
+        self.pending_updates = {}
+        return written
+
+    def discard_updates(self):
+        """Drop the queued merged rows, e.g. after rolling back their transaction"""
+        self.pending_updates = {}
+
+    def providers_for(self, dapp_id):
+        from dapp_scraper.dedup import MEMBER_PROVIDERS
+
+        if self.providers_by_dapp is None:
+            providers = PROVIDERS
+        else:
+            providers = self.providers_by_dapp.get(dapp_id, PROVIDERS)
+        if dapp_id in self.member_ids:
+            providers = tuple(provider for provider in providers if provider in MEMBER_PROVIDERS)
+        return providers
 
 
-        # Determine CMC search parameters based on available data
-        if defillama_data and defillama_data.get("cmc_id"):
-            cmc_params = {"id": defillama_data.get("cmc_id")}
-        elif defillama_data and defillama_data.get("token_symbol"):
-            cmc_params = {"symbol": defillama_data.get("token_symbol")}
-        else:
-            cmc_params = {"slug": slug}
-        
-        print(f"📈 Calling CMC with params: {name}, {cmc_params}")
-        # Try to get CMC data
+def fetch_dapp_enrichment(dapp, ctx):
+    """
+    Network phase for one DApp: call DeFiLlama, CMC and CoinGecko.
+    Touches no database state; id-mapping changes are returned in
+    "mapping_updates" and applied by write_dapp_enrichment.
+    Args:
+        dapp: (id, name, slug, token_symbol, tags) row from dapps
+        ctx: EnrichmentContext of the run
+    Returns:
+        dict: provider results, the TVL cut-off dates used and the providers
+              that answered (or are known misses) in "refreshed_providers"
+    """
+    from dapp_scraper.id_mapping import is_known_miss
+
+    dapp_id, name, slug, token_symbol, existing_tags = dapp
+    mapping_updates = []
+    providers = ctx.providers_for(dapp_id)
+    refreshed_providers = set()
+
+    # Provider id cache hit rate for the run record
+    for provider in providers:
+        run_metrics.count("id_cache_hits" if (dapp_id, provider) in ctx.id_mappings else "id_cache_misses")
+
+    # Try to get DeFiLlama data, using the cached slug and skipping known misses
+    defillama_mapping = ctx.id_mappings.get((dapp_id, "defillama"))
+    tvl_since = ctx.latest_tvl_dates.get(dapp_id)
+    chain_tvl_since = ctx.latest_chain_tvl_dates.get(dapp_id)
+    if "defillama" not in providers:
+        defillama_data = None
+    elif is_known_miss(defillama_mapping):
+        log.debug("🦙 Skipping DeFiLlama, known miss for: %s", name)
+        defillama_data = None
+        refreshed_providers.add("defillama")
+    else:
+        defillama_slug = defillama_mapping["external_id"] if defillama_mapping else slug
+        log.debug("🦙 Calling DeFiLlama with params: %s, %s", name, defillama_slug)
+        defillama_data = fetch_single_project_defillama(
+            name, defillama_slug, tvl_since=tvl_since, chain_tvl_since=chain_tvl_since
+        )
+        log.debug("🦙 DeFiLlama data: %s", truncate(defillama_data))
+        if defillama_data is not None:
+            refreshed_providers.add("defillama")
+        if defillama_data == {}:
+            mapping_updates.append(("miss", "defillama", "slug_probe"))
+    if defillama_data:
+        # DeFiLlama cross-references are the most reliable ids we get
+        mapping_updates.append(("match", "defillama", defillama_data["defillama_slug"], "slug_probe", 0.9))
+        if defillama_data.get("cmc_id"):
+            mapping_updates.append(("match", "coinmarketcap", defillama_data["cmc_id"], "defillama_xref", 1.0))
+        if defillama_data.get("gecko_id"):
+            mapping_updates.append(("match", "coingecko", defillama_data["gecko_id"], "defillama_xref", 1.0))
+
+    # Determine CMC search parameters based on available data
+    cmc_mapping = ctx.id_mappings.get((dapp_id, "coinmarketcap"))
+    if cmc_mapping and not is_known_miss(cmc_mapping):
+        cmc_params = {"id": cmc_mapping["external_id"]}
+        cmc_method = cmc_mapping["match_method"]
+        cmc_confidence = cmc_mapping["confidence"]
+    elif defillama_data and defillama_data.get("cmc_id"):
+        cmc_params = {"id": defillama_data.get("cmc_id")}
+        cmc_method = "defillama_xref"
+        cmc_confidence = 1.0
+    elif defillama_data and defillama_data.get("token_symbol"):
+        cmc_params = {"symbol": defillama_data.get("token_symbol")}
+        cmc_method = "symbol"
+        cmc_confidence = 0.6
+    else:
+        cmc_params = {"slug": slug}
+        cmc_method = "slug"
+        cmc_confidence = 0.8
+
+    # Try to get CMC data
+    if "coinmarketcap" not in providers:
+        cmc_data = None
+    elif is_known_miss(cmc_mapping):
+        log.debug("📈 Skipping CMC, known miss for: %s", name)
+        cmc_data = None
+        refreshed_providers.add("coinmarketcap")
+    else:
+        log.debug("📈 Calling CMC with params: %s, %s", name, cmc_params)
         cmc_data = fetch_single_project_coinmarketcap(name, cmc_params)
-        print(f"📈 CMC result: {cmc_data}")
-
-        if cmc_data:
-            # Extract CMC data for direct column updates
-            price = cmc_data.get("price", 0)
-            volume_24h = cmc_data.get("volume_24h", 0)
-            volume_change_24h = cmc_data.get("volume_change_24h", 0)
-            percent_change_1h = cmc_data.get("percent_change_1h", 0)
-            percent_change_24h = cmc_data.get("percent_change_24h", 0)
-            percent_change_7d = cmc_data.get("percent_change_7d", 0)
-            percent_change_30d = cmc_data.get("percent_change_30d", 0)
-            percent_change_60d = cmc_data.get("percent_change_60d", 0)
-            percent_change_90d = cmc_data.get("percent_change_90d", 0)
-            market_cap = cmc_data.get("market_cap", 0)
-            market_cap_dominance = cmc_data.get("market_cap_dominance", 0)
-            fully_diluted_market_cap = cmc_data.get("fully_diluted_market_cap", 0)
-            circulating_supply = cmc_data.get("circulating_supply", 0)
-            total_supply = cmc_data.get("total_supply", 0)
-            max_supply = cmc_data.get("max_supply", 0)
-            cmc_rank = cmc_data.get("cmc_rank", 0)
-            tvl = cmc_data.get("tvl", 0)
-            tvl_ratio = cmc_data.get("tvl_ratio", 0)
-
-            # Combine tags from CMC with existing DappRadar tags
-            cmc_tags = cmc_data.get("cmc_tags", "")
-            if cmc_tags:
-                updated_tags = combine_tags(existing_tags, cmc_tags)
-
-            # Update dapps table with CMC data
-            cur.execute(
-                """
-                UPDATE dapps SET
-                    price = %s,
-                    volume_24h = %s,
-                    volume_change_24h = %s,
-                    percent_change_1h = %s,
-                    percent_change_24h = %s,
-                    percent_change_7d = %s,
-                    percent_change_30d = %s,
-                    percent_change_60d = %s,
-                    percent_change_90d = %s,
-                    market_cap = %s,
-                    market_cap_dominance = %s,
-                    fully_diluted_market_cap = %s,
-                    circulating_supply = %s,
-                    total_supply = %s,
-                    max_supply = %s,
-                    cmc_rank = %s,
-                    tvl = %s,
-                    tvl_ratio = %s,
-                    tags = %s,
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE id = %s
-            """,
-                (
-                    price,
-                    volume_24h,
-                    volume_change_24h,
-                    percent_change_1h,
-                    percent_change_24h,
-                    percent_change_7d,
-                    percent_change_30d,
-                    percent_change_60d,
-                    percent_change_90d,
-                    market_cap,
-                    market_cap_dominance,
-                    fully_diluted_market_cap,
-                    circulating_supply,
-                    total_supply,
-                    max_supply,
-                    cmc_rank,
-                    tvl,
-                    tvl_ratio,
-                    updated_tags,
-                    dapp_id,
-                ),
-            )
+        log.debug("📈 CMC result: %s", truncate(cmc_data))
+        if cmc_data is not None:
+            refreshed_providers.add("coinmarketcap")
+        if cmc_data == {}:
+            mapping_updates.append(("miss", "coinmarketcap", cmc_method))
+        elif cmc_data and cmc_data.get("cmc_id"):
+            mapping_updates.append(("match", "coinmarketcap", cmc_data["cmc_id"], cmc_method, cmc_confidence))
+
+    # Try to get CoinGecko data (after CMC)
+    # Match DApp name/slug with CoinGecko list and use the id if found
+    gecko_data = None
+    matched_gecko_id = None
+    gecko_method, gecko_confidence = None, None
+    gecko_mapping = ctx.id_mappings.get((dapp_id, "coingecko"))
+
+    if "coingecko" not in providers:
+        pass
+    elif is_known_miss(gecko_mapping):
+        log.debug("🦎 Skipping CoinGecko, known miss for: %s", name)
+        refreshed_providers.add("coingecko")
+    elif gecko_mapping:
+        matched_gecko_id = gecko_mapping["external_id"]
+        gecko_method = gecko_mapping["match_method"]
+        gecko_confidence = gecko_mapping["confidence"]
+    elif defillama_data and defillama_data.get("gecko_id"):
+        matched_gecko_id = defillama_data["gecko_id"]
+        gecko_method, gecko_confidence = "defillama_xref", 1.0
+    else:
+        gecko_list = ctx.gecko_list()
 
-        # Try to get CoinGecko data (after CMC)
-        # Match DApp name/slug with CoinGecko list and use the id if found
-        gecko_data = None
-        matched_gecko_id = None
-        
         # Look for matches in the CoinGecko list by name or slug
         for gecko_item in gecko_list:
             gecko_name = gecko_item.get("name", "").lower()
             gecko_id = gecko_item.get("id", "")
-            
+
             # Check if DApp name or slug matches CoinGecko name or id
-            if (name.lower() == gecko_name or 
-                slug.lower() == gecko_id or 
+            if (name.lower() == gecko_name or
+                slug.lower() == gecko_id or
                 name.lower().replace(" ", "-") == gecko_id or
                 slug.lower().replace("_", "-") == gecko_id):
                 matched_gecko_id = gecko_id
-                print(f"🦎 Found CoinGecko match: {name} -> {gecko_id}")
+                if name.lower() == gecko_name:
+                    gecko_method, gecko_confidence = "name_exact", 0.9
+                else:
+                    gecko_method, gecko_confidence = "slug_exact", 0.95
+                log.debug("🦎 Found CoinGecko match: %s -> %s", name, gecko_id)
                 break
-        
-        # Only call CoinGecko API if we found a match
-        if matched_gecko_id:
-            gecko_params = {"gecko_id": matched_gecko_id}
-            print(f"🦎 Calling CoinGecko with ID: {matched_gecko_id}")
-            gecko_data = fetch_single_project_coingecko(name, gecko_params)
-            print(f"🦎 CoinGecko data: {gecko_data}")
-        else:
-            print(f"🦎 No CoinGecko match found for: {name}")
-        
-        if gecko_data:
-            # Extract CoinGecko data for database update - use existing columns
-            gecko_price = gecko_data.get("price", 0)
-            gecko_market_cap = gecko_data.get("market_cap", 0)
-            gecko_volume_24h = gecko_data.get("volume_24h", 0)
-            gecko_price_change_24h = gecko_data.get("price_change_24h", 0)
-            gecko_price_change_7d = gecko_data.get("price_change_7d", 0)
-            gecko_price_change_30d = gecko_data.get("price_change_30d", 0)
-            gecko_circulating_supply = gecko_data.get("circulating_supply", 0)
-            gecko_total_supply = gecko_data.get("total_supply", 0)
-            gecko_max_supply = gecko_data.get("max_supply", 0)
-            gecko_fully_diluted_market_cap = gecko_data.get("fully_diluted_valuation", 0)
-            gecko_market_cap_rank = gecko_data.get("market_cap_rank", 0)
-            gecko_id_value = gecko_data.get("gecko_id", "")
-            gecko_categories = gecko_data.get("gecko_categories", "")
-            gecko_tvl = gecko_data.get("tvl", 0)
-            
-            # Combine CoinGecko categories with existing tags if available
-            if gecko_categories and updated_tags:
-                from dapp_scraper.store import combine_tags
-                updated_tags = combine_tags(updated_tags, gecko_categories)
-            elif gecko_categories:
-                updated_tags = gecko_categories
-            
-            # Update dapps table with CoinGecko data using existing columns
-            cur.execute(
-                """
-                UPDATE dapps SET
-                    price = COALESCE(NULLIF(price, 0), %s),
-                    market_cap = COALESCE(NULLIF(market_cap, 0), %s),
-                    mcap = COALESCE(NULLIF(mcap, 0), %s),
-                    volume_24h = COALESCE(NULLIF(volume_24h, 0), %s),
-                    percent_change_24h = COALESCE(NULLIF(percent_change_24h, 0), %s),
-                    percent_change_7d = COALESCE(NULLIF(percent_change_7d, 0), %s),
-                    percent_change_30d = COALESCE(NULLIF(percent_change_30d, 0), %s),
-                    circulating_supply = COALESCE(NULLIF(circulating_supply, 0), %s),
-                    total_supply = COALESCE(NULLIF(total_supply, 0), %s),
-                    max_supply = COALESCE(NULLIF(max_supply, 0), %s),
-                    fully_diluted_market_cap = COALESCE(NULLIF(fully_diluted_market_cap, 0), %s),
-                    tvl = COALESCE(NULLIF(tvl, 0), %s),
-                    cmc_rank = COALESCE(NULLIF(cmc_rank, 0), %s),
-                    gecko_id = COALESCE(NULLIF(gecko_id, ''), %s),
-                    tags = %s,
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE id = %s
-            """,
-                (
-                    gecko_price,
-                    gecko_market_cap,
-                    gecko_market_cap,  # Store in both market_cap and mcap columns
-                    gecko_volume_24h,
-                    gecko_price_change_24h,
-                    gecko_price_change_7d,
-                    gecko_price_change_30d,
-                    gecko_circulating_supply,
-                    gecko_total_supply,
-                    gecko_max_supply,
-                    gecko_fully_diluted_market_cap,
-                    gecko_tvl,
-                    gecko_market_cap_rank,
-                    gecko_id_value,
-                    updated_tags,
-                    dapp_id,
-                ),
+
+        if not matched_gecko_id and gecko_list:
+            mapping_updates.append(("miss", "coingecko", "list_match"))
+            refreshed_providers.add("coingecko")
+
+    # Only call CoinGecko API if we found a match
+    if matched_gecko_id:
+        gecko_params = {"gecko_id": matched_gecko_id}
+        log.debug("🦎 Calling CoinGecko with ID: %s", matched_gecko_id)
+        gecko_data = fetch_single_project_coingecko(name, gecko_params)
+        log.debug("🦎 CoinGecko data: %s", truncate(gecko_data))
+        if gecko_data is not None:
+            refreshed_providers.add("coingecko")
+        if gecko_data == {}:
+            mapping_updates.append(("miss", "coingecko", gecko_method))
+        elif gecko_data:
+            mapping_updates.append(("match", "coingecko", matched_gecko_id, gecko_method, gecko_confidence))
+    elif "coingecko" in providers and not is_known_miss(gecko_mapping):
+        log.debug("🦎 No CoinGecko match found for: %s", name)
+
+    return {
+        "defillama": defillama_data,
+        "cmc": cmc_data,
+        "gecko": gecko_data,
+        "tvl_since": tvl_since,
+        "chain_tvl_since": chain_tvl_since,
+        "mapping_updates": mapping_updates,
+        "refreshed_providers": refreshed_providers,
+    }
+
+
+def write_dapp_enrichment(cur, dapp, result, ctx):
+    """
+    Database phase for one DApp: apply id-mapping changes and TVL / raises
+    history from a fetch_dapp_enrichment result, and queue the merged
+    provider columns in ctx.pending_updates (written by ctx.flush_updates).
+    Returns:
+        bool: True if any provider returned data
+    """
+    from dapp_scraper.store import (
+        store_tvl_historical,
+        store_chain_tvl_historical,
+        store_raises,
+    )
+    from dapp_scraper.id_mapping import save_id_mapping, save_id_miss
+    from dapp_scraper.scheduler import mark_refreshed, refreshed_groups
+    from dapp_scraper.merge import merge_provider_results
+
+    dapp_id, name, slug, token_symbol, existing_tags = dapp
+    defillama_data = result["defillama"]
+    cmc_data = result["cmc"]
+    gecko_data = result["gecko"]
+    tvl_since = result["tvl_since"]
+    chain_tvl_since = result["chain_tvl_since"]
+
+    for update in result["mapping_updates"]:
+        if update[0] == "miss":
+            _, provider, match_method = update
+            save_id_miss(cur, dapp_id, provider, match_method)
+            continue
+        _, provider, external_id, match_method, confidence = update
+        cached = ctx.id_mappings.get((dapp_id, provider))
+        if cached and cached["external_id"] == str(external_id):
+            continue
+        save_id_mapping(cur, dapp_id, provider, external_id, match_method, confidence)
+        ctx.id_mappings[(dapp_id, provider)] = {
+            "external_id": str(external_id),
+            "match_method": match_method,
+            "confidence": confidence,
+        }
+
+    if defillama_data:
+        # Store TVL historical data if present
+        if defillama_data.get("tvl_historical"):
+            merged = store_tvl_historical(
+                cur, dapp_id, defillama_data["tvl_historical"], since=tvl_since
+            )
+            log.debug("🦙 Merged %s new or changed TVL points for %s (since %s)", merged, name, tvl_since or "start")
+            run_metrics.count("rows_inserted", merged)
+
+        # Store per-chain TVL history if present
+        if defillama_data.get("chain_tvl_historical"):
+            store_chain_tvl_historical(
+                cur, dapp_id, defillama_data["chain_tvl_historical"], since=chain_tvl_since
             )
 
-        if cmc_data or defillama_data or gecko_data:
-            enriched_count += 1
+        # Store raises data if present
+        if defillama_data.get("raises"):
+            store_raises(cur, dapp_id, defillama_data["raises"])
+
+    mark_refreshed(cur, dapp_id, refreshed_groups(result["refreshed_providers"]))
+
+    # Provider columns are merged in memory and written with the next batch
+    merged = merge_provider_results(
+        {"defillama": defillama_data, "coinmarketcap": cmc_data, "coingecko": gecko_data},
+        existing_tags,
+    )
+    if merged:
+        ctx.pending_updates[dapp_id] = merged
+
+    run_metrics.count("records_processed")
+    for provider, data in (("defillama", defillama_data), ("coinmarketcap", cmc_data), ("coingecko", gecko_data)):
+        if data:
+            run_metrics.count(f"enriched_{provider}")
+
+    return bool(cmc_data or defillama_data or gecko_data)
+
+
+def enrich_database_records(
+    incremental_tvl=True,
+    fetch_workers=1,
+    batch_size=None,
+    resume_run_id=None,
+    scheduled=False,
+    request_budget=None,
+    ttls=None,
+    conn=None,
+    ctx=None,
+):
+    """
+    Go through each record in database and enrich with CMC and DeFiLlama data
+    With incremental_tvl, only TVL points newer than the latest stored date are appended
+    With fetch_workers > 1, provider calls for several DApps overlap with the
+    database writes through a bounded-queue pipeline
+    Work is committed every batch_size DApps together with the run journal;
+    resume_run_id continues an interrupted run with the DApps it has not finished
+    With scheduled, only DApps with stale field groups are enriched, most
+    important first, calling only the providers those groups need and
+    staying within request_budget provider requests; ttls restricts the
+    schedule to some field groups ({group: seconds}, see plan_refresh)
+    A caller that runs enrichment repeatedly (the daemon) passes its own
+    open conn and EnrichmentContext to keep them warm between runs
+    """
+    from dapp_scraper.db import get_conn
+    from dapp_scraper.dedup import propagate_entity_enrichment
+    from dapp_scraper.run_journal import (
+        DONE_STATUSES,
+        RunCheckpointer,
+        finish_run,
+        load_run,
+        reopen_run,
+        start_run,
+    )
+
+    own_conn = conn is None
+    if own_conn:
+        conn = get_conn()
+    cur = conn.cursor()
 
-        # Small delay between enrichments
-        time.sleep(0.2)
+    def close():
+        cur.close()
+        if own_conn:
+            conn.close()
+
+    run = None
+    if resume_run_id is not None:
+        run = load_run(cur, resume_run_id)
+        if not run:
+            log.error("❌ Run %s not found", resume_run_id)
+            close()
+            return 0
+        if run["status"] == "completed":
+            log.info("✅ Run %s already completed", resume_run_id)
+            close()
+            return 0
+        incremental_tvl = run["incremental_tvl"]
+
+    # Get all DApps that need enrichment; duplicates only fetch their own TVL
+    # and receive the token and market data of their cluster's canonical DApp
+    # afterwards. A resumed run skips DApps its journal already marks as done
+    cur.execute(
+        """
+        SELECT id, name, slug, token_symbol, tags 
+        FROM dapps d
+        WHERE NOT EXISTS (
+              SELECT 1 FROM enrichment_run_items i
+              WHERE i.run_id = %s AND i.dapp_id = d.id AND i.status IN %s
+          )
+        ORDER BY id
+    """,
+        (resume_run_id, DONE_STATUSES)
+    )
+
+    dapps = cur.fetchall()
+
+    providers_by_dapp = None
+    if scheduled:
+        from dapp_scraper.scheduler import plan_refresh
+
+        pending_ids = {dapp[0] for dapp in dapps}
+        plan = [
+            (dapp, providers) for dapp, providers in plan_refresh(cur, request_budget, ttls=ttls)
+            if dapp[0] in pending_ids
+        ]
+        dapps = [dapp for dapp, _ in plan]
+        providers_by_dapp = {dapp[0]: providers for dapp, providers in plan}
+    total_dapps = len(dapps)
 
+    if run:
+        reopen_run(cur, resume_run_id)
+        run_id = resume_run_id
+        log.info("🔁 Resuming run %s: %s DApps done, %s left", run_id, run["processed_dapps"], total_dapps)
+    else:
+        run_id = start_run(cur, total_dapps, incremental_tvl=incremental_tvl)
+        log.info("🧾 Started enrichment run %s", run_id)
+    conn.commit()
+
+    with run_metrics.phase("load_context"):
+        if ctx is None:
+            ctx = EnrichmentContext(cur, incremental_tvl=incremental_tvl, providers_by_dapp=providers_by_dapp)
+        else:
+            ctx.refresh(cur, incremental_tvl=incremental_tvl, providers_by_dapp=providers_by_dapp)
+    checkpointer = RunCheckpointer(
+        conn,
+        cur,
+        run_id,
+        batch_size=batch_size,
+        processed=run["processed_dapps"] if run else 0,
+        enriched=run["enriched_dapps"] if run else 0,
+        before_commit=lambda: ctx.flush_updates(cur),
+    )
+
+    log.info("🎯 Enriching %s DApps...", total_dapps)
+    progress = Progress(log, "enrichment", total_dapps)
+
+    try:
+        if fetch_workers > 1:
+            failed = _enrich_with_pipeline(cur, dapps, ctx, fetch_workers, checkpointer, progress)
+        else:
+            failed = 0
+            for dapp in dapps:
+                progress.update(dapp[1])
+                result = fetch_dapp_enrichment(dapp, ctx)
+                _write_and_journal(cur, dapp, result, ctx, checkpointer)
+
+                # Small delay between enrichments
+                time.sleep(0.2)
+        checkpointer.flush()
+        if failed:
+            # Those DApps were never journaled, so a resumed run retries them
+            raise RuntimeError(f"{failed} DApps failed in the enrichment pipeline")
+    except BaseException as e:
+        # Keep every committed batch; only the unfinished one is lost
+        conn.rollback()
+        status = "interrupted" if isinstance(e, KeyboardInterrupt) else "failed"
+        finish_run(cur, run_id, status)
+        conn.commit()
+        log.warning("⏸️ Run %s %s after %s DApps", run_id, status, checkpointer.processed)
+        log.warning("   Continue with: python scripts/run_fetch_enrich.py --resume %s", run_id)
+        close()
+        raise
+
+    with run_metrics.phase("propagate_entities"):
+        propagated = propagate_entity_enrichment(cur)
+    log.info("🧩 Copied entity data to %s duplicate DApps", propagated)
+
+    finish_run(cur, run_id, "completed")
     conn.commit()
-    cur.close()
-    conn.close()
+    close()
+
+    return checkpointer.enriched
+
 
-    return enriched_count
+def _write_and_journal(cur, dapp, result, ctx, checkpointer):
+    """Write one DApp inside a savepoint and journal the outcome"""
+    cur.execute("SAVEPOINT enrich_dapp")
+    try:
+        enriched = write_dapp_enrichment(cur, dapp, result, ctx)
+        cur.execute("RELEASE SAVEPOINT enrich_dapp")
+    except Exception as e:
+        cur.execute("ROLLBACK TO SAVEPOINT enrich_dapp")
+        log.error("❌ Error writing enrichment for %s: %s", dapp[1], e)
+        checkpointer.add(dapp[0], "failed", str(e))
+        return
+    checkpointer.add(dapp[0], "enriched" if enriched else "no_data")
+
+
+def _enrich_with_pipeline(cur, dapps, ctx, fetch_workers, checkpointer, progress):
+    """
+    Run fetch_dapp_enrichment on fetch_workers threads feeding a single DB
+    writer. A writer error that escapes the per-DApp savepoint (lost
+    connection, failed SAVEPOINT) stops the pipeline and is re-raised.
+    Returns the number of DApps that failed in a stage.
+    """
+    from dapp_scraper.pipeline import Stage, run_pipeline, print_pipeline_stats, pipeline_errors
+
+    def fetch(dapp):
+        return [(dapp, fetch_dapp_enrichment(dapp, ctx))]
+
+    def write(item):
+        dapp, result = item
+        progress.update(dapp[1])
+        _write_and_journal(cur, dapp, result, ctx, checkpointer)
+        return ()
+
+    stats = run_pipeline(
+        dapps,
+        [
+            Stage("fetch", fetch, workers=fetch_workers, queue_size=fetch_workers * 4),
+            Stage("write", write, workers=1, queue_size=fetch_workers * 4, fail_fast=True),
+        ],
+    )
+    print_pipeline_stats(stats)
+    return pipeline_errors(stats)
 
 def print_usage():
     """Print usage instructions"""
@@ -310,6 +583,24 @@ def print_usage():
     print(
         "  python run_fetch_enrich.py                     # Enrich all existing DApps"
     )
+    print(
+        "  python run_fetch_enrich.py --full-tvl          # Reload full TVL history instead of new days only"
+    )
+    print(
+        "  python run_fetch_enrich.py --workers <n>       # Overlap provider calls of n DApps with DB writes"
+    )
+    print(
+        "  python run_fetch_enrich.py --batch-size <n>    # Commit every n DApps (default from config)"
+    )
+    print(
+        "  python run_fetch_enrich.py --resume <run_id>   # Continue an interrupted run"
+    )
+    print(
+        "  python run_fetch_enrich.py --scheduled [--budget <n>]"
+    )
+    print(
+        "                                                 # Only refresh stale data, most important DApps first"
+    )
     print(
         "  python run_fetch_enrich.py test <limit>        # Test enrichment on limited DApps"
     )
@@ -319,15 +610,39 @@ def print_usage():
         "  python run_fetch_enrich.py                     # Enrich all DApps in database"
     )
     print("  python run_fetch_enrich.py test 10             # Test with 10 records")
+    print("  Add --profile (sampling) or --profile=cprofile to any command to write a profile to profiles/")
 
 
 if __name__ == "__main__":
-    if len(sys.argv) == 1:
-        # No arguments - run full enrichment
-        main()
-    elif sys.argv[1] == "help" or sys.argv[1] == "--help":
-        print_usage()
-    else:
-        print("❌ Error: Invalid arguments!")
-        print_usage()
-        sys.exit(1)
+    from dapp_scraper.profiling import profile_from_argv
+
+    with profile_from_argv("run_fetch_enrich"):
+        if len(sys.argv) == 1:
+            # No arguments - run full enrichment
+            main()
+        elif sys.argv[1] == "help" or sys.argv[1] == "--help":
+            print_usage()
+        elif sys.argv[1] in ("--full-tvl", "--workers", "--batch-size", "--resume", "--scheduled", "--budget"):
+            options = {}
+            try:
+                for flag in ("--workers", "--batch-size", "--resume", "--budget"):
+                    if flag in sys.argv:
+                        options[flag] = int(sys.argv[sys.argv.index(flag) + 1])
+                        if options[flag] <= 0:
+                            raise ValueError
+            except (ValueError, IndexError):
+                print("❌ Error: --workers, --batch-size, --resume and --budget need a positive integer!")
+                print_usage()
+                sys.exit(1)
+            main(
+                incremental_tvl="--full-tvl" not in sys.argv,
+                fetch_workers=options.get("--workers", 1),
+                batch_size=options.get("--batch-size"),
+                resume_run_id=options.get("--resume"),
+                scheduled="--scheduled" in sys.argv or "--budget" in sys.argv,
+                request_budget=options.get("--budget"),
+            )
+        else:
+            print("❌ Error: Invalid arguments!")
+            print_usage()
+            sys.exit(1)
@@ -8,26 +8,10 @@ import csv
 import sys
 import os
 from collections import Counter
-from configparser import ConfigParser
-import psycopg2
 
-# Load database config
-_cfg = ConfigParser()
-_cfg.read(os.path.join(os.path.dirname(__file__), '..', 'config', 'config.ini'))
-DB_NAME = _cfg["database"]["name"]
-SUPERUSER = _cfg["database"]["user"]
-PASSWORD = _cfg["database"]["password"]
-HOST = _cfg["database"]["host"]
-PORT = _cfg["database"]["port"]
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-def get_conn():
-    return psycopg2.connect(
-        dbname=DB_NAME,
-        user=SUPERUSER,
-        password=PASSWORD,
-        host=HOST,
-        port=PORT
-    )
+from dapp_scraper.db import get_conn
 
 # Define canonical sub-categories with standardization rules
 STANDARDIZATION_MAP = {
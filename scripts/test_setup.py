@@ -110,9 +110,6 @@ def test_imports():
         import pandas
         print("✅ pandas")
         
-        import bs4
-        print("✅ beautifulsoup4")
-        
         from dapp_scraper.scrapers.dappradar import fetch_dappradar
         print("✅ dappradar scraper")
         
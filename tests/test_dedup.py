@@ -0,0 +1,47 @@
+"""Entity clustering of DApps"""
+from dapp_scraper.dedup import cluster_dapps, website_domain
+
+
+def _dapp(dapp_id, name, website=None, token_symbol=None, external_ids=None):
+    return {
+        "id": dapp_id,
+        "name": name,
+        "website": website,
+        "token_symbol": token_symbol,
+        "external_ids": external_ids or {},
+    }
+
+
+def test_website_domain_strips_prefixes_and_generic_hosts():
+    assert website_domain("https://www.Aave.com/markets") == "aave.com"
+    assert website_domain("app.uniswap.org") == "uniswap.org"
+    assert website_domain("https://t.me/aave") == ""
+    assert website_domain("") == ""
+
+
+def test_shared_provider_id_links_with_lowest_id_as_canonical():
+    assignments = cluster_dapps([
+        _dapp(7, "Aave", external_ids={"defillama": "aave"}),
+        _dapp(3, "Aave Arbitrum", external_ids={"defillama": "aave"}),
+        _dapp(5, "Compound"),
+    ])
+    assert assignments == {7: 3, 3: 3, 5: 5}
+
+
+def test_links_are_transitive():
+    assignments = cluster_dapps([
+        _dapp(1, "Alpha", website="https://alpha.xyz"),
+        _dapp(2, "Alpha Polygon", website="alpha.xyz", external_ids={"defillama": "alpha"}),
+        _dapp(3, "Alpha Base", external_ids={"defillama": "alpha"}),
+    ])
+    assert set(assignments.values()) == {1}
+
+
+def test_similar_names_need_corroboration():
+    assignments = cluster_dapps([
+        _dapp(1, "Magic Eden"),
+        _dapp(2, "Magic Eden V2"),
+        _dapp(3, "Magic Square"),
+    ])
+    assert assignments[2] == 1
+    assert assignments[3] == 3
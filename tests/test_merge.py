@@ -0,0 +1,49 @@
+"""Provider precedence in merge_provider_results"""
+from dapp_scraper.merge import merge_provider_results
+
+
+def test_first_provider_with_a_value_wins():
+    merged = merge_provider_results({
+        "coinmarketcap": {"price": 2.0},
+        "coingecko": {"price": 1.5},
+    })
+    assert merged["price"] == 2.0
+
+
+def test_missing_value_falls_through_to_next_provider():
+    merged = merge_provider_results({
+        "coinmarketcap": {"price": None, "volume_24h": ""},
+        "coingecko": {"price": 1.5, "volume_24h": "10"},
+    })
+    assert merged["price"] == 1.5
+    assert merged["volume_24h"] == 10.0
+
+
+def test_reported_zero_is_kept():
+    merged = merge_provider_results({
+        "coinmarketcap": {"volume_24h": 0},
+        "coingecko": {"volume_24h": 5.0},
+    })
+    assert merged["volume_24h"] == 0.0
+
+
+def test_columns_without_values_are_left_out():
+    assert merge_provider_results({"defillama": None, "coinmarketcap": {}, "coingecko": None}) == {}
+
+
+def test_integer_columns_are_cast():
+    merged = merge_provider_results({"coingecko": {"market_cap_rank": 12.0}})
+    assert merged["cmc_rank"] == 12
+
+
+def test_provider_tags_are_appended_once():
+    merged = merge_provider_results(
+        {"coinmarketcap": {"cmc_tags": "defi, DEX"}, "coingecko": {"gecko_categories": "Lending"}},
+        existing_tags="DeFi",
+    )
+    assert merged["tags"] == "DeFi, DEX, Lending"
+
+
+def test_unchanged_tags_are_not_written():
+    merged = merge_provider_results({"coinmarketcap": {"cmc_tags": None}}, existing_tags="DeFi")
+    assert "tags" not in merged
@@ -0,0 +1,50 @@
+"""Name normalization, blocking and match confirmation of the entity resolver"""
+from dapp_scraper.resolver import EntityResolver, blocking_keys, normalize_name
+
+
+def _resolve(name, candidates, symbol=None):
+    resolver = EntityResolver(candidates)
+    return resolver.resolve([{"name": name, "symbol": symbol}], min_score=0)[0]
+
+
+def test_normalize_name_drops_versions_and_punctuation():
+    assert normalize_name("Uniswap V3") == "uniswap"
+    assert normalize_name("  Curve.fi / DEX ") == "curve fi dex"
+    assert normalize_name(None) == ""
+
+
+def test_blocking_keys_skip_stopwords_and_short_tokens():
+    keys = blocking_keys("aave protocol v", "AAVE")
+    assert keys == {"tok:aave", "pre:aave", "sym:aave"}
+
+
+def test_blocking_keys_without_prefix_for_short_names():
+    assert blocking_keys("gmx") == {"tok:gmx"}
+
+
+def test_candidates_outside_shared_blocks_are_not_scored():
+    matches = _resolve("Uniswap", [
+        {"provider": "coingecko", "external_id": "uniswap", "name": "Uniswap"},
+        {"provider": "coingecko", "external_id": "sushi", "name": "SushiSwap"},
+    ])
+    assert [m["external_id"] for m in matches] == ["uniswap"]
+
+
+def test_version_suffix_is_confirmed_by_name():
+    matches = _resolve("Uniswap V3", [{"provider": "coingecko", "external_id": "uniswap", "name": "Uniswap"}])
+    assert matches[0]["confirmed_by"] == "name"
+
+
+def test_subset_match_is_not_confirmed():
+    matches = _resolve("Magic Eden", [{"provider": "coingecko", "external_id": "magic", "name": "Magic"}])
+    assert matches[0]["external_id"] == "magic"
+    assert matches[0]["confirmed_by"] is None
+
+
+def test_same_symbol_confirms_match():
+    matches = _resolve(
+        "Magic Eden",
+        [{"provider": "coingecko", "external_id": "magic-eden", "name": "Magic Eden Token", "symbol": "ME"}],
+        symbol="ME",
+    )
+    assert matches[0]["confirmed_by"] == "symbol"
@@ -0,0 +1,52 @@
+"""Row building of the TVL and raises loaders"""
+from datetime import date
+
+from dapp_scraper.store import RAISE_FIELDS, _chain_tvl_rows, _raise_rows, _tvl_rows
+
+
+def test_tvl_rows_keep_the_since_day_and_the_last_value():
+    tvl_data = [
+        {"date": date(2024, 1, 1), "total_liquidity_usd": 1},
+        {"date": date(2024, 1, 2), "total_liquidity_usd": 2},
+        {"date": date(2024, 1, 2), "total_liquidity_usd": 3},
+        {"date": date(2024, 1, 3), "total_liquidity_usd": 4},
+    ]
+    rows = _tvl_rows(9, tvl_data, since=date(2024, 1, 2))
+    assert sorted(rows) == [(9, date(2024, 1, 2), 3), (9, date(2024, 1, 3), 4)]
+    assert len(_tvl_rows(9, tvl_data)) == 3
+    assert _tvl_rows(9, None) == []
+
+
+def test_chain_tvl_rows_cut_off_per_chain():
+    chain_data = [
+        {"chain": "Ethereum", "date": date(2024, 1, 1), "tvl": 1},
+        {"chain": "Ethereum", "date": date(2024, 1, 2), "tvl": 2},
+        {"chain": "Base", "date": date(2024, 1, 1), "tvl": 3},
+    ]
+    rows = _chain_tvl_rows(9, chain_data, since={"Ethereum": date(2024, 1, 2)})
+    assert sorted(rows) == [(9, "Base", date(2024, 1, 1), 3), (9, "Ethereum", date(2024, 1, 2), 2)]
+
+
+def _raise(**fields):
+    return {field: fields.get(field) for field in RAISE_FIELDS}
+
+
+def test_raise_rows_merge_repeated_rounds():
+    rows = _raise_rows(9, [
+        _raise(date=date(2023, 5, 1), round="Seed", amount=2, name="old"),
+        _raise(date=date(2023, 5, 1), round="Seed", amount=2, name="new"),
+        _raise(date=date(2023, 5, 1), round="Series A", amount=10),
+    ])
+    assert len(rows) == 2
+    assert rows[0][0] == 9
+    assert rows[0][1 + RAISE_FIELDS.index("name")] == "new"
+
+
+def test_raise_rows_keep_undated_rounds():
+    rows = _raise_rows(9, [
+        _raise(round=None, amount=None, name="first"),
+        _raise(round="", amount=None, name="second"),
+        _raise(round="Seed", amount=1),
+    ])
+    assert len(rows) == 2
+    assert all(row[1 + RAISE_FIELDS.index("date")] is None for row in rows)